@@ -7,6 +7,7 @@ import { useAuth } from '@/contexts/auth-context';
 import { UserCircle, Sparkles } from 'lucide-react';
 import { Sidebar } from '@/components/ui/sidebar';
 import { API_BASE_URL } from '@/lib/constants';
+import { fetchAllPages } from '@/lib/pagination';
 import { ImageCard } from '@/components/image-card';
 import { useRouter } from 'next/navigation';
 
@@ -52,13 +53,11 @@ export default function EmojiGenerator() {
 
   const fetchImages = async () => {
     try {
-      const response = await fetch(`${API_BASE_URL}/images`, {
+      const data = await fetchAllPages<Image>(`${API_BASE_URL}/images`, {
         headers: {
           'Authorization': `Bearer ${token}`
         }
       });
-      if (!response.ok) throw new Error('Failed to fetch images');
-      const data = await response.json();
       setImages(data);
     } catch (error) {
       console.error('Error fetching images:', error);
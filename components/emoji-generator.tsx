@@ -3,6 +3,7 @@ import { ImageCard } from './image-card';
 import { Input } from './ui/input';
 import { Button } from './ui/button';
 import { toast } from 'sonner';
+import { fetchAllPages } from '@/lib/pagination';
 
 interface Image {
   id: string;
@@ -19,8 +20,7 @@ export function EmojiGenerator() {
   const [fetchingImages, setFetchingImages] = useState(false);
 
   useEffect(() => {
-    fetch('http://localhost:8000/images')
-      .then(res => res.json())
+    fetchAllPages<Image>('http://localhost:8000/images')
       .then(data => setImages(data))
       .catch(err => console.error(err));
   }, []);
@@ -0,0 +1,28 @@
+"""add images (created_at, id) index for keyset pagination
+
+Revision ID: 3f2a9c1d7e4b
+Revises: 1bdc14721c56
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f2a9c1d7e4b'
+down_revision: Union[str, None] = '1bdc14721c56'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_images_created_at_id', 'images', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_images_created_at_id', table_name='images')
@@ -0,0 +1,52 @@
+"""add pg_trgm GIN indexes for the ilike substring filters
+
+Revision ID: 8d41b7e2c5a9
+Revises: 3f2a9c1d7e4b
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d41b7e2c5a9'
+down_revision: Union[str, None] = '3f2a9c1d7e4b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TRIGRAM_INDEXES = [
+    ('ix_project_name_trgm', 'project', 'name'),
+    ('ix_bug_title_trgm', 'bug', 'title'),
+    ('ix_note_body_trgm', 'note', 'body'),
+    ('ix_user_username_trgm', 'user', 'username'),
+    ('ix_images_prompt_trgm', 'images', 'prompt'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # pg_trgm is Postgres only; other backends keep unindexed LIKE filters
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    # Built concurrently so writes to the tables are not blocked meanwhile
+    with op.get_context().autocommit_block():
+        for name, table, column in TRIGRAM_INDEXES:
+            op.create_index(
+                name, table, [column], unique=False, if_not_exists=True,
+                postgresql_using='gin',
+                postgresql_ops={column: 'gin_trgm_ops'},
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    with op.get_context().autocommit_block():
+        for name, table, column in TRIGRAM_INDEXES:
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
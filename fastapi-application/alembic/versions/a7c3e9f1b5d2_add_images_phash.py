@@ -0,0 +1,31 @@
+"""add images.phash and an index on images.url for duplicate detection
+
+Revision ID: a7c3e9f1b5d2
+Revises: f4a8d2b6c0e1
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c3e9f1b5d2'
+down_revision: Union[str, None] = 'f4a8d2b6c0e1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Set on save, or by the variant pipeline for bulk-saved images
+    op.add_column('images', sa.Column('phash', sa.BigInteger(), nullable=True))
+    op.create_index('ix_images_url', 'images', ['url'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_images_url', table_name='images')
+    op.drop_column('images', 'phash')
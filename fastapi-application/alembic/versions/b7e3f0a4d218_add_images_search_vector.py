@@ -0,0 +1,44 @@
+"""add images.search_vector generated tsvector column with GIN index
+
+Revision ID: b7e3f0a4d218
+Revises: 8d41b7e2c5a9
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e3f0a4d218'
+down_revision: Union[str, None] = '8d41b7e2c5a9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_VECTOR_SQL = "to_tsvector('english', coalesce(prompt, '') || ' ' || coalesce(original_input, ''))"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # tsvector is Postgres only; other backends search with the in-process index
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.add_column('images', sa.Column(
+        'search_vector', postgresql.TSVECTOR(), sa.Computed(SEARCH_VECTOR_SQL, persisted=True), nullable=True,
+    ))
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_images_search_vector', 'images', ['search_vector'], unique=False,
+            postgresql_using='gin', postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.drop_index('ix_images_search_vector', table_name='images')
+    op.drop_column('images', 'search_vector')
@@ -0,0 +1,41 @@
+"""add indexed 16-bit substrings of images.phash for similarity lookups
+
+Revision ID: d5b8f2a4c6e9
+Revises: a7c3e9f1b5d2
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5b8f2a4c6e9'
+down_revision: Union[str, None] = 'a7c3e9f1b5d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CHUNKS = 4
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for i in range(CHUNKS):
+        op.add_column('images', sa.Column(f'phash_{i}', sa.Integer(), nullable=True))
+    # Backfill from the hashes already stored; the mask also undoes the two's-complement sign
+    op.execute(
+        "UPDATE images SET "
+        + ", ".join(f"phash_{i} = (phash >> {16 * i}) & 65535" for i in range(CHUNKS))
+        + " WHERE phash IS NOT NULL"
+    )
+    for i in range(CHUNKS):
+        op.create_index(f'ix_images_phash_{i}', 'images', [f'phash_{i}'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for i in range(CHUNKS):
+        op.drop_index(f'ix_images_phash_{i}', table_name='images')
+        op.drop_column('images', f'phash_{i}')
@@ -0,0 +1,29 @@
+"""add images.content_sha256 for the local content store
+
+Revision ID: e2c9a5d1f7b3
+Revises: b7e3f0a4d218
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2c9a5d1f7b3'
+down_revision: Union[str, None] = 'b7e3f0a4d218'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Filled in on first GET /images/{id}/content
+    op.add_column('images', sa.Column('content_sha256', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('images', 'content_sha256')
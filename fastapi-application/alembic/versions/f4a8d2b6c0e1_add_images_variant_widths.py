@@ -0,0 +1,29 @@
+"""add images.variant_widths for the WebP thumbnail variants
+
+Revision ID: f4a8d2b6c0e1
+Revises: e2c9a5d1f7b3
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4a8d2b6c0e1'
+down_revision: Union[str, None] = 'e2c9a5d1f7b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Filled in by the variant pipeline after each save
+    op.add_column('images', sa.Column('variant_widths', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('images', 'variant_widths')
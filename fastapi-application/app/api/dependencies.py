@@ -1,7 +1,14 @@
-from app.database import SessionLocal
-from fastapi import Depends, HTTPException, status
+from app.database import SessionLocal, AsyncSessionLocal
+from fastapi import Depends, HTTPException, Query, status
+from typing import Optional
+from uuid import UUID
+from app.core.config import settings
+from app.core.pagination import decode_cursor
 from fastapi.security import OAuth2PasswordBearer
 from app.core.security import decode_access_token
+from app.schemas.user import UserResponse
+from app.services.user import get_cached_user
+from sqlalchemy.orm import Session
 
 def get_db():
     db = SessionLocal()
@@ -10,10 +17,14 @@ def get_db():
     finally:
         db.close()
 
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
 # OAuth2PasswordBearer automatically looks for the token in the "Authorization" header
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
-def get_current_user(token: str = Depends(oauth2_scheme)):
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> UserResponse:
     """Extract user from JWT token and verify login status."""
     payload = decode_access_token(token)
     if "error" in payload:
@@ -22,4 +33,40 @@ def get_current_user(token: str = Depends(oauth2_scheme)):
             detail=payload["error"],
             headers={"WWW-Authenticate": "Bearer"},
         )
-    return payload["username"]  # Return the username from the token
+    # Resolved once per request (and cached briefly), services use it as is
+    user = get_cached_user(db, payload["username"])
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return user
+
+
+def get_diagnostics_user(user: UserResponse = Depends(get_current_user)) -> UserResponse:
+    """The current user, if DIAGNOSTICS_USERS lets them read the diagnostics endpoints."""
+    if user.username not in settings.DIAGNOSTICS_USERS:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Diagnostics are not enabled for this user",
+        )
+    return user
+
+
+# The list endpoints sort on text columns or on the UUID id, then break ties on id
+PAGE_CURSOR_KEYS = {"sort": (str, UUID), "id": UUID}
+
+class PageParams:
+    """Cursor pagination query parameters shared by the list endpoints."""
+
+    def __init__(
+        self,
+        cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
+        limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE, description="Page size"),
+    ):
+        try:
+            self.after = decode_cursor(cursor, PAGE_CURSOR_KEYS) if cursor else None
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        self.limit = limit
@@ -1,18 +1,19 @@
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.services.auth import create_token, sign_up, check_username_exists
 from app.schemas.auth import LoginResponse, LogInRequest, SignupRequest, SignupResponse
-from app.api.dependencies import get_db
+from app.api.dependencies import get_db, get_async_db
 
 router = APIRouter()
 
 @router.post("/login", response_model=LoginResponse)
-def add_user(user: LogInRequest, db: Session = Depends(get_db)):
-    return create_token(db, user)
+async def add_user(user: LogInRequest, db: AsyncSession = Depends(get_async_db)):
+    return await create_token(db, user)
 
 @router.post("/signup", response_model=SignupResponse)
-def add_user(user: SignupRequest, db: Session = Depends(get_db)):
-    return sign_up(db, user)
+async def add_user(user: SignupRequest, db: AsyncSession = Depends(get_async_db)):
+    return await sign_up(db, user)
 
 @router.get("/check-username")
 def check_username(username: str, db: Session = Depends(get_db)):
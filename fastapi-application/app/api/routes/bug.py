@@ -1,6 +1,7 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Response
 from sqlalchemy.orm import Session
-from app.api.dependencies import get_db, get_current_user
+from app.schemas.user import UserResponse
+from app.api.dependencies import get_db, get_current_user, PageParams
 from app.schemas.bug import BugCreated, BugResponse, BugUpdated
 from app.services.bug import create_bug, get_all_bugs, get_bug_by_id, update_bug, delete_bug
 from uuid import UUID
@@ -9,21 +10,25 @@ from app.models.bug import PriorityEnum
 router = APIRouter()
 
 @router.post("/projects/{projectId}/bugs", response_model=BugResponse)
-async def post_bug(projectId: UUID, bug_data: BugCreated, db: Session = Depends(get_db), current_user: str = Depends(get_current_user)):
+def post_bug(projectId: UUID, bug_data: BugCreated, db: Session = Depends(get_db), current_user: UserResponse = Depends(get_current_user)):
     bug = create_bug(db, projectId, bug_data, current_user)
     return bug
 
 @router.get("/projects/{projectId}/bugs", response_model=list[BugResponse])
 def get_bugs(
     projectId: UUID,
-    current_user: str = Depends(get_current_user),
+    response: Response,
+    current_user: UserResponse = Depends(get_current_user),
     db: Session = Depends(get_db),
     title: str = Query(None, description="Filter by name"),
     priority: PriorityEnum = Query(None, description="Filter by priority"),
     sort_by: str = Query("title", regex="^(title|priority)$", description="Sort by title or priority"),
-    sort_order: str = Query("asc", regex="^(asc|desc)$", description="Sort order (asc or desc)")
+    sort_order: str = Query("asc", regex="^(asc|desc)$", description="Sort order (asc or desc)"),
+    page: PageParams = Depends(),
 ):
-    bugs = get_all_bugs(db, projectId=projectId, title=title, priority=priority, sort_by=sort_by, sort_order=sort_order)
+    bugs, next_cursor = get_all_bugs(db, projectId=projectId, title=title, priority=priority, sort_by=sort_by, sort_order=sort_order, after=page.after, limit=page.limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return bugs
 
 @router.get("/projects/{projectId}/bugs/{bugId}", response_model=BugResponse)
@@ -31,7 +36,7 @@ def get_bug_detail(
     projectId: UUID,
     bugId: UUID,
     db: Session = Depends(get_db),
-    current_user: str = Depends(get_current_user),
+    current_user: UserResponse = Depends(get_current_user),
 ):
     return get_bug_by_id(db, bugId)
 
@@ -40,7 +45,7 @@ def update_bug_route(
     bugId: UUID,
     bug_data: BugUpdated,
     db: Session = Depends(get_db),
-    current_user: str = Depends(get_current_user),
+    current_user: UserResponse = Depends(get_current_user),
 ):
     return update_bug(db, bugId, bug_data, current_user)
 
@@ -48,6 +53,6 @@ def update_bug_route(
 def delete_bug_route(
     bugId: UUID,
     db: Session = Depends(get_db),
-    current_user: str = Depends(get_current_user),
+    current_user: UserResponse = Depends(get_current_user),
 ):
     return delete_bug(db, bugId)
@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Depends
+from app.api.dependencies import get_diagnostics_user
+from app.api.routes import images, google_auth
+from app.core.security import password_pool
+from app.database import engine, async_engine
+
+# Pool sizes, cache keys and hit rates are internal; only the operators named in
+# DIAGNOSTICS_USERS may read them
+router = APIRouter(dependencies=[Depends(get_diagnostics_user)])
+
+@router.get("/image-service")
+def image_service_stats():
+    """Cache and upstream counters for the image service."""
+    return images.image_service.stats()
+
+@router.get("/generation-jobs")
+def generation_jobs_stats():
+    """Replicate job workers: running and queued jobs, outcomes and rejections."""
+    return images.generation_jobs.stats()
+
+@router.get("/db-pool")
+def db_pool_stats():
+    """Checked-out connections, checkout wait histogram and overflow events per engine."""
+    return {
+        "sync": engine.pool.stats(),
+        "async": async_engine.pool.stats(),
+    }
+
+@router.get("/password-hasher")
+def password_hasher_stats():
+    """Busy and queued bcrypt workers, and requests rejected while saturated."""
+    return password_pool.stats()
+
+@router.get("/google-certs")
+def google_certs_stats():
+    """Google signing certificate cache: freshness, hits and refreshes."""
+    return google_auth.cert_cache.stats()
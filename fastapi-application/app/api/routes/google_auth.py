@@ -1,10 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from app.schemas.auth import GoogleAuthRequest, GoogleLoginResponse
 from app.services.auth import handle_google_user
-from google.oauth2 import id_token
-from google.auth.transport import requests
-from google.auth import jwt
+from app.services.google_certs import GoogleCertCache
+from app.core.config import settings
 import os
 from app.api.dependencies import get_db
 
@@ -13,6 +13,13 @@ router = APIRouter()
 GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID")
 GOOGLE_CLIENT_SECRET = os.getenv("GOOGLE_CLIENT_SECRET")
 
+# Signing certificates, refreshed in the background by the app lifespan
+cert_cache = GoogleCertCache(
+    settings.GOOGLE_CERTS_URL,
+    default_ttl=settings.GOOGLE_CERTS_DEFAULT_TTL,
+    refresh_margin=settings.GOOGLE_CERTS_REFRESH_MARGIN,
+)
+
 @router.post("/google", response_model=GoogleLoginResponse)
 async def google_auth(request: GoogleAuthRequest, db: Session = Depends(get_db)):
     try:
@@ -22,10 +29,9 @@ async def google_auth(request: GoogleAuthRequest, db: Session = Depends(get_db))
                 detail="Google OAuth configuration is missing"
             )
 
-        # Verify the Google token with both CLIENT_ID and CLIENT_SECRET
-        idinfo = id_token.verify_oauth2_token(
-            request.token, 
-            requests.Request(), 
+        # Verify the Google token against the cached certificates, off the event loop
+        idinfo = await cert_cache.verify(
+            request.token,
             GOOGLE_CLIENT_ID,
             clock_skew_in_seconds=10  # Allow 10 seconds of clock skew
         )
@@ -43,7 +49,7 @@ async def google_auth(request: GoogleAuthRequest, db: Session = Depends(get_db))
         username = idinfo.get('given_name', email.split('@')[0])
 
         # Handle the Google user authentication
-        return handle_google_user(db, email, username)
+        return await run_in_threadpool(handle_google_user, db, email, username)
 
     except ValueError as e:
         # Invalid token
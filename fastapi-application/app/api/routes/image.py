@@ -1,15 +1,16 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Depends, Response
+from typing import List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.schemas.image import ImageCreate, ImageResponse, LikeRequest
 from app.services.image_service import ImageService
-from app.api.dependencies import get_db
+from app.api.dependencies import get_async_db
+from app.core.config import settings
 
 router = APIRouter()
 image_service = ImageService()
 
 @router.post("/generate", response_model=ImageResponse)
-async def generate_image(image: ImageCreate, db: Session = Depends(get_db)):
+async def generate_image(image: ImageCreate, db: AsyncSession = Depends(get_async_db)):
     """
     Generate a new image based on the provided prompt.
     Does not save to database.
@@ -20,32 +21,35 @@ async def generate_image(image: ImageCreate, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/save", response_model=ImageResponse)
-async def save_image(image: ImageResponse, db: Session = Depends(get_db)):
+async def save_image(image: ImageResponse, db: AsyncSession = Depends(get_async_db)):
     """
     Save a generated image to the database.
     """
     try:
-        return image_service.save_image(db, image)
+        return await image_service.save_image(db, image)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/", response_model=List[ImageResponse])
-async def get_images(db: Session = Depends(get_db)):
+async def get_images(response: Response, cursor: Optional[str] = None, limit: int = settings.DEFAULT_PAGE_SIZE, db: AsyncSession = Depends(get_async_db)):
     """
-    Get all generated images.
+    Get generated images, newest first, one page at a time.
     """
     try:
-        return image_service.get_images(db)
+        images, next_cursor = await image_service.get_images_page(db, cursor, min(limit, settings.MAX_PAGE_SIZE))
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        return images
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.delete("/{image_id}")
-async def delete_image(image_id: str, db: Session = Depends(get_db)):
+async def delete_image(image_id: str, db: AsyncSession = Depends(get_async_db)):
     """
     Delete an image by its ID.
     """
     try:
-        image_service.delete_image(db, image_id)
+        await image_service.delete_image(db, image_id)
         return {"message": "Image deleted successfully"}
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
@@ -53,12 +57,12 @@ async def delete_image(image_id: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/like")
-async def like_image(like_request: LikeRequest, db: Session = Depends(get_db)):
+async def like_image(like_request: LikeRequest, db: AsyncSession = Depends(get_async_db)):
     """
     Update likes for an image (like or unlike).
     """
     try:
-        result = image_service.update_likes(db, like_request.image_id, like_request.action)
+        result = await image_service.update_likes(db, like_request.image_id, like_request.action)
         return {"success": True, "likes": result}
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
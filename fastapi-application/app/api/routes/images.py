@@ -1,18 +1,35 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import FileResponse, RedirectResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 import uuid
 from datetime import datetime
-from app.api.dependencies import get_db
+from app.api.dependencies import get_async_db, get_current_user
+from app.core.config import settings
+from app.core.pagination import decode_cursor
+from app.database import AsyncSessionLocal
 from app.models import Image
-from app.schemas.image import ImageCreate, ImageResponse
-from app.services.image_service import ImageService
+from app.schemas.image import BatchGenerateRequest, BatchGenerateResponse, BulkSaveResponse, GenerationJobCreate, GenerationJobResponse, ImageCreate, ImageResponse, SavedImage, SimilarImage
+from app.schemas.user import UserResponse
+from app.services.generation_jobs import GenerationJob, GenerationJobQueue, JobRejectedError, UserJobLimitError
+from app.services.image_service import IMAGE_CURSOR_KEYS, DuplicateImageError, ImageService
+from app.services.image_store import DisallowedUpstreamError, UpstreamImageError
+from app.services.image_variants import VariantMissingError
 
 router = APIRouter()
 image_service = ImageService()
+# Replicate generation jobs; the workers are started by the app lifespan when a token is set
+generation_jobs = GenerationJobQueue(
+    image_service.generate_image_replicate,
+    workers=settings.GENERATION_JOB_WORKERS,
+    max_queue=settings.GENERATION_JOB_MAX_QUEUE,
+    per_user=settings.GENERATION_JOBS_PER_USER,
+    job_timeout=settings.GENERATION_JOB_TIMEOUT,
+    result_ttl=settings.GENERATION_JOB_RESULT_TTL,
+)
 
 @router.post("/generate", response_model=ImageResponse, status_code=status.HTTP_201_CREATED)
-async def generate_image(image_data: ImageCreate, db: Session = Depends(get_db)):
+async def generate_image(image_data: ImageCreate, db: AsyncSession = Depends(get_async_db)):
     """Generate a new image based on the provided prompt."""
     try:
         return await image_service.generate_image(db, image_data.prompt)
@@ -22,10 +39,140 @@ async def generate_image(image_data: ImageCreate, db: Session = Depends(get_db))
             detail=str(e)
         )
 
-@router.post("", response_model=ImageResponse, status_code=status.HTTP_201_CREATED)
-async def save_image(image_data: ImageResponse, db: Session = Depends(get_db)):
+@router.post("/generate/batch", response_model=BatchGenerateResponse)
+async def generate_images(batch: BatchGenerateRequest, db: AsyncSession = Depends(get_async_db)):
+    """Generate several images at once; each prompt reports its own result, error and timing."""
+    if not 1 <= len(batch.prompts) <= settings.BATCH_GENERATE_MAX_PROMPTS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Send between 1 and {settings.BATCH_GENERATE_MAX_PROMPTS} prompts"
+        )
+    try:
+        return await image_service.generate_images(db, batch.prompts)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+@router.post("/jobs", response_model=GenerationJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_generation_job(job_data: GenerationJobCreate, current_user: UserResponse = Depends(get_current_user)):
+    """Queue a Replicate generation and return the job at once; poll it or follow its events."""
+    if not generation_jobs.started:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Replicate generation is not configured"
+        )
+    try:
+        return generation_jobs.submit(str(current_user.id), job_data.prompt).snapshot()
+    except JobRejectedError as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS if isinstance(e, UserJobLimitError) else status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)}
+        )
+
+def _get_job(job_id: str, current_user: UserResponse) -> GenerationJob:
+    job = generation_jobs.get(job_id)
+    # Other users' jobs are indistinguishable from missing ones
+    if job is None or job.owner != str(current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    return job
+
+@router.get("/jobs/{job_id}", response_model=GenerationJobResponse)
+async def get_generation_job(job_id: str, current_user: UserResponse = Depends(get_current_user)):
+    return _get_job(job_id, current_user).snapshot()
+
+async def _job_events(job: GenerationJob):
+    async for snapshot in generation_jobs.watch(job, settings.GENERATION_JOB_KEEPALIVE):
+        if snapshot is None:
+            yield ": keep-alive\n\n"
+        else:
+            yield f"event: {snapshot.status}\ndata: {snapshot.model_dump_json()}\n\n"
+
+@router.get("/jobs/{job_id}/events")
+async def stream_generation_job(job_id: str, current_user: UserResponse = Depends(get_current_user)):
+    """Server-sent events with the job's state on every change, ending once it succeeds or fails."""
+    job = _get_job(job_id, current_user)
+    return StreamingResponse(
+        _job_events(job),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.post("", response_model=SavedImage, status_code=status.HTTP_201_CREATED)
+async def save_image(image_data: ImageResponse, db: AsyncSession = Depends(get_async_db)):
+    """
+    Save an image. 409 when its URL or a near-identical photo is already
+    saved; 422 when the URL is not one the server may fetch.
+
+    The near-duplicate check needs the photo's bytes. If they cannot be
+    fetched or decoded the image is saved anyway (the upstream being down
+    should not block saving) and duplicate_check is "skipped"; only an exact
+    URL repeat is rejected then. Skips are counted in /diagnostics.
+    """
+    try:
+        return await image_service.save_image(db, image_data)
+    except DuplicateImageError as de:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(de)
+        )
+    except DisallowedUpstreamError as de:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(de)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+@router.post("/bulk", response_model=BulkSaveResponse)
+async def save_images(images: List[ImageResponse], db: AsyncSession = Depends(get_async_db)):
+    """Save a batch of images in one transaction; ids already saved are reported, not rejected."""
+    if len(images) > settings.BULK_SAVE_MAX_IMAGES:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"At most {settings.BULK_SAVE_MAX_IMAGES} images per request"
+        )
+    try:
+        return await image_service.save_images(db, images)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+async def _stream_images(cursor: Optional[str]):
+    # The stream outlives the request's dependencies, so it owns its session
+    async with AsyncSessionLocal() as db:
+        async for line in image_service.iter_images_ndjson(db, cursor):
+            yield line
+
+@router.get("/search", response_model=List[ImageResponse])
+async def search_images(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200, description="Words to look for in the prompt"),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE, description="Page size"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Search saved images by prompt, best match first."""
     try:
-        return image_service.save_image(db, image_data)
+        images, next_cursor = await image_service.search_images(db, q, cursor, limit)
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        return images
+    except ValueError as ve:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(ve)
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -33,19 +180,126 @@ async def save_image(image_data: ImageResponse, db: Session = Depends(get_db)):
         )
 
 @router.get("", response_model=List[ImageResponse])
-async def get_images(db: Session = Depends(get_db)):
+async def get_images(
+    response: Response,
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE, description="Page size"),
+    stream: bool = Query(False, description="Stream every image after the cursor as NDJSON"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Get images newest first, one page at a time or as an NDJSON stream."""
     try:
-        return image_service.get_images(db)
+        if stream:
+            if cursor:
+                decode_cursor(cursor, IMAGE_CURSOR_KEYS)  # Reject a bad cursor before streaming starts
+            return StreamingResponse(_stream_images(cursor), media_type="application/x-ndjson")
+        images, next_cursor = await image_service.get_images_page(db, cursor, limit)
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        return images
+    except ValueError as ve:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(ve)
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
         )
 
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    # If-None-Match uses the weak comparison, so W/"x" matches "x"
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+@router.get("/{image_id}/content")
+async def get_image_content(
+    image_id: str,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """The image bytes, copied from the upstream URL on first access and served locally after."""
+    try:
+        stored = await image_service.get_image_content(db, image_id)
+    except ValueError as ve:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(ve)
+        )
+    except DisallowedUpstreamError as de:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=str(de)
+        )
+    except UpstreamImageError as ue:
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=str(ue)
+        )
+    # The path is the content hash, so the ETag is strong and the bytes never change
+    etag = f'"{stored.digest}"'
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={settings.IMAGE_CONTENT_MAX_AGE}, immutable"}
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    # Range and If-Range are handled by FileResponse against this ETag
+    return FileResponse(stored.path, media_type=stored.media_type, headers=headers)
+
+@router.get("/{image_id}/variants/{width}.webp")
+async def get_image_variant(
+    image_id: str,
+    width: int,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """A downscaled WebP variant; the URLs are listed in the image's srcset."""
+    try:
+        path, digest = await image_service.get_image_variant(db, image_id, width)
+    except ValueError as ve:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(ve)
+        )
+    except VariantMissingError:
+        # Evicted; serve the original until the re-render lands
+        return RedirectResponse(f"/images/{image_id}/content", status_code=status.HTTP_307_TEMPORARY_REDIRECT)
+    # Variants are written once per source hash and width, never rewritten
+    etag = f'"{digest}-{width}"'
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={settings.IMAGE_CONTENT_MAX_AGE}, immutable"}
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return FileResponse(path, media_type="image/webp", headers=headers)
+
+@router.get("/{image_id}/similar", response_model=List[SimilarImage])
+async def get_similar_images(
+    image_id: str,
+    max_distance: int = Query(settings.SIMILAR_IMAGES_MAX_DISTANCE, ge=0, le=10, description="Most hash bits (of 64) that may differ"),
+    limit: int = Query(settings.SIMILAR_IMAGES_LIMIT, ge=1, le=settings.MAX_PAGE_SIZE, description="Most images to return"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Visually similar images by perceptual hash, nearest first."""
+    try:
+        return await image_service.get_similar_images(db, image_id, max_distance, limit)
+    except ValueError as ve:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(ve)
+        )
+    except DisallowedUpstreamError as de:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=str(de)
+        )
+    except UpstreamImageError as ue:
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=str(ue)
+        )
+
 @router.post("/{image_id}/like", status_code=status.HTTP_200_OK)
-async def like_image(image_id: str, db: Session = Depends(get_db)):
+async def like_image(image_id: str, db: AsyncSession = Depends(get_async_db)):
     try:
-        likes = image_service.update_likes(db, image_id, 'like')
+        likes = await image_service.update_likes(db, image_id, 'like')
         return {"success": True, "likes": likes}
     except ValueError as ve:
         raise HTTPException(
@@ -59,9 +313,9 @@ async def like_image(image_id: str, db: Session = Depends(get_db)):
         )
 
 @router.delete("/{image_id}", status_code=status.HTTP_200_OK)
-async def delete_image(image_id: str, db: Session = Depends(get_db)):
+async def delete_image(image_id: str, db: AsyncSession = Depends(get_async_db)):
     try:
-        success = image_service.delete_image(db, image_id)
+        success = await image_service.delete_image(db, image_id)
         if not success:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -1,29 +1,34 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
 from sqlalchemy.orm import Session
 from uuid import UUID
 from app.services.project import create_project, get_project, get_all_projects, update_project, delete_project, add_members_project, delete_members_project
 from app.schemas.project import ProjectCreated, ProjectResponse, ProjectCreateReponse, UpdateProject, UpdateProjectResponse, ProjectMemberResponse
-from app.api.dependencies import get_db, get_current_user
+from app.schemas.user import UserResponse
+from app.api.dependencies import get_db, get_current_user, PageParams
 from fastapi import Query
 
 router = APIRouter()
 
 @router.get("/projects", response_model=list[ProjectResponse])
 def get_projects(
-    current_user: str = Depends(get_current_user),
+    response: Response,
+    current_user: UserResponse = Depends(get_current_user),
     db: Session = Depends(get_db),
     name: str = Query(None, description="Filter by name"),
     sort_by: str = Query("name", regex="^(name|id)$", description="Sort by name or id"),
-    sort_order: str = Query("asc", regex="^(asc|desc)$", description="Sort order (asc or desc)")
+    sort_order: str = Query("asc", regex="^(asc|desc)$", description="Sort order (asc or desc)"),
+    page: PageParams = Depends(),
 ):
-    projects = get_all_projects(db, name=name, sort_by=sort_by, sort_order=sort_order)
+    projects, next_cursor = get_all_projects(db, name=name, sort_by=sort_by, sort_order=sort_order, after=page.after, limit=page.limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return projects
 
 @router.post("/projects", response_model=ProjectResponse)
 def create_projects(
     project_data: ProjectCreated,
     db: Session = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
+    current_user: UserResponse = Depends(get_current_user)
 ):
     """Create a new project"""
     return create_project(db, project_data, current_user)
@@ -32,7 +37,7 @@ def create_projects(
 def get_detail_project(
     project_id: UUID,
     db: Session = Depends(get_db),
-    current_user: str = Depends(get_current_user), 
+    current_user: UserResponse = Depends(get_current_user), 
 ):
     """Get project by ID"""
     return get_project(db, project_id)
@@ -42,7 +47,7 @@ def update_projects(
     project_id: UUID,
     project_data: UpdateProject,
     db: Session = Depends(get_db),
-    current_user: dict = Depends(get_current_user),
+    current_user: UserResponse = Depends(get_current_user),
 ):
     return update_project(db, project_id, project_data, current_user)
 
@@ -51,7 +56,7 @@ def add_members_projects(
     project_id: UUID,
     project_data: UpdateProject,
     db: Session = Depends(get_db),
-    current_user: dict = Depends(get_current_user),
+    current_user: UserResponse = Depends(get_current_user),
 ):
     return add_members_project(db, project_id, project_data, current_user)
 
@@ -60,7 +65,7 @@ def add_members_projects(
     project_id: UUID,
     member_id: UUID,
     db: Session = Depends(get_db),
-    current_user: dict = Depends(get_current_user),
+    current_user: UserResponse = Depends(get_current_user),
 ):
     return delete_members_project(db, project_id, member_id, current_user)
 
@@ -68,6 +73,6 @@ def add_members_projects(
 def delete_projects(
     project_id: UUID,
     db: Session = Depends(get_db),
-    current_user: dict = Depends(get_current_user),
+    current_user: UserResponse = Depends(get_current_user),
 ):
     return delete_project(db, project_id, current_user)
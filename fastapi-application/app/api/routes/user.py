@@ -1,29 +1,33 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
 from sqlalchemy.orm import Session
 from app.schemas.user import UserResponse, UserUpdateRequest
 from app.services.user import update_user, delete_user, get_user_by_id, get_all_users
 from uuid import UUID
-from app.api.dependencies import get_db, get_current_user
+from app.api.dependencies import get_db, get_current_user, PageParams
 from fastapi import Query
 
 router = APIRouter()
 
 @router.get("/", response_model=list[UserResponse])
 def get_user(
-    current_user: str = Depends(get_current_user),
+    response: Response,
+    current_user: UserResponse = Depends(get_current_user),
     db: Session = Depends(get_db),
     username: str = Query(None, description="Filter by username"),
     sort_by: str = Query("username", regex="^(username|id)$", description="Sort by username or id"),
-    sort_order: str = Query("asc", regex="^(asc|desc)$", description="Sort order (asc or desc)")
+    sort_order: str = Query("asc", regex="^(asc|desc)$", description="Sort order (asc or desc)"),
+    page: PageParams = Depends(),
 ):
-    users = get_all_users(db, username=username, sort_by=sort_by, sort_order=sort_order)
+    users, next_cursor = get_all_users(db, username=username, sort_by=sort_by, sort_order=sort_order, after=page.after, limit=page.limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return users
 
 @router.get("/{user_id}", response_model=UserResponse)
 def get_user_by_id_endpoint(
     user_id: UUID, 
     db: Session = Depends(get_db), 
-    current_user: str = Depends(get_current_user)
+    current_user: UserResponse = Depends(get_current_user)
 ):
     return get_user_by_id(db, user_id)
 
@@ -32,7 +36,7 @@ def update_user_route(
     user_id: UUID,
     user_data: UserUpdateRequest,
     db: Session = Depends(get_db),
-    current_user: str = Depends(get_current_user)
+    current_user: UserResponse = Depends(get_current_user)
 ):
     return update_user(db, user_id, user_data)
 
@@ -40,6 +44,6 @@ def update_user_route(
 def delete_user_route(
     user_id: UUID,
     db: Session = Depends(get_db),
-    current_user: str = Depends(get_current_user)
+    current_user: UserResponse = Depends(get_current_user)
 ):
     return delete_user(db, user_id)
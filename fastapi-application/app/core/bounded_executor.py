@@ -0,0 +1,75 @@
+import asyncio
+import os
+import sys
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+
+class PoolSaturatedError(RuntimeError):
+    """The pool's queue is full; the request should be shed, not queued."""
+
+
+class BoundedExecutor:
+    """
+    Thread pool with admission control for CPU-heavy calls.
+
+    At most `max_workers` calls run at once and at most `max_queue` more
+    wait for a worker. Anything beyond that is rejected immediately with
+    PoolSaturatedError instead of piling up behind a burst. On Linux the
+    workers can run at a lower scheduling priority (`nice`), so that on a
+    busy CPU the event loop and request threads are served first.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int, name: str, nice: int = 0):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        # nice() is per thread on Linux; elsewhere it would renice the whole process
+        initializer = None
+        if nice and sys.platform.startswith("linux"):
+            initializer = lambda: os.nice(nice)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name, initializer=initializer)
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise PoolSaturatedError("Server is busy, try again shortly")
+        with self._lock:
+            self.in_flight += 1
+        future = self._executor.submit(fn, *args)
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, future: Future) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            self.completed += 1
+        self._slots.release()
+
+    def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run `fn` in the pool and wait for it from a worker thread."""
+        return self.submit(fn, *args).result()
+
+    async def run_async(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run `fn` in the pool without blocking the event loop."""
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "in_flight": self.in_flight,
+                "queued": max(0, self.in_flight - self.max_workers),
+                "completed": self.completed,
+                "rejected": self.rejected,
+            }
@@ -0,0 +1,113 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+def estimate_size(value: Any) -> int:
+    """Rough size in bytes of a JSON-like value (its serialized length)."""
+    return len(json.dumps(value, default=str))
+
+
+class TTLCache:
+    """
+    Bounded in-process cache with LRU eviction and a per-entry TTL.
+
+    Bounded both by entry count and by an approximate byte budget; sizes are
+    measured once on insert with `sizeof`. Operations take a lock, so the
+    cache can be shared between the event loop and threadpool workers.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl: float,
+        max_bytes: Optional[int] = None,
+        sizeof: Callable[[Any], int] = estimate_size,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()  # key -> (value, expires_at, size)
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._data.get(key)
+        return entry is not None and entry[1] > time.monotonic()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            value, expires_at, _ = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        size = self.sizeof(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return  # Would evict everything else and still not fit
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+            self._data[key] = (value, expires_at, size)
+            self.current_bytes += size
+            self._evict()
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            if key not in self._data:
+                return default
+            value = self._data[key][0]
+            self._remove(key)
+            return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "max_entries": self.max_entries,
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    def _remove(self, key: Hashable) -> None:
+        _, _, size = self._data.pop(key)
+        self.current_bytes -= size
+
+    def _evict(self) -> None:
+        while len(self._data) > self.max_entries or (
+            self.max_bytes is not None and self.current_bytes > self.max_bytes
+        ):
+            key = next(iter(self._data))
+            self._remove(key)
+            self.evictions += 1
@@ -12,5 +12,123 @@ class Settings:
     DB_NAME = os.getenv("DB_NAME")
 
     DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+    ASYNC_DATABASE_URL = f"postgresql+asyncpg://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+
+    # Connection pool (applies to both the sync and the async engine)
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "30000"))  # 0 disables
+
+    # List endpoints (cursor pagination)
+    DEFAULT_PAGE_SIZE = int(os.getenv("DEFAULT_PAGE_SIZE", "50"))
+    MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "200"))
+    STREAM_BATCH_SIZE = int(os.getenv("STREAM_BATCH_SIZE", "500"))
+    BULK_SAVE_MAX_IMAGES = int(os.getenv("BULK_SAVE_MAX_IMAGES", "1000"))
+
+    # POST /images/generate/batch: prompts per request and concurrent generations per batch
+    BATCH_GENERATE_MAX_PROMPTS = int(os.getenv("BATCH_GENERATE_MAX_PROMPTS", "12"))
+    BATCH_GENERATE_CONCURRENCY = int(os.getenv("BATCH_GENERATE_CONCURRENCY", "6"))
+
+    # Outbound HTTP client shared by the image service (Pexels)
+    PEXELS_API_URL = os.getenv("PEXELS_API_URL", "https://api.pexels.com/v1")
+    HTTP_HTTP2 = os.getenv("HTTP_HTTP2", "true").lower() == "true"
+    HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+    HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+    HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+    HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+    HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "10"))
+    HTTP_POOL_TIMEOUT = float(os.getenv("HTTP_POOL_TIMEOUT", "5"))
+
+    # Local content-addressed copy of upstream images, served by GET /images/{id}/content
+    IMAGE_STORE_DIR = os.getenv("IMAGE_STORE_DIR", "image_store")
+    IMAGE_STORE_MAX_BYTES = int(os.getenv("IMAGE_STORE_MAX_BYTES", str(1024 * 1024 * 1024)))
+    IMAGE_STORE_MAX_OBJECT_BYTES = int(os.getenv("IMAGE_STORE_MAX_OBJECT_BYTES", str(20 * 1024 * 1024)))
+    # Hosts the store may fetch image URLs from ("*." entries match subdomains): Pexels and Replicate output
+    IMAGE_UPSTREAM_HOSTS = [
+        host.strip() for host in os.getenv("IMAGE_UPSTREAM_HOSTS", "images.pexels.com,replicate.delivery,*.replicate.delivery").split(",")
+        if host.strip()
+    ]
+    # Skip the public-address check, for local stand-in CDNs only
+    IMAGE_UPSTREAM_ALLOW_PRIVATE = os.getenv("IMAGE_UPSTREAM_ALLOW_PRIVATE", "false").lower() == "true"
+    IMAGE_CONTENT_MAX_AGE = int(os.getenv("IMAGE_CONTENT_MAX_AGE", "31536000"))  # Cache-Control, seconds
+    IMAGE_CONTENT_DIGEST_CACHE_ENTRIES = int(os.getenv("IMAGE_CONTENT_DIGEST_CACHE_ENTRIES", "100000"))
+    IMAGE_CONTENT_DIGEST_CACHE_TTL = float(os.getenv("IMAGE_CONTENT_DIGEST_CACHE_TTL", "3600"))
+
+    # Downscaled WebP variants rendered in a process pool after save
+    IMAGE_VARIANTS_ENABLED = os.getenv("IMAGE_VARIANTS_ENABLED", "true").lower() == "true"
+    IMAGE_VARIANT_DIR = os.getenv("IMAGE_VARIANT_DIR", "image_variants")
+    IMAGE_VARIANT_WIDTHS = [int(width) for width in os.getenv("IMAGE_VARIANT_WIDTHS", "128,256,512").split(",")]
+    IMAGE_VARIANT_QUALITY = int(os.getenv("IMAGE_VARIANT_QUALITY", "80"))
+    IMAGE_VARIANT_METHOD = int(os.getenv("IMAGE_VARIANT_METHOD", "2"))  # WebP effort 0-6: 2 is ~2.5x faster than 4, ~3% larger
+    IMAGE_VARIANT_WORKERS = int(os.getenv("IMAGE_VARIANT_WORKERS", str(os.cpu_count() or 1)))
+    IMAGE_VARIANT_MAX_PENDING = int(os.getenv("IMAGE_VARIANT_MAX_PENDING", "10000"))
+    IMAGE_VARIANT_MAX_BYTES = int(os.getenv("IMAGE_VARIANT_MAX_BYTES", str(512 * 1024 * 1024)))
+    IMAGE_VARIANT_NICE = int(os.getenv("IMAGE_VARIANT_NICE", "10"))  # 0 disables
+
+    # Perceptual-hash near-duplicate rejection on save and GET /images/{id}/similar
+    IMAGE_DEDUPE_ENABLED = os.getenv("IMAGE_DEDUPE_ENABLED", "true").lower() == "true"
+    IMAGE_DUPLICATE_DISTANCE = int(os.getenv("IMAGE_DUPLICATE_DISTANCE", "4"))  # Bits of 64; re-encodes and resizes stay within ~2
+    SIMILAR_IMAGES_MAX_DISTANCE = int(os.getenv("SIMILAR_IMAGES_MAX_DISTANCE", "10"))
+    SIMILAR_IMAGES_LIMIT = int(os.getenv("SIMILAR_IMAGES_LIMIT", "12"))
+
+    # In-process cache of Pexels search results
+    SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "256"))
+    SEARCH_CACHE_MAX_BYTES = int(os.getenv("SEARCH_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+    SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", "3600"))
+
+    # Background pool of ready-to-serve suggestion images
+    PREFETCH_ENABLED = os.getenv("PREFETCH_ENABLED", "true").lower() == "true"
+    PREFETCH_LOW_WATERMARK = int(os.getenv("PREFETCH_LOW_WATERMARK", "2"))
+    PREFETCH_HIGH_WATERMARK = int(os.getenv("PREFETCH_HIGH_WATERMARK", "5"))
+    PREFETCH_REFILL_INTERVAL = float(os.getenv("PREFETCH_REFILL_INTERVAL", "30"))
+    PREFETCH_REFILLS_PER_SWEEP = int(os.getenv("PREFETCH_REFILLS_PER_SWEEP", "4"))  # Pexels calls per interval, at most
+    PREFETCH_MAX_BACKOFF = float(os.getenv("PREFETCH_MAX_BACKOFF", "900"))  # After repeated refill errors
+
+    # Write-behind like aggregation (off by default)
+    LIKES_WRITE_BEHIND = os.getenv("LIKES_WRITE_BEHIND", "false").lower() == "true"
+    LIKES_FLUSH_INTERVAL_MS = int(os.getenv("LIKES_FLUSH_INTERVAL_MS", "500"))
+    LIKES_FLUSH_MAX_EVENTS = int(os.getenv("LIKES_FLUSH_MAX_EVENTS", "1000"))
+
+    # Password hashing (bcrypt) in a bounded pool; BCRYPT_ROUNDS applies to new hashes
+    BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1)))
+    PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "8"))
+    PASSWORD_HASH_NICE = int(os.getenv("PASSWORD_HASH_NICE", "10"))  # Linux only, 0 disables
+
+    # Verified JWT claims and current-user lookups for authenticated requests
+    JWT_CACHE_MAX_ENTRIES = int(os.getenv("JWT_CACHE_MAX_ENTRIES", "10000"))
+    USER_CACHE_MAX_ENTRIES = int(os.getenv("USER_CACHE_MAX_ENTRIES", "10000"))
+    # Updates and deletes drop the cached user only in the worker that made them; the
+    # other workers keep serving the old user (a deleted one included) for up to this
+    # many seconds, so keep it short. 0 turns the user cache off
+    USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", "5"))
+
+    # Usernames allowed to read /diagnostics/*; empty (the default) closes them to everyone.
+    # Signup is open, so list only accounts that are already registered
+    DIAGNOSTICS_USERS = {
+        name.strip() for name in os.getenv("DIAGNOSTICS_USERS", "").split(",") if name.strip()
+    }
+
+    # Google ID token signing certificates (cached per Cache-Control)
+    GOOGLE_CERTS_URL = os.getenv("GOOGLE_CERTS_URL", "https://www.googleapis.com/oauth2/v1/certs")
+    GOOGLE_CERTS_DEFAULT_TTL = float(os.getenv("GOOGLE_CERTS_DEFAULT_TTL", "300"))
+    GOOGLE_CERTS_REFRESH_MARGIN = float(os.getenv("GOOGLE_CERTS_REFRESH_MARGIN", "60"))
+
+    # Replicate (SDXL) generation jobs, run by a bounded pool of async workers
+    REPLICATE_API_URL = os.getenv("REPLICATE_API_URL", "https://api.replicate.com")
+    REPLICATE_MODEL_VERSION = os.getenv(
+        "REPLICATE_MODEL_VERSION",
+        "stability-ai/sdxl:39ed52f2a78e934b3ba6e2a89f5b1c712de7dfea535525255b1aa35c5565e08b",
+    )
+    REPLICATE_POLL_INTERVAL = float(os.getenv("REPLICATE_POLL_INTERVAL", "1.0"))
+    GENERATION_JOB_WORKERS = int(os.getenv("GENERATION_JOB_WORKERS", "4"))
+    GENERATION_JOB_MAX_QUEUE = int(os.getenv("GENERATION_JOB_MAX_QUEUE", "32"))
+    GENERATION_JOBS_PER_USER = int(os.getenv("GENERATION_JOBS_PER_USER", "2"))  # queued + running
+    GENERATION_JOB_TIMEOUT = float(os.getenv("GENERATION_JOB_TIMEOUT", "300"))
+    GENERATION_JOB_RESULT_TTL = float(os.getenv("GENERATION_JOB_RESULT_TTL", "3600"))
+    GENERATION_JOB_KEEPALIVE = float(os.getenv("GENERATION_JOB_KEEPALIVE", "15"))  # SSE comment interval
 
 settings = Settings()
@@ -0,0 +1,81 @@
+import bisect
+import threading
+import time
+from typing import Dict, List
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# Upper bounds (ms) of the checkout wait histogram buckets; the last is +inf
+WAIT_BUCKETS_MS = [1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000]
+
+
+class PoolMetrics:
+    """Checkout wait histogram plus overflow/timeout counters for one pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.bucket_counts: List[int] = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self.checkouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.overflow_events = 0
+        self.timeouts = 0
+
+    def observe_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.bucket_counts[bisect.bisect_left(WAIT_BUCKETS_MS, seconds * 1000)] += 1
+            self.checkouts += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            labels = [f"le_{bound}ms" for bound in WAIT_BUCKETS_MS] + ["le_inf"]
+            return {
+                "checkouts": self.checkouts,
+                "wait_ms_avg": self.wait_total / self.checkouts * 1000 if self.checkouts else 0.0,
+                "wait_ms_max": self.wait_max * 1000,
+                "wait_ms_histogram": dict(zip(labels, self.bucket_counts)),
+                "overflow_events": self.overflow_events,
+                "timeouts": self.timeouts,
+            }
+
+
+class InstrumentedPoolMixin:
+    """Times every checkout and counts overflow connections and timeouts."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self):
+        overflow_before = self._overflow
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.timeouts += 1
+            raise
+        finally:
+            self.metrics.observe_wait(time.perf_counter() - start)
+        if self._overflow > max(overflow_before, 0):
+            self.metrics.overflow_events += 1
+        return connection
+
+    def stats(self) -> Dict:
+        return {
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            "checked_in": self.checkedin(),
+            "overflow": max(self.overflow(), 0),
+            **self.metrics.snapshot(),
+        }
+
+
+class InstrumentedQueuePool(InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
@@ -0,0 +1,17 @@
+import httpx
+from app.core.config import settings
+
+def create_http_client() -> httpx.AsyncClient:
+    """Build the app-wide async HTTP client (keep-alive, HTTP/2, bounded pool)."""
+    limits = httpx.Limits(
+        max_connections=settings.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+    )
+    timeout = httpx.Timeout(
+        connect=settings.HTTP_CONNECT_TIMEOUT,
+        read=settings.HTTP_READ_TIMEOUT,
+        write=settings.HTTP_READ_TIMEOUT,
+        pool=settings.HTTP_POOL_TIMEOUT,
+    )
+    return httpx.AsyncClient(http2=settings.HTTP_HTTP2, limits=limits, timeout=timeout)
@@ -0,0 +1,98 @@
+import base64
+import enum
+import json
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from sqlalchemy import func, tuple_
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, uuid.UUID):
+        return {"uuid": str(value)}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        return uuid.UUID(value["uuid"])
+    return value
+
+
+def encode_cursor(values: Dict[str, Any]) -> str:
+    """Opaque, URL-safe cursor for the last row of a page."""
+    payload = {key: _encode_value(value) for key, value in values.items()}
+    raw = json.dumps(payload, default=str, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, keys: Mapping[str, Any]) -> Dict[str, Any]:
+    """
+    Inverse of encode_cursor. `keys` maps each value the page query needs
+    to its expected type (or tuple of types). Raises ValueError for a
+    malformed cursor, including a well-formed one that lacks any of the
+    keys or holds a value of the wrong type, so it never reaches the query.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        after = {key: _decode_value(value) for key, value in payload.items()}
+    except (ValueError, TypeError, KeyError, AttributeError):
+        raise ValueError("Invalid cursor")
+    for key, types in keys.items():
+        value = after.get(key)
+        # JSON true/false would otherwise pass as the int 1/0
+        if isinstance(value, bool) or not isinstance(value, types):
+            raise ValueError("Invalid cursor")
+    return after
+
+
+def _sort_bound(sort_column, value: Any) -> Any:
+    """The cursor's sort value as the column's Python type. Raises ValueError if it is not one."""
+    python_type = sort_column.type.python_type
+    if issubclass(python_type, enum.Enum):
+        try:
+            return python_type(value)
+        except (ValueError, TypeError):
+            raise ValueError("Invalid cursor")
+    if not isinstance(value, python_type):
+        # e.g. a cursor from ?sort_by=title replayed with ?sort_by=id
+        raise ValueError("Invalid cursor")
+    return value
+
+
+def paginate(query, sort_column, id_column, sort_order: str, after: Optional[Dict[str, Any]], limit: int) -> Tuple[List, Optional[str]]:
+    """
+    Keyset-paginate an ORM query on (sort_column, id_column).
+
+    The id column breaks ties, so the order is stable even when sort values
+    repeat. A nullable text sort column pages on its value with NULL read as
+    '', since a row comparison against NULL never holds and those rows would
+    be skipped. `after` is a decoded cursor from the previous page. Returns
+    the rows and the cursor for the next page, or None on the last page.
+    Raises ValueError if the cursor's sort value does not fit the column.
+    """
+    sort_key = func.coalesce(sort_column, "") if sort_column.nullable else sort_column
+    descending = sort_order == "desc"
+    if descending:
+        query = query.order_by(sort_key.desc(), id_column.desc())
+    else:
+        query = query.order_by(sort_key.asc(), id_column.asc())
+    if after:
+        key = tuple_(sort_key, id_column)
+        bound = (_sort_bound(sort_column, after["sort"]), after["id"])
+        query = query.filter(key < bound if descending else key > bound)
+
+    rows = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        sort_value = getattr(last, sort_column.key)
+        next_cursor = encode_cursor({"sort": "" if sort_value is None else sort_value, "id": getattr(last, id_column.key)})
+    return rows, next_cursor
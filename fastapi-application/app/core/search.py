@@ -0,0 +1,29 @@
+from sqlalchemy import Index
+
+# LIKE metacharacters in user input are matched literally
+_LIKE_ESCAPE = "\\"
+
+
+def ilike_contains(column, term: str):
+    """
+    Case-insensitive substring filter. On Postgres this is a plain ILIKE with a
+    literal pattern, which the planner can serve from a pg_trgm GIN index
+    (for terms of 3+ characters). Other backends run the same filter as
+    lower(column) LIKE lower(pattern), without an index.
+    """
+    escaped = (
+        term.replace(_LIKE_ESCAPE, _LIKE_ESCAPE * 2)
+        .replace("%", _LIKE_ESCAPE + "%")
+        .replace("_", _LIKE_ESCAPE + "_")
+    )
+    return column.ilike(f"%{escaped}%", escape=_LIKE_ESCAPE)
+
+
+def trigram_index(name: str, column: str) -> Index:
+    """GIN trigram index for ilike_contains; only created on Postgres."""
+    return Index(
+        name,
+        column,
+        postgresql_using="gin",
+        postgresql_ops={column: "gin_trgm_ops"},
+    ).ddl_if(dialect="postgresql")
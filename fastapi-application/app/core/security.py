@@ -3,17 +3,43 @@ import jwt  # PyJWT
 from datetime import datetime, timedelta, timezone
 from dotenv import load_dotenv
 import os
+import hashlib
+import time
+from app.core.bounded_executor import BoundedExecutor
+from app.core.cache import TTLCache
+from app.core.config import settings
 
 load_dotenv()
 
-def hash_password(password: str):    
-    salt = bcrypt.gensalt()
-    hashed_password = (bcrypt.hashpw(password.encode('utf-8'), salt)).decode('utf-8')
-    return hashed_password
+# bcrypt runs here rather than on the request threads, so a login burst
+# cannot take every worker; past the queue limit callers get a fast 503
+password_pool = BoundedExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+    name="bcrypt",
+    nice=settings.PASSWORD_HASH_NICE,
+)
 
-def verify_password(password: str, hashed_password: str):
+def _hashpw(password: str) -> str:
+    salt = bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)
+    return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+
+def _checkpw(password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
 
+def hash_password(password: str):
+    return password_pool.run(_hashpw, password)
+
+def verify_password(password: str, hashed_password: str):
+    # The cost factor comes from the stored hash, not BCRYPT_ROUNDS
+    return password_pool.run(_checkpw, password, hashed_password)
+
+async def hash_password_async(password: str):
+    return await password_pool.run_async(_hashpw, password)
+
+async def verify_password_async(password: str, hashed_password: str):
+    return await password_pool.run_async(_checkpw, password, hashed_password)
+
 # Secret key for signing JWT
 SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = os.getenv("ALGORITHM")
@@ -26,12 +52,22 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
+# Claims of tokens that already passed verification, keyed by token digest.
+# An entry lives until the token's own exp, so expiry is still enforced.
+verified_tokens = TTLCache(max_entries=settings.JWT_CACHE_MAX_ENTRIES, ttl=0)
+
 def decode_access_token(token: str) -> dict:
     """Decode JWT token."""
+    key = hashlib.sha256(token.encode()).digest()
+    payload = verified_tokens.get(key)
+    if payload is not None:
+        return dict(payload)
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
     except jwt.ExpiredSignatureError:
         return {"error": "Token expired"}
     except jwt.InvalidTokenError:
         return {"error": "Invalid token"}
+    if "exp" in payload:
+        verified_tokens.set(key, payload, ttl=payload["exp"] - time.time())
+    return dict(payload)
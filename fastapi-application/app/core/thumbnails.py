@@ -0,0 +1,84 @@
+import os
+from typing import List
+
+from PIL import Image as PILImage, ImageOps
+
+# Kept free of app imports: worker processes load only this module.
+
+
+def variant_dir(root: str, digest: str) -> str:
+    """Directory holding the variants of one source image, keyed by its content hash."""
+    return os.path.join(root, digest[:2], digest[2:4], digest)
+
+
+def variant_path(root: str, digest: str, width: int) -> str:
+    return os.path.join(variant_dir(root, digest), f"{width}.webp")
+
+
+def existing_widths(out_dir: str) -> List[int]:
+    try:
+        return sorted(int(name[:-5]) for name in os.listdir(out_dir) if name.endswith(".webp"))
+    except FileNotFoundError:
+        return []
+
+
+def render_variants(
+    source_path: str,
+    out_dir: str,
+    widths: List[int],
+    quality: int,
+    method: int,
+    draft: bool = True,
+) -> List[int]:
+    """
+    Write a WebP downscale of the source for each width no wider than the
+    source itself, and return the widths written. Runs in a worker process.
+
+    Each size is resized from the next larger one rather than from the
+    source, and JPEG sources are decoded at a reduced scale (draft) close
+    to the largest width, which skips most of the decode work on large
+    photos. `method` is the WebP encoder effort (0-6).
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    written = []
+    with PILImage.open(source_path) as source:
+        if draft:
+            largest = max(widths)
+            source.draft("RGB", (largest, largest))
+        image = ImageOps.exif_transpose(source)
+        image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+        for width in sorted(widths, reverse=True):
+            if width > image.width:
+                continue
+            height = max(1, round(image.height * width / image.width))
+            image = image.resize((width, height), PILImage.BICUBIC, reducing_gap=2.0)
+            path = os.path.join(out_dir, f"{width}.webp")
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            image.save(tmp_path, "WEBP", quality=quality, method=method)
+            os.replace(tmp_path, path)
+            written.append(width)
+    return sorted(written)
+
+
+def lower_priority(nice: int) -> None:
+    """Process pool initializer: run renders behind request handling on a busy CPU."""
+    if nice:
+        os.nice(nice)
+
+
+def difference_hash(source_path: str) -> int:
+    """
+    64-bit dHash of an image: one bit per horizontally adjacent pixel pair
+    of a 9x8 grayscale thumbnail, set when brightness increases. Re-encoded,
+    resized or lightly edited copies of a photo land within a few bits of
+    each other. Cheap enough for a thread: JPEGs are decoded at 1/8 scale.
+    """
+    with PILImage.open(source_path) as source:
+        source.draft("L", (64, 64))
+        image = ImageOps.exif_transpose(source).convert("L").resize((9, 8), PILImage.BOX)
+    pixels = image.tobytes()
+    bits = 0
+    for row in range(0, 72, 9):
+        for col in range(row, row + 8):
+            bits = (bits << 1) | (pixels[col] < pixels[col + 1])
+    return bits
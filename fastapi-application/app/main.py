@@ -1,7 +1,17 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
-from app.database import engine, Base
-from app.api.routes import images, auth, google_auth  # Import images router
+from app.database import engine, async_engine, Base, AsyncSessionLocal
+from app.api.routes import images, auth, google_auth, diagnostics  # Import images router
+from app.core.http import create_http_client
+from app.core.config import settings
+from app.core.bounded_executor import PoolSaturatedError
+from app.services.image_service import AVAILABLE_ANIMALS
+from app.services.prefetch_pool import PrefetchPool
+from app.services.like_buffer import LikeBuffer
+from app.services.image_store import ImageStore
+from app.services.image_variants import VariantPipeline
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 import os
 from dotenv import load_dotenv
@@ -12,7 +22,85 @@ load_dotenv()
 async def lifespan(app: FastAPI):
     print("Starting App...")
     Base.metadata.create_all(bind=engine)  # Create database tables
-    yield
+    # One pooled HTTP client for the whole app, shared with the image service and the Google cert cache
+    async with create_http_client() as http_client:
+        app.state.http_client = http_client
+        images.image_service.http_client = http_client
+        google_auth.cert_cache.http_client = http_client
+        image_store = ImageStore(
+            settings.IMAGE_STORE_DIR,
+            max_bytes=settings.IMAGE_STORE_MAX_BYTES,
+            max_object_bytes=settings.IMAGE_STORE_MAX_OBJECT_BYTES,
+            http_client=http_client,
+            allowed_hosts=settings.IMAGE_UPSTREAM_HOSTS,
+            allow_private=settings.IMAGE_UPSTREAM_ALLOW_PRIVATE,
+        )
+        await run_in_threadpool(image_store.load)
+        images.image_service.image_store = image_store
+
+        variant_pipeline = None
+        if settings.IMAGE_VARIANTS_ENABLED:
+            variant_pipeline = VariantPipeline(
+                images.image_service,
+                AsyncSessionLocal,
+                settings.IMAGE_VARIANT_DIR,
+                widths=settings.IMAGE_VARIANT_WIDTHS,
+                quality=settings.IMAGE_VARIANT_QUALITY,
+                method=settings.IMAGE_VARIANT_METHOD,
+                workers=settings.IMAGE_VARIANT_WORKERS,
+                max_pending=settings.IMAGE_VARIANT_MAX_PENDING,
+                max_bytes=settings.IMAGE_VARIANT_MAX_BYTES,
+                nice=settings.IMAGE_VARIANT_NICE,
+            )
+            variant_pipeline.start()
+            images.image_service.variant_pipeline = variant_pipeline
+        if google_auth.GOOGLE_CLIENT_ID:
+            google_auth.cert_cache.start()
+
+        prefetch_pool = None
+        if settings.PREFETCH_ENABLED and images.image_service.pexels_api_key:
+            prefetch_pool = PrefetchPool(
+                images.image_service,
+                AVAILABLE_ANIMALS,
+                low_watermark=settings.PREFETCH_LOW_WATERMARK,
+                high_watermark=settings.PREFETCH_HIGH_WATERMARK,
+                refill_interval=settings.PREFETCH_REFILL_INTERVAL,
+                refills_per_sweep=settings.PREFETCH_REFILLS_PER_SWEEP,
+                max_backoff=settings.PREFETCH_MAX_BACKOFF,
+            )
+            images.image_service.prefetch_pool = prefetch_pool
+            prefetch_pool.start()
+
+        if images.image_service.client is not None:
+            images.generation_jobs.start()
+
+        like_buffer = None
+        if settings.LIKES_WRITE_BEHIND:
+            like_buffer = LikeBuffer(
+                AsyncSessionLocal,
+                flush_interval=settings.LIKES_FLUSH_INTERVAL_MS / 1000,
+                max_events=settings.LIKES_FLUSH_MAX_EVENTS,
+            )
+            images.image_service.like_buffer = like_buffer
+            like_buffer.start()
+
+        yield
+
+        if like_buffer is not None:
+            await like_buffer.stop()  # Flush buffered likes before exit
+            images.image_service.like_buffer = None
+        await images.generation_jobs.stop()
+        if variant_pipeline is not None:
+            await variant_pipeline.stop()
+            images.image_service.variant_pipeline = None
+        if prefetch_pool is not None:
+            await prefetch_pool.stop()
+            images.image_service.prefetch_pool = None
+        await google_auth.cert_cache.stop()
+        google_auth.cert_cache.http_client = None
+        images.image_service.image_store = None
+        images.image_service.http_client = None
+    await async_engine.dispose()
     print("Shutting Down App...")
 
 app = FastAPI(
@@ -22,6 +110,11 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+@app.exception_handler(PoolSaturatedError)
+async def pool_saturated_handler(request: Request, exc: PoolSaturatedError):
+    """Shed load from a saturated worker pool instead of queueing without bound."""
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+
 # CORS configuration - Development settings
 app.add_middleware(
     CORSMiddleware,
@@ -29,12 +122,16 @@ app.add_middleware(
     allow_credentials=False,  # Set to False when using allow_origins=["*"]
     allow_methods=["*"],
     allow_headers=["*"],
+    # List endpoints return the next page's cursor in this header; browsers
+    # on another origin only let scripts read headers listed here
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Include routers
 app.include_router(images.router, prefix="/images", tags=["images"])
 app.include_router(auth.router, prefix="/auth", tags=["auth"])
 app.include_router(google_auth.router, prefix="/auth", tags=["auth"])  # Add Google auth routes
+app.include_router(diagnostics.router, prefix="/diagnostics", tags=["diagnostics"])
 
 @app.get("/")
 async def root():
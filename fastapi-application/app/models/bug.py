@@ -4,6 +4,7 @@ from sqlalchemy.orm import relationship
 from app.models import BaseModel
 from sqlalchemy import Enum, Boolean, DateTime
 import enum
+from app.core.search import trigram_index
 
 class PriorityEnum(str, enum.Enum):
     low = "low"
@@ -29,3 +30,7 @@ class Bug(BaseModel):
     project = relationship("Project", back_populates="bug")
     createdBy = relationship("User", foreign_keys=[createdById])
     updatedBy = relationship("User", foreign_keys=[updatedById])
+
+    __table_args__ = (
+        trigram_index("ix_bug_title_trgm", "title"),
+    )
@@ -1,6 +1,7 @@
-from sqlalchemy import Column, String, DateTime, Integer, Boolean
+from sqlalchemy import BigInteger, Column, String, DateTime, Integer, Boolean, Index, DDL, event
 from sqlalchemy.sql import func
 from app.database import Base
+from app.core.search import trigram_index
 
 class Image(Base):
     __tablename__ = "images"
@@ -12,6 +13,48 @@ class Image(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     is_suggested = Column(Boolean, nullable=True)
     original_input = Column(String, nullable=True)
+    # sha256 of the bytes behind url, once cached by the local content store
+    content_sha256 = Column(String(64), nullable=True)
+    # Comma-separated widths of the WebP variants rendered for this image
+    variant_widths = Column(String, nullable=True)
+    # 64-bit dHash of the image, two's-complement (see app/services/image_similarity.py)
+    phash = Column(BigInteger, nullable=True)
+    # Its four 16-bit substrings, indexed for Hamming-distance lookups
+    phash_0 = Column(Integer, nullable=True, index=True)
+    phash_1 = Column(Integer, nullable=True, index=True)
+    phash_2 = Column(Integer, nullable=True, index=True)
+    phash_3 = Column(Integer, nullable=True, index=True)
+
+    # Keyset pagination of the gallery walks (created_at, id) newest first
+    __table_args__ = (
+        Index("ix_images_created_at_id", "created_at", "id"),
+        trigram_index("ix_images_prompt_trgm", "prompt"),
+        # Exact-URL duplicate check on save
+        Index("ix_images_url", "url"),
+    )
 
     class Config:
-        orm_mode = True 
\ No newline at end of file
+        orm_mode = True
+
+
+PHASH_CHUNK_COLUMNS = ("phash_0", "phash_1", "phash_2", "phash_3")
+
+# Full-text search over the prompt and the user's original input. The
+# generated tsvector column only exists on Postgres, so it is not mapped;
+# queries reach it through SEARCH_VECTOR_COLUMN (see ImageService.search_images).
+SEARCH_VECTOR_COLUMN = "search_vector"
+SEARCH_VECTOR_SQL = "to_tsvector('english', coalesce(prompt, '') || ' ' || coalesce(original_input, ''))"
+
+event.listen(
+    Image.__table__,
+    "after_create",
+    DDL(
+        f"ALTER TABLE images ADD COLUMN {SEARCH_VECTOR_COLUMN} tsvector "
+        f"GENERATED ALWAYS AS ({SEARCH_VECTOR_SQL}) STORED"
+    ).execute_if(dialect="postgresql"),
+)
+event.listen(
+    Image.__table__,
+    "after_create",
+    DDL(f"CREATE INDEX ix_images_search_vector ON images USING gin ({SEARCH_VECTOR_COLUMN})").execute_if(dialect="postgresql"),
+)
@@ -2,6 +2,7 @@ from sqlalchemy import Column, Integer, String, UUID
 from sqlalchemy.orm import relationship
 from app.models.basemodel import BaseModel
 from sqlalchemy import ForeignKey
+from app.core.search import trigram_index
 
 class Note(BaseModel):
     __tablename__ = "note"
@@ -12,3 +13,7 @@ class Note(BaseModel):
 
     # Relationships
     author = relationship("User", foreign_keys=[authorId])
+
+    __table_args__ = (
+        trigram_index("ix_note_body_trgm", "body"),
+    )
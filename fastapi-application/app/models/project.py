@@ -2,6 +2,7 @@ from sqlalchemy import Column, Integer, String, UUID
 from sqlalchemy.orm import relationship
 from app.models.basemodel import BaseModel
 from sqlalchemy import ForeignKey
+from app.core.search import trigram_index
 
 class Project(BaseModel):
     __tablename__ = "project"
@@ -13,3 +14,7 @@ class Project(BaseModel):
     createdBy = relationship("User", back_populates="created_projects")  # Link to User
     members = relationship("ProjectMember", back_populates="project", cascade="all, delete-orphan")  
     bug = relationship("Bug", back_populates="project", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        trigram_index("ix_project_name_trgm", "name"),
+    )
@@ -1,6 +1,7 @@
 from sqlalchemy import Column, String, Boolean
 from app.models import BaseModel
 from sqlalchemy.orm import relationship
+from app.core.search import trigram_index
 
 class User(BaseModel):
     __tablename__ = "user"
@@ -12,3 +13,7 @@ class User(BaseModel):
     # Many-to-Many Relationship
     created_projects = relationship("Project", back_populates="createdBy")
     project_member = relationship("ProjectMember", back_populates="members")
+
+    __table_args__ = (
+        trigram_index("ix_user_username_trgm", "username"),
+    )
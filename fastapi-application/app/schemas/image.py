@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional, Literal
+from typing import List, Optional, Literal
 
 class ImageBase(BaseModel):
     prompt: str
@@ -17,11 +17,64 @@ class ImageResponse(BaseModel):
     is_suggested: bool = False
     suggested_animal: Optional[str] = None
     original_input: Optional[str] = None
+    # Downscaled WebP variants, ready for <img srcset>, once rendered
+    srcset: Optional[str] = None
 
     class Config:
         from_attributes = True
         populate_by_name = True
 
+class SavedImage(ImageResponse):
+    # "passed", "skipped" (the photo could not be fetched or decoded, so it
+    # was saved unchecked) or "disabled" (IMAGE_DEDUPE_ENABLED is off)
+    duplicate_check: Literal["passed", "skipped", "disabled"]
+
+class SimilarImage(ImageResponse):
+    # Bits that differ between the perceptual hashes, out of 64
+    distance: int
+
+class BatchGenerateRequest(BaseModel):
+    prompts: List[str]
+
+class BatchGenerateItem(BaseModel):
+    prompt: str
+    image: Optional[ImageResponse] = None
+    error: Optional[str] = None
+    # Shared the Pexels search of an identical prompt earlier in the batch
+    deduplicated: bool = False
+    wait_ms: float
+    elapsed_ms: float
+
+class BatchGenerateResponse(BaseModel):
+    items: List[BatchGenerateItem]
+    succeeded: int
+    failed: int
+    elapsed_ms: float
+
+class BulkSaveItem(BaseModel):
+    id: str
+    # created: inserted; exists: id already saved; duplicate: repeated earlier in the request
+    status: Literal['created', 'exists', 'duplicate']
+
+class BulkSaveResponse(BaseModel):
+    created: int
+    items: List[BulkSaveItem]
+
+class GenerationJobCreate(ImageBase):
+    pass
+
+class GenerationJobResponse(BaseModel):
+    id: str
+    prompt: str
+    status: Literal['queued', 'running', 'succeeded', 'failed']
+    # 0.0-1.0 while running, when the model reports it
+    progress: Optional[float] = None
+    image: Optional[ImageResponse] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
 class LikeRequest(BaseModel):
     image_id: str
     action: Literal['like', 'unlike'] 
\ No newline at end of file
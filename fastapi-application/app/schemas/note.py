@@ -12,7 +12,7 @@ class NoteResponse(BaseModel):
   author: UserResponse
 
   class Config:
-    from_arttributes = True
+    from_attributes = True
 
 class NoteRequest(BaseModel):
   body: str
@@ -0,0 +1,188 @@
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_END = object()  # Marks a complete phrase in the token trie
+
+# Words people use for an animal we search under another name. Words that
+# usually mean something else ("python", "ram", "lamb") are left out on purpose.
+SYNONYMS = {
+    "puppy": "dog", "pup": "dog", "doggy": "dog", "doggo": "dog", "hound": "dog",
+    "kitten": "cat", "kitty": "cat", "kitteh": "cat",
+    "lioness": "lion", "tigress": "tiger",
+    "bunny": "rabbit", "piglet": "pig", "hog": "pig",
+    "calf": "cow", "cattle": "cow", "bull": "cow",
+    "pony": "horse", "foal": "horse", "stallion": "horse", "mare": "horse",
+    "ewe": "sheep",
+    "chick": "chicken", "duckling": "duck", "gobbler": "turkey",
+    "peafowl": "peacock", "peahen": "peacock",
+    "parakeet": "parrot", "macaw": "parrot", "cockatoo": "parrot",
+    "orca": "whale", "porpoise": "dolphin",
+    "serpent": "snake", "cobra": "snake", "viper": "snake",
+    "gecko": "lizard", "iguana": "lizard", "chameleon": "lizard",
+    "bumblebee": "bee", "honeybee": "bee", "tarantula": "spider",
+    "owlet": "owl", "eaglet": "eagle", "kestrel": "falcon",
+}
+
+# Plurals that the suffix rules below would get wrong
+IRREGULAR_PLURALS = {"mouse": "mice", "goose": "geese", "ox": "oxen", "calf": "calves"}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens, ignoring punctuation and extra whitespace."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+def plural_forms(word: str) -> Set[str]:
+    """Likely plural spellings of a singular noun."""
+    forms = {word + "s"}
+    if word.endswith(("s", "x", "z", "ch", "sh")):
+        forms.add(word + "es")
+    if word.endswith("y") and word[-2:-1] not in ("a", "e", "o", "u"):
+        forms.add(word[:-1] + "ies")
+    if word.endswith("f"):
+        forms.add(word[:-1] + "ves")
+    if word.endswith("fe"):
+        forms.add(word[:-2] + "ves")
+    if word in IRREGULAR_PLURALS:
+        forms.add(IRREGULAR_PLURALS[word])
+    return forms
+
+
+def deletes(word: str, distance: int) -> Set[str]:
+    """All strings reachable from `word` by removing up to `distance` characters."""
+    result = set()
+    frontier = {word}
+    for _ in range(distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        result |= frontier
+    return result
+
+
+def edit_distance(a: str, b: str) -> int:
+    """Optimal string alignment distance (Levenshtein plus adjacent swaps)."""
+    previous2: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+class PromptAnalysis(NamedTuple):
+    animals: List[str]  # Canonical animal names, in order of first appearance
+    corrected: str      # Prompt tokens with misspelled animal words fixed
+
+
+class AnimalMatcher:
+    """
+    Whole-word animal matcher built once from the animal list.
+
+    Each prompt token is first normalized against a precomputed index:
+    exact/plural spellings of every known word and synonym, then (for long
+    enough tokens) a SymSpell-style deletion index for typos. Normalized
+    single-word names are looked up in a frozenset; multi-word names
+    ("polar bear") live in a token trie walked from each position, so a
+    prompt is scanned in one pass regardless of how many animals we know.
+    """
+
+    def __init__(
+        self,
+        animals: Iterable[str],
+        synonyms: Optional[Dict[str, str]] = None,
+        fuzzy_min_length: int = 7,
+        fuzzy_long_length: int = 10,
+    ):
+        self.animals = tuple(dict.fromkeys(' '.join(tokenize(animal)) for animal in animals))
+        self.synonyms = {k: v for k, v in (SYNONYMS if synonyms is None else synonyms).items()
+                         if v in self.animals}
+        self.fuzzy_min_length = fuzzy_min_length
+        self.fuzzy_long_length = fuzzy_long_length
+
+        self._words = frozenset(animal for animal in self.animals if ' ' not in animal)
+        self._phrases: Dict = {}
+        for animal in self.animals:
+            tokens = animal.split()
+            if len(tokens) > 1:
+                node = self._phrases
+                for token in tokens:
+                    node = node.setdefault(token, {})
+                node[_END] = animal
+
+        # Surface spelling -> known word (animal-name word or synonym)
+        vocabulary = {token for animal in self.animals for token in animal.split()} | set(self.synonyms)
+        self._surface: Dict[str, str] = {}
+        for word in vocabulary:
+            for form in plural_forms(word):
+                self._surface.setdefault(form, word)
+        self._surface.update({word: word for word in vocabulary})
+
+        # Deletion index over surface spellings for bounded edit-distance lookup
+        self._deletion_index: Dict[str, Set[str]] = {}
+        for form in self._surface:
+            for key in {form} | deletes(form, 2):
+                self._deletion_index.setdefault(key, set()).add(form)
+        self._fuzzy_lookup = lru_cache(maxsize=4096)(self._fuzzy_lookup)
+
+    def match(self, prompt: str) -> List[str]:
+        """Animals mentioned in the prompt, in order of first appearance."""
+        return self.analyze(prompt).animals
+
+    def analyze(self, prompt: str) -> PromptAnalysis:
+        """Match animals and return a spelling-corrected copy of the prompt."""
+        tokens = tokenize(prompt)
+        words = []
+        corrected = []
+        for token in tokens:
+            surface = token if token in self._surface else self._fuzzy_lookup(token)
+            if surface is None:
+                words.append(token)
+                corrected.append(token)
+                continue
+            word = self._surface[surface]
+            words.append(self.synonyms.get(word, word))
+            # Keep the user's wording; only replace actual misspellings
+            corrected.append(token if surface == token else surface)
+        return PromptAnalysis(self.match_tokens(words), ' '.join(corrected))
+
+    def match_tokens(self, tokens: List[str]) -> List[str]:
+        found: Dict[str, None] = {}
+        for i, token in enumerate(tokens):
+            if token in self._words:
+                found[token] = None
+            node = self._phrases.get(token)
+            j = i + 1
+            while node is not None:
+                if _END in node:
+                    found[node[_END]] = None
+                if j == len(tokens):
+                    break
+                node = node.get(tokens[j])
+                j += 1
+        return list(found)
+
+    def _fuzzy_lookup(self, token: str) -> Optional[str]:
+        """Closest known spelling within the allowed edit distance, if any."""
+        if len(token) < self.fuzzy_min_length or not token.isalpha():
+            return None
+        max_distance = 2 if len(token) >= self.fuzzy_long_length else 1
+        candidates = set()
+        for key in {token} | deletes(token, max_distance):
+            candidates |= self._deletion_index.get(key, set())
+
+        best = None
+        best_distance = max_distance + 1
+        for candidate in sorted(candidates):
+            # Typos rarely hit the first letter; this avoids carrots -> parrots
+            if candidate[0] != token[0]:
+                continue
+            distance = edit_distance(token, candidate)
+            if distance < best_distance:
+                best, best_distance = candidate, distance
+        return best
@@ -1,8 +1,10 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.models.user import User
 from app.schemas.auth import LogInRequest, SignupRequest, SignupResponse
-from app.core.security import hash_password
-from app.core.security import verify_password
+from app.core.security import hash_password_async
+from app.core.security import verify_password_async
 from app.core.security import create_access_token
 from fastapi import HTTPException
 import uuid
@@ -12,16 +14,21 @@ def check_username_exists(db: Session, username: str) -> bool:
     db_user = db.query(User).filter(User.username == username).first()
     return db_user is not None
 
-def check_user(db: Session, user: LogInRequest):
-    db_user = db.query(User).filter(User.username == user.username).first()
+async def username_taken(db: AsyncSession, username: str) -> bool:
+    """check_username_exists for the async login and signup paths."""
+    return await db.scalar(select(User.id).where(User.username == username)) is not None
+
+async def check_user(db: AsyncSession, user: LogInRequest):
+    db_user = await db.scalar(select(User).where(User.username == user.username))
     if not db_user:
         raise HTTPException(status_code=404, detail="User not found")
-    if not verify_password(user.password, db_user.password):
+    # bcrypt runs in the password pool; a full pool raises PoolSaturatedError (503)
+    if not await verify_password_async(user.password, db_user.password):
         raise HTTPException(status_code=401, detail="Invalid password")
     return db_user
 
-def create_token(db: Session, user: LogInRequest):
-    db_user = check_user(db, user)
+async def create_token(db: AsyncSession, user: LogInRequest):
+    db_user = await check_user(db, user)
     if db_user:
         to_token = {
             "username": db_user.username,
@@ -34,16 +41,16 @@ def create_token(db: Session, user: LogInRequest):
         }
     return
 
-def sign_up(db: Session, user: SignupRequest):
+async def sign_up(db: AsyncSession, user: SignupRequest):
     # Check if username exists before attempting to create
-    if check_username_exists(db, user.username):
+    if await username_taken(db, user.username):
         raise HTTPException(status_code=409, detail="Username is already taken")
         
-    password = hash_password(user.password)
+    password = await hash_password_async(user.password)
     db_user = User(username=user.username, password=password)
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     to_token = {
         "username": db_user.username,
         "password": db_user.password,
@@ -1,81 +1,78 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
+from app.core.pagination import paginate
+from app.core.search import ilike_contains
 from app.models import Bug, User, Note
 from app.schemas.bug import BugCreated, BugUpdated
+from app.schemas.user import UserResponse
 from uuid import UUID
 from app.models.bug import PriorityEnum
+from app.core.config import settings
 from fastapi import HTTPException
 
-def create_bug(db: Session, project_id: UUID, bug_data: BugCreated, current_user: str):
+def create_bug(db: Session, project_id: UUID, bug_data: BugCreated, current_user: UserResponse):
 
-    member = db.query(User).filter(User.username == current_user).first()
     new_bug = Bug(
         title=bug_data.title,
         description=bug_data.description,
         priority=bug_data.priority,
         projectId=project_id,
-        createdBy=member
+        createdById=current_user.id
     )
     db.add(new_bug)
     db.commit()
     db.refresh(new_bug)
     return new_bug
 
-def get_all_bugs(db: Session, title: str = None, priority: PriorityEnum = None, projectId: str = None, sort_by: str = "title", sort_order: str = "asc"):
+BUG_SORT_COLUMNS = {"title": Bug.title, "priority": Bug.priority}
 
-    query = db.query(Bug)
+def get_all_bugs(db: Session, title: str = None, priority: PriorityEnum = None, projectId: str = None, sort_by: str = "title", sort_order: str = "asc", after: dict = None, limit: int = settings.DEFAULT_PAGE_SIZE):
+
+    query = db.query(Bug).filter(Bug.projectId == projectId)
 
     if title:
-        query = query.filter(Bug.title.ilike(f"%{title}%"))
+        query = query.filter(ilike_contains(Bug.title, title))
 
     if priority:
         query = query.filter(Bug.priority == priority)
 
-    if sort_by == "title":
-        if sort_order == "asc":
-            query = query.order_by(Bug.title.asc())
-        else:
-            query = query.order_by(Bug.title.desc())
-    elif sort_by == "priority":
-        if sort_order == "asc":
-            query = query.order_by(Bug.id.asc())
-        else:
-            query = query.order_by(Bug.id.desc())
-
-    query = query.filter(Bug.projectId == projectId)
-
-    bugs = query.all()
+    query = query.options(joinedload(Bug.createdBy), joinedload(Bug.updatedBy))
+    try:
+        bugs, next_cursor = paginate(query, BUG_SORT_COLUMNS[sort_by], Bug.id, sort_order, after, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     if not bugs:
         raise HTTPException(status_code=404, detail="No bugs found")
-    
-    
 
-    bugs = query.all()
+    # All notes for the page in one statement, however many bugs it holds
+    notes = (
+        db.query(Note)
+        .options(joinedload(Note.author))
+        .filter(Note.bugId.in_([bug.id for bug in bugs]))
+        .all()
+    )
+    notes_by_bug = {}
+    for note in notes:
+        notes_by_bug.setdefault(note.bugId, []).append(note)
     for bug in bugs:
-            notes = db.query(Note).filter(Note.bugId == bug.id).all()
-            note_ids = []
-            for note in notes:
-                note_ids.append(note.id)
-            bug.notes = note_ids
+        bug.notes = notes_by_bug.get(bug.id, [])
 
-    return bugs
+    return bugs, next_cursor
 
 def get_bug_by_id(db: Session, bug_id: UUID):
 
     bug = db.query(Bug).filter(Bug.id == bug_id).first()
     if not bug:
         raise HTTPException(status_code=404, detail="Bug not found")
-    notes = db.query(Note).filter(Note.bugId == bug.id).all()
+    notes = db.query(Note).options(joinedload(Note.author)).filter(Note.bugId == bug.id).all()
     note_rp = []
     for note in notes:
         note_rp.append(note)
     bug.notes = note_rp
     return bug
 
-def update_bug(db: Session, bug_id: UUID, bug_data: BugUpdated, current_user: str):
+def update_bug(db: Session, bug_id: UUID, bug_data: BugUpdated, current_user: UserResponse):
 
-    member = db.query(User).filter(User.username == current_user).first()
-    print(member.username, type(member))
     bug = db.query(Bug).filter(Bug.id == bug_id).first()
 
     if not bug:
@@ -90,7 +87,7 @@ def update_bug(db: Session, bug_id: UUID, bug_data: BugUpdated, current_user: st
     if bug_data.priority:
         bug.priority = bug_data.priority
 
-    bug.updatedBy = member
+    bug.updatedById = current_user.id
 
     db.commit()
     db.refresh(bug)
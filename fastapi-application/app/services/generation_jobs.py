@@ -0,0 +1,244 @@
+import asyncio
+import math
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from app.schemas.image import GenerationJobResponse, ImageResponse
+
+ProgressCallback = Callable[[Optional[float]], None]
+RunPrediction = Callable[[str, ProgressCallback], Awaitable[ImageResponse]]
+
+TERMINAL_STATUSES = ("succeeded", "failed")
+
+
+class JobRejectedError(RuntimeError):
+    """A job could not be accepted right now; retry after `retry_after` seconds."""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class QueueFullError(JobRejectedError):
+    pass
+
+
+class UserJobLimitError(JobRejectedError):
+    pass
+
+
+@dataclass
+class GenerationJob:
+    id: str
+    owner: str
+    prompt: str
+    status: str = "queued"
+    progress: Optional[float] = None
+    image: Optional[ImageResponse] = None
+    error: Optional[str] = None
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    # Monotonic time the job finished, for result expiry
+    finished: Optional[float] = None
+    # Replaced on every update so watchers can wait for the next change
+    changed: asyncio.Event = field(default_factory=asyncio.Event)
+
+    def snapshot(self) -> GenerationJobResponse:
+        return GenerationJobResponse(
+            id=self.id,
+            prompt=self.prompt,
+            status=self.status,
+            progress=self.progress,
+            image=self.image,
+            error=self.error,
+            created_at=self.created_at,
+            started_at=self.started_at,
+            finished_at=self.finished_at,
+        )
+
+
+class GenerationJobQueue:
+    """
+    Image generation jobs run by a fixed number of asyncio workers.
+
+    `submit` returns at once with a queued job. Admission is bounded twice:
+    each owner may have at most `per_user` jobs queued or running, and the
+    queue holds at most `max_queue` jobs waiting for a worker. Past either
+    limit the job is rejected with a retry hint instead of piling up.
+    Finished jobs are kept for `result_ttl` seconds so clients can collect
+    the result.
+    """
+
+    def __init__(
+        self,
+        run_prediction: RunPrediction,
+        workers: int,
+        max_queue: int,
+        per_user: int,
+        job_timeout: float,
+        result_ttl: float,
+    ):
+        self.run_prediction = run_prediction
+        self.workers = workers
+        self.max_queue = max_queue
+        self.per_user = per_user
+        self.job_timeout = job_timeout
+        self.result_ttl = result_ttl
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._jobs: Dict[str, GenerationJob] = {}
+        self._active: Dict[str, int] = {}
+        self._tasks: List[asyncio.Task] = []
+        self.running_jobs = 0
+        self.submitted = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.rejected_queue_full = 0
+        self.rejected_user_limit = 0
+        self.total_run_seconds = 0.0
+
+    @property
+    def started(self) -> bool:
+        return bool(self._tasks)
+
+    def start(self) -> None:
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+        # Nothing will pick these up any more; let watchers finish
+        for job in self._jobs.values():
+            if job.status not in TERMINAL_STATUSES:
+                self._finish(job, error="Server shutting down")
+
+    def submit(self, owner: str, prompt: str) -> GenerationJob:
+        """Queue a job, or raise JobRejectedError when over a limit."""
+        self._expire()
+        if self._active.get(owner, 0) >= self.per_user:
+            self.rejected_user_limit += 1
+            raise UserJobLimitError(
+                f"At most {self.per_user} generation jobs per user at a time",
+                self._retry_after(),
+            )
+        job = GenerationJob(id=str(uuid.uuid4()), owner=owner, prompt=prompt)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.rejected_queue_full += 1
+            raise QueueFullError("Generation queue is full", self._retry_after())
+        self._jobs[job.id] = job
+        self._active[owner] = self._active.get(owner, 0) + 1
+        self.submitted += 1
+        return job
+
+    def get(self, job_id: str) -> Optional[GenerationJob]:
+        return self._jobs.get(job_id)
+
+    async def watch(self, job: GenerationJob, keepalive: float) -> AsyncIterator[Optional[GenerationJobResponse]]:
+        """
+        Yield the job's state now and after every change until it finishes.
+        Yields None when nothing changed for `keepalive` seconds.
+        """
+        while True:
+            # Take the event before yielding so a change made meanwhile is not missed
+            changed = job.changed
+            yield job.snapshot()
+            if job.status in TERMINAL_STATUSES:
+                return
+            while not changed.is_set():
+                try:
+                    await asyncio.wait_for(changed.wait(), timeout=keepalive)
+                except asyncio.TimeoutError:
+                    yield None
+
+    def _publish(self, job: GenerationJob) -> None:
+        changed, job.changed = job.changed, asyncio.Event()
+        changed.set()
+
+    def _set_progress(self, job: GenerationJob, progress: Optional[float]) -> None:
+        if progress != job.progress:
+            job.progress = progress
+            self._publish(job)
+
+    def _finish(self, job: GenerationJob, image: Optional[ImageResponse] = None, error: Optional[str] = None) -> None:
+        job.status = "succeeded" if error is None else "failed"
+        job.image = image
+        job.error = error
+        job.finished_at = datetime.utcnow()
+        job.finished = time.monotonic()
+        if job.status == "succeeded":
+            job.progress = 1.0
+        active = self._active.get(job.owner, 0) - 1
+        if active > 0:
+            self._active[job.owner] = active
+        else:
+            self._active.pop(job.owner, None)
+        self._publish(job)
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            job.status = "running"
+            job.started_at = datetime.utcnow()
+            self._publish(job)
+            self.running_jobs += 1
+            start = time.perf_counter()
+            try:
+                image = await asyncio.wait_for(
+                    self.run_prediction(job.prompt, lambda progress: self._set_progress(job, progress)),
+                    timeout=self.job_timeout,
+                )
+            except asyncio.TimeoutError:
+                self.failed += 1
+                self._finish(job, error=f"Generation timed out after {self.job_timeout:g}s")
+            except Exception as e:
+                self.failed += 1
+                print(f"Error generating image: {str(e)}")
+                self._finish(job, error=str(e))
+            else:
+                self.succeeded += 1
+                self._finish(job, image=image)
+            finally:
+                self.running_jobs -= 1
+                self.total_run_seconds += time.perf_counter() - start
+                self._queue.task_done()
+
+    def _expire(self) -> None:
+        cutoff = time.monotonic() - self.result_ttl
+        expired = [job_id for job_id, job in self._jobs.items() if job.finished is not None and job.finished < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def _retry_after(self) -> int:
+        """Seconds until a worker frees up, going by the average job so far."""
+        finished = self.succeeded + self.failed
+        average = self.total_run_seconds / finished if finished else 1.0
+        return max(1, math.ceil(average))
+
+    def stats(self) -> Dict:
+        finished = self.succeeded + self.failed
+        return {
+            "workers": self.workers,
+            "running": self.running_jobs,
+            "queued": self._queue.qsize(),
+            "max_queue": self.max_queue,
+            "per_user": self.per_user,
+            "jobs_tracked": len(self._jobs),
+            "submitted": self.submitted,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_user_limit": self.rejected_user_limit,
+            "run_seconds_avg": self.total_run_seconds / finished if finished else 0.0,
+        }
@@ -0,0 +1,161 @@
+import asyncio
+import json
+import re
+import time
+from typing import Any, Dict, Mapping, Optional
+
+import httpx
+from google.auth import transport
+from google.oauth2 import id_token
+
+from app.core.singleflight import SingleFlight
+
+_MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+
+# Floor between background refreshes, and the wait after a failed one
+MIN_REFRESH_INTERVAL = 5.0
+RETRY_INTERVAL = 30.0
+
+
+def cache_ttl(headers: httpx.Headers, default: float) -> float:
+    """Seconds a response may be cached: Cache-Control max-age minus Age."""
+    cache_control = headers.get("Cache-Control", "")
+    if "no-store" in cache_control or "no-cache" in cache_control:
+        return 0.0
+    match = _MAX_AGE_RE.search(cache_control)
+    if not match:
+        return default
+    age = headers.get("Age", "0")
+    return max(0.0, int(match.group(1)) - (int(age) if age.isdigit() else 0))
+
+
+class _CertsResponse(transport.Response):
+    def __init__(self, data: bytes):
+        self._data = data
+
+    @property
+    def status(self) -> int:
+        return 200
+
+    @property
+    def headers(self) -> Mapping[str, str]:
+        return {"Content-Type": "application/json"}
+
+    @property
+    def data(self) -> bytes:
+        return self._data
+
+
+class _CachedCertsRequest(transport.Request):
+    """google-auth transport that answers the certificate fetch from memory."""
+
+    def __init__(self, certs: bytes):
+        self._response = _CertsResponse(certs)
+
+    def __call__(self, url, method="GET", body=None, headers=None, timeout=None, **kwargs):
+        return self._response
+
+
+class GoogleCertCache:
+    """
+    Google's ID token signing certificates, kept for as long as the
+    response's Cache-Control allows.
+
+    A background task re-fetches them `refresh_margin` seconds before they
+    expire, so logins normally never wait on Google. Concurrent fetches
+    after a cold start or expiry are coalesced into one. If a refresh fails,
+    the previous certificates keep being served. Token verification (RSA)
+    runs in a worker thread, off the event loop.
+    """
+
+    def __init__(
+        self,
+        certs_url: str,
+        default_ttl: float,
+        refresh_margin: float,
+        http_client: Optional[httpx.AsyncClient] = None,
+    ):
+        self.certs_url = certs_url
+        self.default_ttl = default_ttl
+        self.refresh_margin = refresh_margin
+        # Shared pooled client, injected by the app lifespan (see app/main.py)
+        self.http_client = http_client
+        self._certs: Optional[bytes] = None
+        self._expires_at = 0.0
+        self._flight = SingleFlight()
+        self._task: Optional[asyncio.Task] = None
+        self.hits = 0
+        self.fetches = 0
+        self.fetch_errors = 0
+        self.stale_served = 0
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def get_certs(self) -> bytes:
+        if self._certs is not None and time.monotonic() < self._expires_at:
+            self.hits += 1
+            return self._certs
+        try:
+            return await self._flight.do(self.certs_url, self._fetch)
+        except Exception:
+            if self._certs is None:
+                raise
+            self.stale_served += 1
+            return self._certs
+
+    async def verify(self, token: str, audience: str, clock_skew_in_seconds: int = 0) -> Mapping[str, Any]:
+        """id_token.verify_oauth2_token against the cached certificates."""
+        certs = await self.get_certs()
+        return await asyncio.to_thread(
+            id_token.verify_oauth2_token,
+            token,
+            _CachedCertsRequest(certs),
+            audience,
+            clock_skew_in_seconds,
+        )
+
+    async def _fetch(self) -> bytes:
+        try:
+            response = await self.http_client.get(self.certs_url)
+            response.raise_for_status()
+            json.loads(response.content)  # Keep the old certificates rather than garbage
+        except Exception:
+            self.fetch_errors += 1
+            raise
+        self.fetches += 1
+        self._certs = response.content
+        self._expires_at = time.monotonic() + cache_ttl(response.headers, self.default_ttl)
+        return self._certs
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self._flight.do(self.certs_url, self._fetch)
+            except Exception as e:
+                print(f"Error refreshing Google certificates: {str(e)}")
+                await asyncio.sleep(RETRY_INTERVAL)
+                continue
+            refresh_in = self._expires_at - self.refresh_margin - time.monotonic()
+            await asyncio.sleep(max(refresh_in, MIN_REFRESH_INTERVAL))
+
+    def stats(self) -> Dict:
+        return {
+            "cached": self._certs is not None,
+            "expires_in": max(0.0, self._expires_at - time.monotonic()),
+            "hits": self.hits,
+            "fetches": self.fetches,
+            "fetch_errors": self.fetch_errors,
+            "stale_served": self.stale_served,
+            "coalescing": self._flight.stats(),
+        }
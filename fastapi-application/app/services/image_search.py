@@ -0,0 +1,83 @@
+import math
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from app.services.animal_matcher import tokenize
+
+# Words too common in prompts to be worth indexing
+STOP_WORDS = {
+    "a", "an", "and", "the", "of", "in", "on", "at", "to", "with", "for",
+    "is", "are", "it", "its", "by", "from", "as", "or", "this", "that",
+}
+
+
+def stem(token: str) -> str:
+    """Fold common English plurals onto the singular, like to_tsvector does."""
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 4 and token.endswith(("ches", "shes", "sses", "xes")):
+        return token[:-2]
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def search_terms(text: Optional[str]) -> List[str]:
+    return [stem(token) for token in tokenize(text or "") if token not in STOP_WORDS]
+
+
+class InvertedIndex:
+    """
+    In-process full-text index over image prompts, used where the database
+    has no tsvector support (SQLite). Every query term must match; hits are
+    ranked by how often the terms occur, normalized by document length, so a
+    document's score does not depend on the rest of the corpus.
+    """
+
+    def __init__(self):
+        self.loaded = False
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._lengths: Dict[str, int] = {}
+        self._terms: Dict[str, Set[str]] = {}  # Per image, for removal
+
+    def add(self, image_id: str, *texts: Optional[str]) -> None:
+        self.remove(image_id)
+        terms = [term for text in texts for term in search_terms(text)]
+        self._lengths[image_id] = len(terms)
+        self._terms[image_id] = set(terms)
+        for term in terms:
+            postings = self._postings.setdefault(term, {})
+            postings[image_id] = postings.get(image_id, 0) + 1
+
+    def remove(self, image_id: str) -> None:
+        if self._lengths.pop(image_id, None) is None:
+            return
+        for term in self._terms.pop(image_id):
+            del self._postings[term][image_id]
+            if not self._postings[term]:
+                del self._postings[term]
+
+    def load(self, rows: Iterable[Tuple[str, Optional[str], Optional[str]]]) -> None:
+        """Index (id, prompt, original_input) rows and mark the index as built."""
+        for image_id, prompt, original_input in rows:
+            self.add(image_id, prompt, original_input)
+        self.loaded = True
+
+    def search(self, query: str) -> List[Tuple[float, str]]:
+        """(score, image_id) for every matching image, best first."""
+        terms: Set[str] = set(search_terms(query))
+        if not terms:
+            return []
+        # Intersect starting from the rarest term to keep the candidate set small
+        postings = sorted((self._postings.get(term, {}) for term in terms), key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates &= posting.keys()
+        hits = [
+            (sum(posting[image_id] for posting in postings) / math.sqrt(self._lengths[image_id]), image_id)
+            for image_id in candidates
+        ]
+        hits.sort(reverse=True)
+        return hits
+
+    def __len__(self) -> int:
+        return len(self._lengths)
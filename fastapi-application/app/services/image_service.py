@@ -1,15 +1,30 @@
+import asyncio
 import os
 import random
+import time
+import anyio
 import httpx
-from typing import List, Dict, Optional, Literal
-from sqlalchemy.orm import Session
-from app.schemas.image import ImageResponse
-from app.models.image import Image
+from typing import List, Dict, Optional, Literal, Tuple, AsyncIterator, Callable
+from sqlalchemy import Float, Integer, cast, column, delete, func, literal_column, select, tuple_, update, values
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.schemas.image import BatchGenerateItem, BatchGenerateResponse, BulkSaveItem, BulkSaveResponse, ImageResponse, SavedImage, SimilarImage
+from app.models.image import Image, PHASH_CHUNK_COLUMNS, SEARCH_VECTOR_COLUMN
 from dotenv import load_dotenv
 from datetime import datetime
 import uuid
-import replicate
+import zlib
 from replicate.client import Client
+from app.core.config import settings
+from app.core.cache import TTLCache
+from app.core.singleflight import SingleFlight
+from app.core.pagination import encode_cursor, decode_cursor
+from app.core.thumbnails import difference_hash, variant_path
+from app.services.animal_matcher import AnimalMatcher, PromptAnalysis
+from app.services.image_search import InvertedIndex
+from app.services.image_similarity import find_similar, hash_columns, lock_keys, to_unsigned
+from app.services.image_store import DisallowedUpstreamError, StoredImage, touch
+from app.services.image_variants import VariantMissingError
 
 load_dotenv()
 
@@ -19,43 +34,159 @@ AVAILABLE_ANIMALS = [
     "koala", "giraffe", "dolphin", "fox", "wolf", "rabbit", "cow", 
     "horse", "sheep", "goat", "pig", "chicken", "duck", "turkey", 
     "peacock", "parrot", "pigeon", "sparrow", "rooster", "hen", "cock", "fish", 
-    "shark", "whale", "dolphin", "octopus", "crab", "lobster", "snail", "butterfly", 
+    "shark", "whale", "octopus", "crab", "lobster", "snail", "butterfly", 
     "bee", "ant", "spider", "snake", "lizard", "turtle", "tortoise", "bird", 
     "owl", "eagle", "hawk", "falcon" 
 ]
 
+# Built once at import so each prompt is matched in a single pass
+ANIMAL_MATCHER = AnimalMatcher(AVAILABLE_ANIMALS)
+
+# Postgres advisory locks (two-int form) held from the duplicate check to the
+# insert, so near-duplicates saved at the same moment by different workers
+# cannot both pass: one key space per phash substring column, then the URL's
+DUPLICATE_LOCK_NAMESPACE = 0x696D6700
+DUPLICATE_URL_LOCK = DUPLICATE_LOCK_NAMESPACE + len(PHASH_CHUNK_COLUMNS)
+
+# Keys a page cursor must carry, with their types: the gallery is keyed on (created_at, id), search on (rank, id)
+IMAGE_CURSOR_KEYS = {"created_at": datetime, "id": str}
+SEARCH_CURSOR_KEYS = {"rank": (float, int), "id": str}
+
+
+class DuplicateImageError(Exception):
+    """The image being saved is the same photo as one already in the gallery."""
+
+    def __init__(self, duplicate_of: str, distance: int):
+        self.duplicate_of = duplicate_of
+        self.distance = distance
+        super().__init__(f"This photo is already in the gallery (image {duplicate_of})")
+
+
+def duplicate_check_locks(url: str, phash: Optional[int]):
+    """
+    Statement taking the advisory locks for a save's URL and hash buckets
+    (see lock_keys), in one global order so that savers cannot deadlock.
+    Only saves of the same URL or of near-identical photos wait for each
+    other; every other save goes ahead in parallel.
+    """
+    keys = [(DUPLICATE_URL_LOCK, zlib.crc32(url.encode()) & 0x7FFFFFFF)]
+    if phash is not None:
+        keys += [(DUPLICATE_LOCK_NAMESPACE + i, bucket) for i, bucket in lock_keys(phash, settings.IMAGE_DUPLICATE_DISTANCE)]
+    buckets = values(column("space", Integer), column("bucket", Integer), name="buckets", literal_binds=True).data(keys)
+    ordered = select(buckets.c.space, buckets.c.bucket).order_by(buckets.c.space, buckets.c.bucket).subquery()
+    return select(func.pg_advisory_xact_lock(ordered.c.space, ordered.c.bucket))
+
+
 class ImageService:
-    def __init__(self):
+    def __init__(self, http_client: Optional[httpx.AsyncClient] = None):
         self.pexels_api_key = os.getenv("PEXELS_API_KEY")
+        # Shared pooled client, injected by the app lifespan (see app/main.py)
+        self.http_client = http_client
+        # Photo lists per normalized search prompt
+        self.search_cache = TTLCache(
+            max_entries=settings.SEARCH_CACHE_MAX_ENTRIES,
+            ttl=settings.SEARCH_CACHE_TTL,
+            max_bytes=settings.SEARCH_CACHE_MAX_BYTES,
+        )
+        # Concurrent misses for the same query share one outbound request
+        self.search_flight = SingleFlight()
+        # Suggestion images for the random-animal path, set by the app lifespan
+        self.prefetch_pool = None
+        # Write-behind like aggregation, set by the app lifespan when enabled
+        self.like_buffer = None
+        # Prompt search for databases without tsvector, built on first use
+        self.search_index = InvertedIndex()
+        # Local copy of image bytes, set by the app lifespan
+        self.image_store = None
+        # Thumbnail rendering after save, set by the app lifespan when enabled
+        self.variant_pipeline = None
+        # Saves by near-duplicate check outcome; "skipped" means saved unchecked
+        self.duplicate_checks = {"passed": 0, "skipped": 0}
+        # Image id -> content digest; an image's URL never changes, so neither does its digest
+        self.content_digests = TTLCache(
+            max_entries=settings.IMAGE_CONTENT_DIGEST_CACHE_ENTRIES,
+            ttl=settings.IMAGE_CONTENT_DIGEST_CACHE_TTL,
+        )
         self.replicate_api_token = os.getenv("REPLICATE_API_TOKEN")
+        self.client = None
         if self.replicate_api_token:
-            self.client = Client(api_token=self.replicate_api_token)
+            self.client = Client(api_token=self.replicate_api_token, base_url=settings.REPLICATE_API_URL)
 
     def get_random_animal(self) -> str:
         """Return a random animal from the available list."""
         return random.choice(AVAILABLE_ANIMALS)
         
+    def analyze_prompt(self, prompt: str) -> PromptAnalysis:
+        """Matched animals (plurals, synonyms and typos resolved) plus a corrected prompt."""
+        return ANIMAL_MATCHER.analyze(prompt)
+
+    def match_animals(self, prompt: str) -> List[str]:
+        """Return the known animal names mentioned in the prompt."""
+        return ANIMAL_MATCHER.match(prompt)
+
     def is_animal_prompt(self, prompt: str) -> bool:
         """
         Check if the prompt contains any known animal names.
-        Handles case-insensitive matching and spaces.
+        Handles case, punctuation, plurals, synonyms and small typos.
         """
-        # Clean the prompt: convert to lowercase and remove extra spaces
-        cleaned_prompt = ' '.join(prompt.lower().split())
-        
-        # Check each animal name
-        for animal in AVAILABLE_ANIMALS:
-            # Clean the animal name too for consistency
-            cleaned_animal = ' '.join(animal.lower().split())
-            # Check if the animal name is a complete word in the prompt
-            if any(
-                word == cleaned_animal 
-                for word in cleaned_prompt.split()
-            ):
-                return True
-        return False
-
-    async def generate_image(self, db: Session, prompt: str) -> ImageResponse:
+        return bool(self.match_animals(prompt))
+
+    @staticmethod
+    def normalize_query(search_prompt: str) -> str:
+        """Cache key for a search: lowercased, whitespace collapsed."""
+        return ' '.join(search_prompt.lower().split())
+
+    async def _search_photos(self, search_prompt: str) -> List[Dict]:
+        """
+        Return the Pexels photos for a search, from the cache when possible.
+        Reuses the shared pooled client when one has been injected.
+        """
+        key = self.normalize_query(search_prompt)
+        photos = self.search_cache.get(key)
+        if photos is not None:
+            return photos
+        return await self.search_flight.do(key, lambda: self._fetch_and_cache(key))
+
+    async def _fetch_and_cache(self, key: str) -> List[Dict]:
+        if self.http_client is None:
+            async with httpx.AsyncClient() as client:
+                photos = await self._fetch_photos(client, key)
+        else:
+            photos = await self._fetch_photos(self.http_client, key)
+        self.search_cache.set(key, photos)
+        return photos
+
+    def stats(self) -> Dict:
+        """Runtime counters for the diagnostics endpoint."""
+        return {
+            "search_cache": self.search_cache.stats(),
+            "search_coalescing": self.search_flight.stats(),
+            "prefetch_pool": self.prefetch_pool.stats() if self.prefetch_pool else None,
+            "like_buffer": self.like_buffer.stats() if self.like_buffer else None,
+            "image_store": self.image_store.stats() if self.image_store else None,
+            "content_digests": self.content_digests.stats(),
+            "duplicate_checks": dict(self.duplicate_checks),
+            "variant_pipeline": self.variant_pipeline.stats() if self.variant_pipeline else None,
+        }
+
+    async def _fetch_photos(self, client: httpx.AsyncClient, search_prompt: str) -> List[Dict]:
+        response = await client.get(
+            f"{settings.PEXELS_API_URL}/search",
+            params={"query": search_prompt, "per_page": 15, "size": "medium"},
+            headers={
+                'Authorization': self.pexels_api_key
+            }
+        )
+
+        if not response.status_code == 200:
+            raise ValueError('Failed to fetch image from Pexels')
+
+        photos = response.json().get("photos")
+        if not photos:
+            raise ValueError('No images found')
+        return photos
+
+    async def generate_image(self, db: AsyncSession, prompt: str) -> ImageResponse:
         """
         Generate an image based on the prompt using Pexels API.
         Does not save to database immediately.
@@ -64,11 +195,18 @@ class ImageService:
             if not self.pexels_api_key:
                 raise ValueError("Pexels API key not found")
 
+            analysis = self.analyze_prompt(prompt)
+            matched_animals = analysis.animals
             print(f"Prompt: {prompt}")
-            print(f"Is animal prompt: {self.is_animal_prompt(prompt)}")
+            print(f"Is animal prompt: {bool(matched_animals)}")
 
             # Check if prompt contains an animal name
-            if not self.is_animal_prompt(prompt):
+            if not matched_animals:
+                # Any animal will do: serve a pre-fetched one when available
+                if self.prefetch_pool is not None:
+                    image = self.prefetch_pool.take(original_input=prompt)
+                    if image is not None:
+                        return image
                 # If no animal found, get a random one
                 random_animal = self.get_random_animal()
                 # Return both the image and the suggested animal
@@ -76,62 +214,136 @@ class ImageService:
                 is_random = True
                 original_input = prompt  # Store the original user input
             else:
-                search_prompt = f"{prompt} animal"
+                # Search with misspelled animal names fixed ("elephnt" -> "elephant")
+                search_prompt = f"{analysis.corrected} animal"
                 is_random = False
                 original_input = None
 
             print(f"Search prompt: {search_prompt}")
             # Search for animal photos
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"https://api.pexels.com/v1/search?query={search_prompt}&per_page=15&size=medium",
-                    headers={
-                        'Authorization': self.pexels_api_key
-                    }
-                )
-
-                if not response.status_code == 200:
-                    raise ValueError('Failed to fetch image from Pexels')
-
-                data = response.json()
-                
-                if not data.get("photos"):
-                    raise ValueError('No images found')
-
-                # Get a random photo from the results
-                random_index = random.randint(0, len(data["photos"]) - 1)
-                image_url = data["photos"][random_index]["src"]["medium"]
-
-                # Create new image record but don't save to database yet
-                image = Image(
-                    id=str(uuid.uuid4()),
-                    prompt=random_animal if is_random else prompt,
-                    url=image_url,
-                    likes=0,
-                    is_suggested=is_random,
-                    original_input=original_input if is_random else None
-                )
-
-                # Return image response without saving to database
-                return ImageResponse(
-                    id=image.id,
-                    prompt=image.prompt,
-                    url=image.url,
-                    created_at=datetime.utcnow(),
-                    likes=image.likes,
-                    is_suggested=is_random,
-                    suggested_animal=random_animal if is_random else None,
-                    original_input=original_input if is_random else None
-                )
+            photos = await self._search_photos(search_prompt)
+
+            # Get a random photo from the results
+            image_url = random.choice(photos)["src"]["medium"]
+
+            # Create new image record but don't save to database yet
+            image = Image(
+                id=str(uuid.uuid4()),
+                prompt=random_animal if is_random else prompt,
+                url=image_url,
+                likes=0,
+                is_suggested=is_random,
+                original_input=original_input if is_random else None
+            )
+
+            # Return image response without saving to database
+            return ImageResponse(
+                id=image.id,
+                prompt=image.prompt,
+                url=image.url,
+                created_at=datetime.utcnow(),
+                likes=image.likes,
+                is_suggested=is_random,
+                suggested_animal=random_animal if is_random else None,
+                original_input=original_input if is_random else None
+            )
 
         except Exception as e:
             print(f"Error generating image: {str(e)}")
             raise
 
-    def save_image(self, db: Session, image_data: ImageResponse) -> ImageResponse:
+    async def generate_images(self, db: AsyncSession, prompts: List[str]) -> BatchGenerateResponse:
+        """
+        Generate one image per prompt concurrently, at most
+        BATCH_GENERATE_CONCURRENCY at a time. Every prompt gets its own image
+        (id and photo pick); identical animal prompts only share the Pexels
+        search, which the search cache and single-flight already collapse to
+        one request. A failed prompt is reported on its item and does not
+        fail the batch.
+        """
+        start = time.perf_counter()
+        semaphore = asyncio.Semaphore(settings.BATCH_GENERATE_CONCURRENCY)
+
+        async def generate(prompt: str) -> Tuple[Optional[ImageResponse], Optional[str], float, float]:
+            queued = time.perf_counter()
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    image, error = await self.generate_image(db, prompt), None
+                except Exception as e:
+                    image, error = None, str(e)
+                return image, error, (started - queued) * 1000, (time.perf_counter() - started) * 1000
+
+        results = await asyncio.gather(*(generate(prompt) for prompt in prompts))
+
+        items, seen = [], set()
+        for i, (prompt, (image, error, wait_ms, elapsed_ms)) in enumerate(zip(prompts, results)):
+            key = self.normalize_query(prompt) if self.is_animal_prompt(prompt) else f"#{i}"
+            items.append(BatchGenerateItem(
+                prompt=prompt,
+                image=image,
+                error=error,
+                deduplicated=key in seen,
+                wait_ms=wait_ms,
+                elapsed_ms=elapsed_ms,
+            ))
+            seen.add(key)
+        failed = sum(1 for item in items if item.error is not None)
+        return BatchGenerateResponse(
+            items=items,
+            succeeded=len(items) - failed,
+            failed=failed,
+            elapsed_ms=(time.perf_counter() - start) * 1000,
+        )
+
+    async def get_image_content(self, db: AsyncSession, image_id: str) -> StoredImage:
         """
-        Save the generated image to database.
+        The image's bytes from the local store, fetched from its URL on
+        first access. Raises ValueError when the image does not exist.
         """
+        digest = self.content_digests.get(image_id)
+        if digest is not None:
+            stored = self.image_store.lookup(digest)
+            if stored is not None:
+                return stored
+
+        row = (await db.execute(
+            select(Image.url, Image.content_sha256).where(Image.id == image_id)
+        )).one_or_none()
+        if row is None:
+            raise ValueError(f"Image with id {image_id} not found")
+        if row.content_sha256:
+            stored = self.image_store.lookup(row.content_sha256)
+            if stored is not None:
+                self.content_digests.set(image_id, row.content_sha256)
+                return stored
+
+        stored = await self.image_store.fetch(row.url)
+        if stored.digest != row.content_sha256:
+            await db.execute(update(Image).where(Image.id == image_id).values(content_sha256=stored.digest))
+            await db.commit()
+        self.content_digests.set(image_id, stored.digest)
+        return stored
+
+    async def save_image(self, db: AsyncSession, image_data: ImageResponse) -> SavedImage:
+        """
+        Save the generated image to database. Raises DuplicateImageError when
+        the URL, or a perceptually near-identical photo, is already saved.
+
+        The near-duplicate check fails open: a photo that cannot be fetched
+        or decoded is still saved, with duplicate_check "skipped" in the
+        result and in the stats. The variant pipeline hashes it later, so it
+        still shows up in similar-image searches.
+        """
+        stored, phash = None, None
+        check = "disabled"
+        if settings.IMAGE_DEDUPE_ENABLED and self.image_store is not None:
+            try:
+                stored, phash = await self._check_duplicate(db, image_data)
+            except DuplicateImageError:
+                await db.rollback()  # Releases the duplicate-check lock
+                raise
+            check = "passed" if phash is not None else "skipped"
         try:
             # Create new image record
             image = Image(
@@ -140,102 +352,350 @@ class ImageService:
                 url=image_data.url,
                 likes=image_data.likes,
                 is_suggested=image_data.is_suggested,
-                original_input=image_data.original_input
+                original_input=image_data.original_input,
+                content_sha256=stored.digest if stored else None,
+                **(hash_columns(phash) if phash is not None else {}),
             )
 
             # Save to database
             db.add(image)
-            db.commit()
-            db.refresh(image)
+            await db.commit()
+            if self.search_index.loaded:
+                self.search_index.add(image.id, image.prompt, image.original_input)
+            if stored is not None:
+                self.content_digests.set(image.id, stored.digest)
+            if self.variant_pipeline is not None:
+                self.variant_pipeline.submit(image.id)
+            if check != "disabled":
+                self.duplicate_checks[check] += 1
 
-            return image_data
+            return SavedImage(**image_data.model_dump(), duplicate_check=check)
 
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             print(f"Error saving image: {str(e)}")
             raise
 
-    def get_images(self, db: Session) -> List[ImageResponse]:
+    async def _check_duplicate(self, db: AsyncSession, image_data: ImageResponse) -> Tuple[Optional[StoredImage], Optional[int]]:
+        """
+        Reject a save that repeats a saved URL or a near-identical photo, and
+        return the stored bytes and their hash for the new row. An image
+        that cannot be fetched or decoded returns no hash and is only checked
+        by URL; one whose URL the content store may not fetch raises
+        DisallowedUpstreamError.
+        """
+        stored, phash = None, None
+        try:
+            # The URL is client input: fetch checks it (allowed host, public
+            # addresses) before the first request and before every redirect
+            stored = await self.image_store.fetch(image_data.url)
+            phash = await anyio.to_thread.run_sync(difference_hash, stored.path)
+        except DisallowedUpstreamError:
+            raise
+        except Exception as e:
+            print(f"Skipping duplicate check for {image_data.id}: {str(e)}")
+            stored = None
+
+        # Checked against the table, not per-process state, so saves through
+        # any worker see each other; the locks last until the insert commits
+        if db.get_bind().dialect.name == "postgresql":
+            await db.execute(duplicate_check_locks(image_data.url, phash))
+        existing = await db.scalar(select(Image.id).where(Image.url == image_data.url).limit(1))
+        if existing is not None:
+            raise DuplicateImageError(existing, 0)
+        if phash is not None:
+            for distance, image_id in await find_similar(db, phash, settings.IMAGE_DUPLICATE_DISTANCE):
+                if image_id != image_data.id:
+                    raise DuplicateImageError(image_id, distance)
+        return stored, phash
+
+    async def get_similar_images(self, db: AsyncSession, image_id: str, max_distance: int, limit: int) -> List[SimilarImage]:
+        """
+        Images whose perceptual hash is within max_distance bits of this
+        one's, nearest first. An image saved before hashing existed is
+        hashed on the first request. Raises ValueError when it does not exist.
+        """
+        row = (await db.execute(select(Image.phash).where(Image.id == image_id))).one_or_none()
+        if row is None:
+            raise ValueError(f"Image with id {image_id} not found")
+        if row.phash is not None:
+            phash = to_unsigned(row.phash)
+        else:
+            stored = await self.get_image_content(db, image_id)
+            phash = await anyio.to_thread.run_sync(difference_hash, stored.path)
+            await db.execute(update(Image).where(Image.id == image_id).values(**hash_columns(phash)))
+            await db.commit()
+
+        hits = [(distance, hit) for distance, hit in await find_similar(db, phash, max_distance) if hit != image_id][:limit]
+        if not hits:
+            return []
+        images = {image.id: image for image in await db.scalars(select(Image).where(Image.id.in_([hit for _, hit in hits])))}
+        return [
+            SimilarImage(**self._to_response(images[hit]).model_dump(), distance=distance)
+            for distance, hit in hits
+            if hit in images  # Deleted since the candidates were read
+        ]
+
+    async def save_images(self, db: AsyncSession, images: List[ImageResponse]) -> BulkSaveResponse:
+        """
+        Save many images with one multi-row INSERT ... ON CONFLICT (id) DO
+        NOTHING in a single transaction. Ids that are already stored are
+        reported as "exists" instead of failing the whole batch. Photos are
+        not checked for near-duplicates here; the variant pipeline hashes
+        them after the insert.
+        """
+        rows, statuses, seen = [], [], set()
+        for image_data in images:
+            if image_data.id in seen:
+                statuses.append("duplicate")
+                continue
+            seen.add(image_data.id)
+            statuses.append(None)
+            rows.append({
+                "id": image_data.id,
+                "prompt": image_data.prompt,
+                "url": image_data.url,
+                "likes": image_data.likes,
+                "is_suggested": image_data.is_suggested,
+                "original_input": image_data.original_input,
+            })
+        if not rows:
+            return BulkSaveResponse(created=0, items=[])
+
+        # One statement for the whole batch; RETURNING only yields the rows
+        # that were actually inserted, which is how "exists" is detected.
+        insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+        stmt = insert(Image).values(rows).on_conflict_do_nothing(index_elements=[Image.id]).returning(Image.id)
+        try:
+            created = set((await db.scalars(stmt)).all())
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            print(f"Error saving images: {str(e)}")
+            raise
+
+        if self.search_index.loaded:
+            for row in rows:
+                if row["id"] in created:
+                    self.search_index.add(row["id"], row["prompt"], row["original_input"])
+        if self.variant_pipeline is not None:
+            for image_id in created:
+                self.variant_pipeline.submit(image_id)
+        items = [
+            BulkSaveItem(id=image_data.id, status=status or ("created" if image_data.id in created else "exists"))
+            for image_data, status in zip(images, statuses)
+        ]
+        return BulkSaveResponse(created=len(created), items=items)
+
+    def _to_response(self, image: Image) -> ImageResponse:
+        likes = image.likes
+        if self.like_buffer is not None:
+            likes += self.like_buffer.pending(image.id)  # Likes not flushed yet
+        return ImageResponse(
+            id=image.id,
+            prompt=image.prompt,
+            url=image.url,
+            created_at=image.created_at,
+            likes=likes,
+            is_suggested=False,  # Default value since column doesn't exist yet
+            suggested_animal=None,  # Default value since this is a new feature
+            srcset=self._srcset(image.id, image.variant_widths),
+        )
+
+    @staticmethod
+    def _srcset(image_id: str, variant_widths: Optional[str]) -> Optional[str]:
+        if not variant_widths:
+            return None
+        return ", ".join(f"/images/{image_id}/variants/{width}.webp {width}w" for width in variant_widths.split(","))
+
+    async def get_image_variant(self, db: AsyncSession, image_id: str, width: int) -> Tuple[str, str]:
+        """
+        Path and content digest of one rendered variant. Raises ValueError
+        when the image or that width does not exist, and VariantMissingError
+        (after scheduling a re-render) when it was evicted from disk.
+        """
+        row = (await db.execute(
+            select(Image.content_sha256, Image.variant_widths).where(Image.id == image_id)
+        )).one_or_none()
+        if row is None or not row.variant_widths or str(width) not in row.variant_widths.split(","):
+            raise ValueError(f"No {width}px variant for image {image_id}")
+        path = variant_path(settings.IMAGE_VARIANT_DIR, row.content_sha256, width)
+        try:
+            os.stat(path)
+            out_dir = os.path.dirname(path)
+            touch(out_dir, os.stat(out_dir).st_mtime)  # Recently served, for the variant cache's LRU
+            if self.variant_pipeline is not None:
+                self.variant_pipeline.mark_used(row.content_sha256)
+        except FileNotFoundError:
+            if self.variant_pipeline is not None:
+                self.variant_pipeline.submit(image_id)
+            raise VariantMissingError(f"The {width}px variant of image {image_id} is being rendered again")
+        return path, row.content_sha256
+
+    @staticmethod
+    def _newest_first(cursor: Optional[str] = None):
+        """Images ordered by (created_at, id) desc, starting after the cursor."""
+        stmt = select(Image).order_by(Image.created_at.desc(), Image.id.desc())
+        if cursor:
+            after = decode_cursor(cursor, IMAGE_CURSOR_KEYS)
+            stmt = stmt.where(tuple_(Image.created_at, Image.id) < (after["created_at"], after["id"]))
+        return stmt
+
+    async def get_images_page(self, db: AsyncSession, cursor: Optional[str], limit: int) -> Tuple[List[ImageResponse], Optional[str]]:
         """
-        Get all generated images from database.
+        Get one page of images, newest first, using keyset pagination on
+        (created_at, id). Returns the page and the cursor for the next one.
         """
         try:
-            images = db.query(Image).order_by(Image.created_at.desc()).all()
-            return [
-                ImageResponse(
-                    id=image.id,
-                    prompt=image.prompt,
-                    url=image.url,
-                    created_at=image.created_at,
-                    likes=image.likes,
-                    is_suggested=False,  # Default value since column doesn't exist yet
-                    suggested_animal=None  # Default value since this is a new feature
-                ) for image in images
-            ]
+            images = (await db.scalars(self._newest_first(cursor).limit(limit + 1))).all()
+            next_cursor = None
+            if len(images) > limit:
+                images = images[:limit]
+                last = images[-1]
+                next_cursor = encode_cursor({"created_at": last.created_at, "id": last.id})
+            return [self._to_response(image) for image in images], next_cursor
         except Exception as e:
             print(f"Error fetching images: {str(e)}")
             raise
 
-    def delete_image(self, db: Session, image_id: str) -> bool:
+    async def iter_images_ndjson(self, db: AsyncSession, cursor: Optional[str] = None) -> AsyncIterator[str]:
+        """
+        Yield images as NDJSON lines, newest first, fetching rows from the
+        database in batches of STREAM_BATCH_SIZE.
+        """
+        stmt = self._newest_first(cursor).execution_options(yield_per=settings.STREAM_BATCH_SIZE)
+        async for image in await db.stream_scalars(stmt):
+            yield self._to_response(image).model_dump_json() + "\n"
+
+    async def search_images(self, db: AsyncSession, q: str, cursor: Optional[str], limit: int) -> Tuple[List[ImageResponse], Optional[str]]:
+        """
+        Full-text search over image prompts, best match first, one page at a
+        time. Postgres ranks the generated tsvector column with ts_rank_cd;
+        other databases use the in-process inverted index. Pages are keyed on
+        (rank, id), and the cursor for the next page is returned with the page.
+        """
+        after = decode_cursor(cursor, SEARCH_CURSOR_KEYS) if cursor else None
+        if db.get_bind().dialect.name == "postgresql":
+            ranked = await self._search_tsvector(db, q, after, limit + 1)
+        else:
+            ranked = await self._search_index(db, q, after, limit + 1)
+
+        next_cursor = None
+        if len(ranked) > limit:
+            ranked = ranked[:limit]
+            rank, last = ranked[-1]
+            next_cursor = encode_cursor({"rank": rank, "id": last.id})
+        return [self._to_response(image) for _, image in ranked], next_cursor
+
+    @staticmethod
+    async def _search_tsvector(db: AsyncSession, q: str, after: Optional[Dict], limit: int) -> List[Tuple[float, Image]]:
+        search_vector = literal_column(f"images.{SEARCH_VECTOR_COLUMN}")
+        query = func.websearch_to_tsquery("english", q)
+        # float4 widened to float8 so the rank survives the cursor round trip
+        rank = cast(func.ts_rank_cd(search_vector, query), Float)
+        stmt = (
+            select(rank, Image)
+            .where(search_vector.op("@@")(query))
+            .order_by(rank.desc(), Image.id.desc())
+            .limit(limit)
+        )
+        if after:
+            stmt = stmt.where(tuple_(rank, Image.id) < (after["rank"], after["id"]))
+        return [(rank, image) for rank, image in (await db.execute(stmt)).all()]
+
+    async def _search_index(self, db: AsyncSession, q: str, after: Optional[Dict], limit: int) -> List[Tuple[float, Image]]:
+        if not self.search_index.loaded:
+            rows = await db.execute(select(Image.id, Image.prompt, Image.original_input))
+            self.search_index.load(rows.all())
+        hits = self.search_index.search(q)
+        if after:
+            hits = [hit for hit in hits if hit < (after["rank"], after["id"])]
+        hits = hits[:limit]
+        if not hits:
+            return []
+        images = {image.id: image for image in await db.scalars(select(Image).where(Image.id.in_([image_id for _, image_id in hits])))}
+        return [(rank, images[image_id]) for rank, image_id in hits if image_id in images]
+
+    async def delete_image(self, db: AsyncSession, image_id: str) -> bool:
         """
         Delete an image by ID from database.
         """
         try:
-            image = db.query(Image).filter(Image.id == image_id).first()
-            if not image:
-                return False
-            
-            db.delete(image)
-            db.commit()
-            return True
+            result = await db.execute(delete(Image).where(Image.id == image_id))
+            await db.commit()
+            self.search_index.remove(image_id)
+            self.content_digests.pop(image_id)
+            return result.rowcount > 0
         except Exception as e:
             print(f"Error deleting image: {str(e)}")
-            db.rollback()
+            await db.rollback()
             raise
 
-    def update_likes(self, db: Session, image_id: str, action: Literal['like', 'unlike']) -> int:
+    async def update_likes(self, db: AsyncSession, image_id: str, action: Literal['like', 'unlike']) -> int:
         """
         Update likes count for an image.
+        Single atomic UPDATE ... RETURNING, so concurrent likes are never lost.
+        In write-behind mode the change is buffered and flushed in batches.
         """
+        if self.like_buffer is not None:
+            return await self.like_buffer.record(db, image_id, action)
         try:
-            image = db.query(Image).filter(Image.id == image_id).first()
-            if not image:
+            delta = 1 if action == 'like' else -1
+            # SQLite spells the scalar GREATEST as a two-argument max()
+            greatest = func.max if db.get_bind().dialect.name == "sqlite" else func.greatest
+            likes = (await db.execute(
+                update(Image)
+                .where(Image.id == image_id)
+                .values(likes=greatest(Image.likes + delta, 0))
+                .returning(Image.likes)
+            )).scalar_one_or_none()
+            if likes is None:
                 raise ValueError(f"Image with id {image_id} not found")
-            
-            if action == 'like':
-                image.likes += 1
-            else:
-                image.likes = max(0, image.likes - 1)
-            
-            db.commit()
-            db.refresh(image)
-            return image.likes
+
+            await db.commit()
+            return likes
         except Exception as e:
             print(f"Error updating likes: {str(e)}")
-            db.rollback()
+            await db.rollback()
             raise
 
-    def generate_image_replicate(self, prompt: str) -> ImageResponse:
-        """Generate a new image using Replicate's API."""
+    async def generate_image_replicate(
+        self,
+        prompt: str,
+        on_progress: Optional[Callable[[Optional[float]], None]] = None,
+    ) -> ImageResponse:
+        """
+        Generate a new image with Replicate's SDXL model.
+        Creates the prediction and polls it with the async client, so a
+        generation that takes many seconds never blocks the event loop.
+        """
+        if self.client is None:
+            raise ValueError("Replicate is not configured")
+        prediction = await self.client.predictions.async_create(
+            version=settings.REPLICATE_MODEL_VERSION.split(":")[-1],
+            input={"prompt": prompt},
+        )
         try:
-            # Call Replicate API to generate image
-            output = replicate.run(
-                "stability-ai/sdxl:39ed52f2a78e934b3ba6e2a89f5b1c712de7dfea535525255b1aa35c5565e08b",
-                input={"prompt": prompt}
-            )
-            
-            # Create image response
-            image_id = str(uuid.uuid4())
-            image = ImageResponse(
-                id=image_id,
-                url=output[0],  # Replicate returns a list of URLs
-                prompt=prompt,
-                created_at=datetime.utcnow()
-            )
-            
-            # Store image
-            self.images.append(image)
-            return image
-            
-        except Exception as e:
-            raise Exception(f"Failed to generate image: {str(e)}") 
\ No newline at end of file
+            while prediction.status not in ("succeeded", "failed", "canceled"):
+                if on_progress is not None:
+                    progress = prediction.progress
+                    on_progress(progress.percentage if progress else None)
+                await asyncio.sleep(settings.REPLICATE_POLL_INTERVAL)
+                await prediction.async_reload()
+        except asyncio.CancelledError:
+            # Timed out or shutting down: stop paying for the prediction
+            try:
+                await prediction.async_cancel()
+            except Exception as e:
+                print(f"Error canceling prediction {prediction.id}: {str(e)}")
+            raise
+
+        if prediction.status != "succeeded":
+            raise ValueError(f"Failed to generate image: {prediction.error or prediction.status}")
+        output = prediction.output
+        return ImageResponse(
+            id=str(uuid.uuid4()),
+            url=output[0] if isinstance(output, list) else output,  # SDXL returns a list of URLs
+            prompt=prompt,
+            created_at=datetime.utcnow()
+        )
@@ -0,0 +1,82 @@
+from functools import lru_cache
+from itertools import combinations
+from typing import Dict, List, Tuple
+
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.image import Image, PHASH_CHUNK_COLUMNS
+
+HASH_BITS = 64
+CHUNK_BITS = HASH_BITS // len(PHASH_CHUNK_COLUMNS)
+# Postgres has no unsigned BIGINT, so hashes are stored two's-complement
+_SIGN_BIT = 1 << (HASH_BITS - 1)
+
+
+def to_signed(phash: int) -> int:
+    return phash - (1 << HASH_BITS) if phash & _SIGN_BIT else phash
+
+
+def to_unsigned(stored: int) -> int:
+    return stored & ((1 << HASH_BITS) - 1)
+
+
+def substrings(phash: int) -> List[int]:
+    mask = (1 << CHUNK_BITS) - 1
+    return [(phash >> (i * CHUNK_BITS)) & mask for i in range(len(PHASH_CHUNK_COLUMNS))]
+
+
+def hash_columns(phash: int) -> Dict[str, int]:
+    """Column values for an image's hash: the full hash and its indexed substrings."""
+    values = {"phash": to_signed(phash)}
+    values.update(zip(PHASH_CHUNK_COLUMNS, substrings(phash)))
+    return values
+
+
+@lru_cache(maxsize=None)
+def _flips(radius: int) -> Tuple[int, ...]:
+    """Every substring mask with at most `radius` bits set."""
+    return tuple(
+        sum(1 << bit for bit in bits)
+        for weight in range(radius + 1)
+        for bits in combinations(range(CHUNK_BITS), weight)
+    )
+
+
+def lock_keys(phash: int, max_distance: int) -> List[Tuple[int, int]]:
+    """
+    (substring index, value) buckets to lock while checking `phash` for
+    near-duplicates: every value within max_distance // 4 bits of each of
+    its substrings. Two hashes within max_distance of each other agree to
+    within that radius on some substring, so each one's own value there is
+    in the other's set and their checks contend for at least one key.
+    Sorted, so every checker takes its keys in the same order.
+    """
+    flips = _flips(max_distance // len(PHASH_CHUNK_COLUMNS))
+    return sorted((i, key ^ flip) for i, key in enumerate(substrings(phash)) for flip in flips)
+
+
+async def find_similar(db: AsyncSession, phash: int, max_distance: int) -> List[Tuple[int, str]]:
+    """
+    (distance, image_id) for every image whose hash is within max_distance
+    bits of `phash`, nearest first.
+
+    Multi-index hashing in the database: two hashes within distance r agree
+    to within r // 4 bits on at least one of their four 16-bit substrings,
+    so one indexed IN lookup per substring column fetches every candidate,
+    and a popcount keeps the true matches. Because the hashes live in the
+    table, every worker sees every saved image.
+    """
+    flips = _flips(max_distance // len(PHASH_CHUNK_COLUMNS))
+    probes = [
+        getattr(Image, column).in_([key ^ flip for flip in flips])
+        for column, key in zip(PHASH_CHUNK_COLUMNS, substrings(phash))
+    ]
+    rows = await db.execute(select(Image.id, Image.phash).where(or_(*probes)))
+    hits = []
+    for image_id, stored in rows.all():
+        distance = (to_unsigned(stored) ^ phash).bit_count()
+        if distance <= max_distance:
+            hits.append((distance, image_id))
+    hits.sort()
+    return hits
@@ -0,0 +1,415 @@
+import asyncio
+import hashlib
+import ipaddress
+import os
+import shutil
+import socket
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+import anyio
+import httpx
+
+from app.core.singleflight import SingleFlight
+
+# Extension per sniffed format; the blob's file name is <sha256>.<ext>
+MEDIA_TYPES = {
+    "jpg": "image/jpeg",
+    "png": "image/png",
+    "gif": "image/gif",
+    "webp": "image/webp",
+    "bin": "application/octet-stream",
+}
+
+# Redirect hops followed per fetch; each hop is checked like the original URL
+MAX_REDIRECTS = 3
+# A hit moves an entry up the LRU (its mtime) at most this often, in seconds
+TOUCH_INTERVAL = 60.0
+# Seconds between walks of the directory, which pick up other workers' changes
+SWEEP_INTERVAL = 300.0
+# Once over its cap, a directory is trimmed to this fraction of it, so the
+# next trim is many writes away
+TRIM_TO = 0.9
+
+
+def sniff_extension(head: bytes) -> str:
+    """File extension for the image format in the first bytes of a file."""
+    if head.startswith(b"\xff\xd8\xff"):
+        return "jpg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if head[:6] in (b"GIF87a", b"GIF89a"):
+        return "gif"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "webp"
+    return "bin"
+
+
+class UpstreamImageError(Exception):
+    """The image could not be fetched from its original URL."""
+
+
+class DisallowedUpstreamError(UpstreamImageError):
+    """The URL points somewhere the store must not fetch from."""
+
+
+def host_allowed(host: str, allowed_hosts: Iterable[str]) -> bool:
+    """Exact hostname match, or a subdomain of a "*.example.com" entry."""
+    host = host.lower().rstrip(".")
+    for allowed in allowed_hosts:
+        if allowed.startswith("*."):
+            if host.endswith(allowed[1:]):
+                return True
+        elif host == allowed:
+            return True
+    return False
+
+
+def is_public_address(address: str) -> bool:
+    ip = ipaddress.ip_address(address.split("%")[0])
+    if ip.version == 6 and ip.ipv4_mapped:
+        ip = ip.ipv4_mapped
+    return ip.is_global and not ip.is_multicast
+
+
+def touch(path: str, mtime: float) -> None:
+    """Mark an entry as recently used; the LRU order is the mtime on disk."""
+    if time.time() - mtime > TOUCH_INTERVAL:
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+
+
+def evict_least_recent(entries: List[Tuple[float, str, str, int]], max_bytes: int, keep: Optional[str] = None) -> Tuple[List[str], int]:
+    """
+    If the entries' total size is over `max_bytes`, delete them, least
+    recently used first, until it is down to TRIM_TO of it. `entries` are
+    (last use, key, path, size); a path may be a file or a directory.
+    Returns the evicted keys and the bytes left. Blocking.
+
+    Processes sharing a directory each evict from their own view of it;
+    two of them evicting at once at worst delete a little more than needed.
+    """
+    total = sum(size for _, _, _, size in entries)
+    if total <= max_bytes:
+        return [], total
+    evicted = []
+    for _, key, path, size in sorted(entries):
+        if total <= max_bytes * TRIM_TO:
+            break
+        if key == keep:
+            continue
+        try:
+            if os.path.isdir(path):
+                shutil.rmtree(path)
+            else:
+                os.unlink(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+        evicted.append(key)
+    return evicted, total
+
+
+class LruIndex:
+    """
+    One process's view of a size-capped cache directory shared by worker
+    processes: key -> (path, size), least recently used first, and their
+    total. The owner updates it as entries are written, served or found
+    missing. `maintain` evicts from it when the total is over `max_bytes`,
+    and every SWEEP_INTERVAL rebuilds it from `scan` (a walk of the
+    directory, in mtime order) to pick up other workers' changes. Between
+    sweeps the directory can exceed the cap by what the other workers wrote.
+    """
+
+    def __init__(self, scan: Callable[[], List[Tuple[float, str, str, int]]], max_bytes: int, name: str):
+        self.scan = scan
+        self.max_bytes = max_bytes
+        self.name = name
+        self.entries: "OrderedDict[str, Tuple[str, int]]" = OrderedDict()
+        self.total_bytes = 0
+        self.last_sweep = 0.0  # Never: the first maintenance walks the directory
+        self._task: Optional[asyncio.Task] = None
+        self.evictions = 0
+        self.sweeps = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, key: str) -> Optional[Tuple[str, int]]:
+        return self.entries.get(key)
+
+    def rebuild(self, found: List[Tuple[float, str, str, int]]) -> None:
+        self.entries = OrderedDict((key, (path, size)) for _, key, path, size in sorted(found))
+        self.total_bytes = sum(size for _, size in self.entries.values())
+        self.last_sweep = time.monotonic()
+
+    def remember(self, key: str, path: str, size: int) -> None:
+        """Record an entry as the most recently used."""
+        self.forget([key])
+        self.entries[key] = (path, size)
+        self.total_bytes += size
+
+    def mark_used(self, key: str) -> None:
+        if key in self.entries:
+            self.entries.move_to_end(key)
+
+    def forget(self, keys: List[str]) -> None:
+        for key in keys:
+            entry = self.entries.pop(key, None)
+            if entry is not None:
+                self.total_bytes -= entry[1]
+
+    def trim(self, keep: Optional[str] = None) -> None:
+        """Evict down to the cap now. Blocking; for startup."""
+        evicted, _ = evict_least_recent(self._ordered(), self.max_bytes, keep)
+        self.forget(evicted)
+        self.evictions += len(evicted)
+
+    def schedule(self, keep: str) -> None:
+        """Start `maintain` in the background if the index is over the cap or a sweep is due."""
+        due = self.total_bytes > self.max_bytes or time.monotonic() - self.last_sweep >= SWEEP_INTERVAL
+        if due and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self.maintain(keep))
+
+    async def maintain(self, keep: str) -> None:
+        try:
+            if time.monotonic() - self.last_sweep >= SWEEP_INTERVAL:
+                self.rebuild(await anyio.to_thread.run_sync(self.scan))
+                self.sweeps += 1
+            evicted, _ = await anyio.to_thread.run_sync(evict_least_recent, self._ordered(), self.max_bytes, keep)
+            self.forget(evicted)
+            self.evictions += len(evicted)
+        except Exception as e:
+            print(f"Error trimming the {self.name}: {str(e)}")
+
+    async def settle(self) -> None:
+        """Wait for running maintenance to finish."""
+        if self._task is not None:
+            await asyncio.shield(self._task)
+
+    def _ordered(self) -> List[Tuple[float, str, str, int]]:
+        return [(i, key, path, size) for i, (key, (path, size)) in enumerate(self.entries.items())]
+
+    def stats(self) -> Dict:
+        return {
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+            "sweeps": self.sweeps,
+        }
+
+
+@dataclass
+class StoredImage:
+    digest: str
+    path: str
+    size: int
+    media_type: str
+
+
+class ImageStore:
+    """
+    Content-addressed on-disk copy of upstream images.
+
+    Each blob is stored once under its sha256, sharded two levels deep
+    (ab/cd/abcd...<ext>), whichever URLs it came from. The store keeps at
+    most `max_bytes` on disk, evicting the least recently served blobs.
+
+    Every worker process shares the directory. Each keeps an LruIndex of
+    the blobs, updated as it stores and serves them, and evicts from it
+    (down to TRIM_TO of the cap) in the background when a download takes
+    the total over `max_bytes`; periodic sweeps re-read the directory,
+    ordered by mtime (which hits refresh), for other workers' changes. A
+    blob another worker evicted is a miss here and is fetched again.
+
+    URLs come from clients, so the store only fetches from `allowed_hosts`,
+    and only when every address the host resolves to is public (unless
+    `allow_private`, for local stubs). Redirects are followed by hand so
+    that each hop passes the same checks.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        max_bytes: int,
+        max_object_bytes: int,
+        http_client: Optional[httpx.AsyncClient] = None,
+        allowed_hosts: Iterable[str] = (),
+        allow_private: bool = False,
+    ):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_object_bytes = max_object_bytes
+        self.allowed_hosts = [host.lower() for host in allowed_hosts]
+        self.allow_private = allow_private
+        # Shared pooled client, injected by the app lifespan (see app/main.py)
+        self.http_client = http_client
+        # Blobs by digest, least recently used first; the files may be gone
+        self._index = LruIndex(self._scan, max_bytes, "image store")
+        self._flight = SingleFlight()
+        self.hits = 0
+        self.misses = 0
+        self.fetch_errors = 0
+        self.rejected_urls = 0
+
+    def load(self) -> None:
+        """Index the blobs already on disk and trim them to max_bytes. Blocking; call once at startup."""
+        os.makedirs(os.path.join(self.root, "tmp"), exist_ok=True)
+        self._index.rebuild(self._scan())
+        self._index.trim()
+
+    def _scan(self) -> List[Tuple[float, str, str, int]]:
+        found = []
+        for shard, _, files in os.walk(self.root):
+            if os.path.relpath(shard, self.root).split(os.sep)[0] == "tmp":
+                continue
+            for name in files:
+                digest = name.split(".")[0]
+                if len(digest) != 64:
+                    continue
+                path = os.path.join(shard, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue  # Evicted by another worker mid-walk
+                found.append((stat.st_mtime, digest, path, stat.st_size))
+        return found
+
+    def lookup(self, digest: str) -> Optional[StoredImage]:
+        """The stored blob for a digest, marking it recently used, or None if it is not on disk."""
+        entry = self._index.get(digest)
+        path = entry[0] if entry else self._find(digest)
+        if path is None:
+            return None
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            self._index.forget([digest])  # Evicted by another worker
+            return None
+        touch(path, stat.st_mtime)
+        self._index.remember(digest, path, stat.st_size)
+        self.hits += 1
+        return self._stored(digest, path, stat.st_size)
+
+    def _find(self, digest: str) -> Optional[str]:
+        """Path of a blob another worker stored, whatever its extension."""
+        shard = os.path.join(self.root, digest[:2], digest[2:4])
+        try:
+            names = os.listdir(shard)
+        except FileNotFoundError:
+            return None
+        for name in names:
+            if name.startswith(f"{digest}."):
+                return os.path.join(shard, name)
+        return None
+
+    async def check_url(self, url: str) -> None:
+        """Raise DisallowedUpstreamError unless the store may fetch `url`."""
+        parts = urlsplit(url)
+        host = parts.hostname
+        if parts.scheme not in ("http", "https") or not host:
+            raise DisallowedUpstreamError(f"Not an http(s) image URL: {url}")
+        if not host_allowed(host, self.allowed_hosts):
+            raise DisallowedUpstreamError(f"Images from {host} are not allowed")
+        if self.allow_private:
+            return
+        try:
+            port = parts.port or (443 if parts.scheme == "https" else 80)
+            infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        except (OSError, ValueError) as e:
+            raise UpstreamImageError(f"Cannot resolve {host}: {str(e)}") from e
+        if not infos or not all(is_public_address(info[4][0]) for info in infos):
+            raise DisallowedUpstreamError(f"{host} resolves to a non-public address")
+
+    async def fetch(self, url: str) -> StoredImage:
+        """Download `url` into the store (once, however many callers ask) and return the blob."""
+        return await self._flight.do(url, lambda: self._download(url))
+
+    async def _download(self, url: str) -> StoredImage:
+        self.misses += 1
+        tmp_path = os.path.join(self.root, "tmp", uuid.uuid4().hex)
+        digest = hashlib.sha256()
+        try:
+            if self.http_client is None:
+                async with httpx.AsyncClient() as client:
+                    size, head = await self._stream_to(client, url, tmp_path, digest)
+            else:
+                size, head = await self._stream_to(self.http_client, url, tmp_path, digest)
+        except DisallowedUpstreamError:
+            self.rejected_urls += 1
+            await self._discard(tmp_path)
+            raise
+        except UpstreamImageError:
+            self.fetch_errors += 1
+            await self._discard(tmp_path)
+            raise
+        except Exception as e:
+            self.fetch_errors += 1
+            await self._discard(tmp_path)
+            raise UpstreamImageError(f"Failed to fetch image: {str(e)}") from e
+
+        hexdigest = digest.hexdigest()
+        path = self.path_for(hexdigest, sniff_extension(head))
+        await anyio.to_thread.run_sync(self._publish, tmp_path, path)
+        self._index.remember(hexdigest, path, size)
+        self._index.schedule(keep=hexdigest)
+        return self._stored(hexdigest, path, size)
+
+    async def _stream_to(self, client: httpx.AsyncClient, url: str, tmp_path: str, digest) -> tuple:
+        """Write the response body to tmp_path, hashing as it goes; returns (size, first bytes)."""
+        for _ in range(MAX_REDIRECTS + 1):
+            await self.check_url(url)
+            async with client.stream("GET", url, follow_redirects=False) as response:
+                if response.is_redirect:
+                    url = urljoin(url, response.headers["location"])
+                    continue
+                if response.status_code != 200:
+                    raise UpstreamImageError(f"Upstream returned {response.status_code} for {url}")
+                size, head = 0, b""
+                async with await anyio.open_file(tmp_path, "wb") as f:
+                    async for chunk in response.aiter_bytes():
+                        size += len(chunk)
+                        if size > self.max_object_bytes:
+                            raise UpstreamImageError(f"Image larger than {self.max_object_bytes} bytes")
+                        if len(head) < 16:
+                            head += chunk[:16 - len(head)]
+                        digest.update(chunk)
+                        await f.write(chunk)
+                return size, head
+        raise UpstreamImageError(f"More than {MAX_REDIRECTS} redirects for {url}")
+
+    def path_for(self, digest: str, extension: str) -> str:
+        return os.path.join(self.root, digest[:2], digest[2:4], f"{digest}.{extension}")
+
+    @staticmethod
+    def _publish(tmp_path: str, path: str) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    async def _discard(tmp_path: str) -> None:
+        try:
+            await anyio.Path(tmp_path).unlink()
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def _stored(digest: str, path: str, size: int) -> StoredImage:
+        return StoredImage(digest, path, size, MEDIA_TYPES.get(path.rsplit(".", 1)[-1], MEDIA_TYPES["bin"]))
+
+    def stats(self) -> Dict:
+        return {
+            "blobs": len(self._index),
+            **self._index.stats(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "fetch_errors": self.fetch_errors,
+            "rejected_urls": self.rejected_urls,
+            "coalescing": self._flight.stats(),
+        }
@@ -0,0 +1,184 @@
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, List, Optional, Set
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.thumbnails import difference_hash, existing_widths, lower_priority, render_variants, variant_dir
+from app.models.image import Image
+from app.services.image_similarity import hash_columns
+from app.services.image_store import LruIndex
+
+
+def dir_size(path: str) -> int:
+    return sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+
+
+class VariantMissingError(Exception):
+    """The image's variants were evicted from disk; they are being rendered again."""
+
+
+class VariantPipeline:
+    """
+    Downscaled WebP variants of saved images, rendered in a process pool.
+
+    `submit` schedules an image and returns at once. The pipeline gets the
+    source bytes through the image service's content store, renders the
+    variants in a worker process (so Pillow never runs on the event loop or
+    holds the GIL there) and records the widths on the image row. Variants
+    are keyed by the source's content hash, so duplicate photos are
+    rendered once. Images saved without a perceptual hash (bulk saves) get
+    one here too. At most `max_pending` images wait at a time; past that
+    new submissions are dropped and counted.
+
+    Like the content store, the variant directory is capped at `max_bytes`
+    through an LruIndex: once a render takes it over, the least recently
+    served images' variants are deleted in the background, and are rendered
+    again on next request.
+    """
+
+    def __init__(
+        self,
+        image_service,
+        session_factory: Callable[[], AsyncSession],
+        root: str,
+        widths: List[int],
+        quality: int,
+        method: int,
+        workers: int,
+        max_pending: int,
+        max_bytes: int,
+        nice: int = 0,
+    ):
+        self.image_service = image_service
+        self.session_factory = session_factory
+        self.root = root
+        self.widths = sorted(widths)
+        self.quality = quality
+        self.method = method
+        self.workers = workers
+        self.max_pending = max_pending
+        # Each image's variant directory by content digest, least recently served first
+        self._index = LruIndex(self._scan, max_bytes, "variant directory")
+        self.nice = nice
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # Downloads and renders in flight; the process pool queues the rest
+        self._slots = asyncio.Semaphore(workers * 2)
+        self._tasks: Set[asyncio.Task] = set()
+        self.rendered = 0
+        self.reused = 0
+        self.failed = 0
+        self.dropped = 0
+        self.pool_restarts = 0
+        self.total_render_seconds = 0.0
+
+    def start(self) -> None:
+        if self._executor is None:
+            # spawn: forking a process that runs an event loop and thread pools is unsafe
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=lower_priority,
+                initargs=(self.nice if hasattr(os, "nice") else 0,),
+            )
+
+    async def stop(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._executor is not None:
+            executor, self._executor = self._executor, None
+            await asyncio.to_thread(executor.shutdown, wait=True, cancel_futures=True)
+
+    def submit(self, image_id: str) -> bool:
+        """Schedule variants for a saved image; False if the pipeline is off or full."""
+        if self._executor is None:
+            return False
+        if len(self._tasks) >= self.max_pending:
+            self.dropped += 1
+            return False
+        task = asyncio.create_task(self._process(image_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return True
+
+    async def _process(self, image_id: str) -> None:
+        async with self._slots:
+            try:
+                async with self.session_factory() as db:
+                    stored = await self.image_service.get_image_content(db, image_id)
+                    out_dir = variant_dir(self.root, stored.digest)
+                    widths = existing_widths(out_dir)
+                    if widths:
+                        self.reused += 1
+                        self._index.mark_used(stored.digest)
+                    else:
+                        start = time.perf_counter()
+                        widths = await self._run(render_variants, stored.path, out_dir, self.widths, self.quality, self.method)
+                        self.total_render_seconds += time.perf_counter() - start
+                        self.rendered += 1
+                        self._index.remember(stored.digest, out_dir, await asyncio.to_thread(dir_size, out_dir))
+                        self._index.schedule(keep=stored.digest)
+                    values = {"variant_widths": ",".join(map(str, widths))}
+                    if await db.scalar(select(Image.phash).where(Image.id == image_id)) is None:
+                        values.update(hash_columns(await self._run(difference_hash, stored.path)))
+                    await db.execute(update(Image).where(Image.id == image_id).values(**values))
+                    await db.commit()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failed += 1
+                print(f"Error rendering variants for {image_id}: {str(e)}")
+
+    def mark_used(self, digest: str) -> None:
+        """An image's variants were just served."""
+        self._index.mark_used(digest)
+
+    def _scan(self) -> list:
+        """(mtime, digest, directory, size) for every image's variants. Blocking."""
+        entries = []
+        for shard, dirs, files in os.walk(self.root):
+            if len(os.path.relpath(shard, self.root).split(os.sep)) == 3:
+                try:
+                    size = sum(os.stat(os.path.join(shard, name)).st_size for name in files)
+                    entries.append((os.stat(shard).st_mtime, os.path.basename(shard), shard, size))
+                except FileNotFoundError:
+                    pass  # Evicted by another worker mid-walk
+                dirs.clear()
+        return entries
+
+    async def _run(self, fn, *args):
+        executor = self._executor
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+        except BrokenProcessPool:
+            self._replace_pool(executor)
+            raise
+
+    def _replace_pool(self, broken: ProcessPoolExecutor) -> None:
+        """A worker died (e.g. killed for memory); later renders get a fresh pool."""
+        if self._executor is broken:
+            self._executor = None
+            self.pool_restarts += 1
+            self.start()
+            broken.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict:
+        return {
+            "widths": self.widths,
+            "workers": self.workers,
+            "pending": len(self._tasks),
+            "max_pending": self.max_pending,
+            "rendered": self.rendered,
+            "reused": self.reused,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "pool_restarts": self.pool_restarts,
+            **self._index.stats(),
+            "render_seconds_avg": self.total_render_seconds / self.rendered if self.rendered else 0.0,
+        }
@@ -0,0 +1,156 @@
+import asyncio
+from typing import Callable, Dict, Literal, Optional
+
+from sqlalchemy import bindparam, func, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.image import Image
+
+
+class LikeBuffer:
+    """
+    Write-behind aggregation of like/unlike events.
+
+    Events become per-image deltas in memory and are written to the images
+    table in one batched UPDATE every `flush_interval` seconds or every
+    `max_events` events, whichever comes first. Counts returned to callers
+    (and merged into reads via `pending`) apply the same never-below-zero
+    rule as the direct path, event by event.
+
+    Each process buffers on top of the count it last read or wrote, so with
+    several workers the counts are eventually consistent: likes recorded by
+    other workers show up here once this buffer flushes, since every flush
+    takes the committed counts from the UPDATE as its new base.
+    """
+
+    def __init__(self, session_factory: Callable[[], AsyncSession], flush_interval: float, max_events: int):
+        self.session_factory = session_factory
+        self.flush_interval = flush_interval
+        self.max_events = max_events
+        self._base: Dict[str, int] = {}      # likes in the table as of the last read or flush
+        self._pending: Dict[str, int] = {}   # deltas not yet written
+        self._flushing: Dict[str, int] = {}  # deltas being written right now
+        self._events = 0
+        self._wakeup = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.flushes = 0
+        self.flushed_events = 0
+        self.flushed_rows = 0
+        self.flush_errors = 0
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flusher and write whatever is still buffered."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def record(self, db: AsyncSession, image_id: str, action: Literal['like', 'unlike']) -> int:
+        """Buffer one like/unlike and return the image's resulting count."""
+        if image_id not in self._base:
+            likes = await db.scalar(select(Image.likes).where(Image.id == image_id))
+            if likes is None:
+                raise ValueError(f"Image with id {image_id} not found")
+            self._base.setdefault(image_id, likes)  # Another event may have raced us here
+        current = self._base[image_id] + self.pending(image_id)
+        new = max(current + (1 if action == 'like' else -1), 0)
+        self._pending[image_id] = self._pending.get(image_id, 0) + new - current
+        self._events += 1
+        if self._events >= self.max_events:
+            self._wakeup.set()
+        return new
+
+    def pending(self, image_id: str) -> int:
+        """Delta not yet visible in the table for this image."""
+        return self._pending.get(image_id, 0) + self._flushing.get(image_id, 0)
+
+    async def flush(self) -> None:
+        async with self._lock:
+            if not self._pending:
+                return
+            self._flushing, self._pending = self._pending, {}
+            events, self._events = self._events, 0
+            deltas = {image_id: delta for image_id, delta in self._flushing.items() if delta}
+            committed: Dict[str, int] = {}
+            try:
+                if deltas:
+                    committed = await self._write(deltas)
+            except Exception as e:
+                # Put the deltas back so the next flush retries them
+                self.flush_errors += 1
+                for image_id, delta in self._flushing.items():
+                    self._pending[image_id] = self._pending.get(image_id, 0) + delta
+                self._events += events
+                print(f"Error flushing likes: {str(e)}")
+                return
+            finally:
+                flushed, self._flushing = self._flushing, {}
+            for image_id, delta in flushed.items():
+                if image_id not in self._pending:
+                    del self._base[image_id]
+                elif image_id in committed:
+                    # Includes every other worker's flushed likes, not just ours
+                    self._base[image_id] = committed[image_id]
+                else:
+                    self._base[image_id] += delta
+            self.flushes += 1
+            self.flushed_events += events
+            self.flushed_rows += len(deltas)
+
+    async def _write(self, deltas: Dict[str, int]) -> Dict[str, int]:
+        """Apply the deltas in one transaction and return the resulting counts."""
+        async with self.session_factory() as db:
+            if db.get_bind().dialect.name == "postgresql":
+                # One statement for the whole batch; casts let asyncpg type the VALUES list
+                values = ", ".join(f"(CAST(:id{i} AS VARCHAR), CAST(:delta{i} AS INTEGER))" for i in range(len(deltas)))
+                params = {}
+                for i, (image_id, delta) in enumerate(deltas.items()):
+                    params[f"id{i}"] = image_id
+                    params[f"delta{i}"] = delta
+                rows = await db.execute(text(
+                    "UPDATE images SET likes = GREATEST(images.likes + v.delta, 0) "
+                    f"FROM (VALUES {values}) AS v(id, delta) WHERE images.id = v.id "
+                    "RETURNING images.id, images.likes"
+                ), params)
+            else:
+                greatest = func.max if db.get_bind().dialect.name == "sqlite" else func.greatest
+                images = Image.__table__
+                await db.execute(
+                    update(images)
+                    .where(images.c.id == bindparam("image_id"))
+                    .values(likes=greatest(images.c.likes + bindparam("delta"), 0)),
+                    [{"image_id": image_id, "delta": delta} for image_id, delta in deltas.items()],
+                )
+                # executemany cannot RETURN; read the counts back in the same transaction
+                rows = await db.execute(select(Image.id, Image.likes).where(Image.id.in_(list(deltas))))
+            committed = {image_id: likes for image_id, likes in rows.all()}
+            await db.commit()
+            return committed
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def stats(self) -> Dict:
+        return {
+            "buffered_images": len(self._pending),
+            "buffered_events": self._events,
+            "flushes": self.flushes,
+            "flushed_events": self.flushed_events,
+            "flushed_rows": self.flushed_rows,
+            "flush_errors": self.flush_errors,
+        }
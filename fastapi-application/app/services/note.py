@@ -1,50 +1,44 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 from app.models import Note, User, Bug
 from uuid import UUID
 from fastapi import HTTPException
 from app.schemas.note import NoteRequest
+from app.schemas.user import UserResponse
+from app.core.config import settings
+from app.core.pagination import paginate
+from app.core.search import ilike_contains
 
-def create_note(db: Session, bug_id: UUID, note_data: NoteRequest, current_user: str):
+NOTE_SORT_COLUMNS = {"body": Note.body, "id": Note.id}
 
-    member = db.query(User).filter(User.username == current_user).first()
-    if not member:
-        raise HTTPException(status_code=404, detail="User not found")
+def create_note(db: Session, bug_id: UUID, note_data: NoteRequest, current_user: UserResponse):
 
     # Create a new note
     new_note = Note(
         body=note_data.body,
-        authorId=member.id,
-        bugId=bug_id,
-        author=member
+        authorId=current_user.id,
+        bugId=bug_id
     )
     db.add(new_note)
     db.commit()
     db.refresh(new_note)
     return new_note 
 
-def get_all_note(db: Session, bug_id: UUID, body: str, sort_by: str = "body", sort_order: str = "asc"):
+def get_all_note(db: Session, bug_id: UUID, body: str, sort_by: str = "body", sort_order: str = "asc", after: dict = None, limit: int = settings.DEFAULT_PAGE_SIZE):
 
     query = db.query(Note).filter(Note.bugId == bug_id)
 
     if body:
-        query = query.filter(Note.body.ilike(f"%{body}%"))
+        query = query.filter(ilike_contains(Note.body, body))
 
-    if sort_by == "body":
-        if sort_order == "asc":
-            query = query.order_by(Note.body.asc())
-        else:
-            query = query.order_by(Note.body.desc())
-    elif sort_by == "id":
-        if sort_order == "asc":
-            query = query.order_by(Note.id.asc())
-        else:
-            query = query.order_by(Note.id.desc())
-
-    notes = query.all()
+    query = query.options(joinedload(Note.author))
+    try:
+        notes, next_cursor = paginate(query, NOTE_SORT_COLUMNS[sort_by], Note.id, sort_order, after, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     if not notes:
         raise HTTPException(status_code=404, detail="Notes not found")
-    return notes
+    return notes, next_cursor
 
 def get_note_by_id(db: Session, note_id: UUID):
 
@@ -0,0 +1,179 @@
+import asyncio
+import random
+import time
+import uuid
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, List, Optional
+
+from app.schemas.image import ImageResponse
+
+
+class PrefetchPool:
+    """
+    Ready-to-serve suggestion images per animal, kept topped up by a
+    background task.
+
+    When an animal's stock drops below `low_watermark` the worker refills it
+    up to `high_watermark` from the image service's (cached) Pexels search.
+    `take` never touches the network: it returns None when the pool is empty
+    so the caller can fall back to the live path.
+
+    Every refill is a Pexels call counted against the API's rate limit, so
+    a sweep refills at most `refills_per_sweep` animals (emptiest first) and
+    warm-up spreads over several intervals; `take` draws from whichever
+    animals are stocked. A failed refill ends the sweep and backs off
+    exponentially, up to `max_backoff` seconds: that animal, and the whole
+    pool while failures are consecutive (an outage or a 429 affects every
+    search). Empty takes only wake the worker when some animal is due.
+    """
+
+    def __init__(
+        self,
+        image_service,
+        animals: List[str],
+        low_watermark: int,
+        high_watermark: int,
+        refill_interval: float,
+        refills_per_sweep: int,
+        max_backoff: float,
+    ):
+        self.image_service = image_service
+        self.animals = list(dict.fromkeys(animals))
+        self.low_watermark = low_watermark
+        self.high_watermark = high_watermark
+        self.refill_interval = refill_interval
+        self.refills_per_sweep = refills_per_sweep
+        self.max_backoff = max_backoff
+        self._pools: Dict[str, Deque[ImageResponse]] = {animal: deque() for animal in self.animals}
+        self._wakeup = asyncio.Event()
+        # Animal -> consecutive failed refills, and when the next may run (monotonic)
+        self._failures: Dict[str, int] = {}
+        self._retry_at: Dict[str, float] = {}
+        # Same for the pool as a whole: failed refills in a row, across animals
+        self._consecutive_failures = 0
+        self._paused_until = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self.served = 0
+        self.empty = 0
+        self.refills = 0
+        self.refill_errors = 0
+        self.last_refill_seconds = 0.0
+        self.max_refill_seconds = 0.0
+        self.total_refill_seconds = 0.0
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def take(self, original_input: Optional[str] = None) -> Optional[ImageResponse]:
+        """Pop a pre-fetched suggestion for any stocked animal, or None."""
+        stocked = [animal for animal, pool in self._pools.items() if pool]
+        if not stocked:
+            self.empty += 1
+            now = time.monotonic()
+            if any(self._is_due(animal, now) for animal in self.animals):
+                self._wakeup.set()
+            return None
+        animal = random.choice(stocked)
+        pool = self._pools[animal]
+        image = pool.popleft()
+        if len(pool) < self.low_watermark and self._is_due(animal, time.monotonic()):
+            self._wakeup.set()
+        self.served += 1
+        return image.model_copy(update={
+            "created_at": datetime.utcnow(),
+            "original_input": original_input,
+        })
+
+    def _due(self) -> List[str]:
+        """Animals below the low watermark and not backing off, emptiest first."""
+        now = time.monotonic()
+        due = [
+            animal for animal, pool in self._pools.items()
+            if len(pool) < self.low_watermark and self._is_due(animal, now)
+        ]
+        random.shuffle(due)  # Workers warming up at once search for different animals
+        due.sort(key=lambda animal: len(self._pools[animal]))
+        return due
+
+    def _is_due(self, animal: str, now: float) -> bool:
+        return now >= self._paused_until and now >= self._retry_at.get(animal, 0.0)
+
+    def _backoff(self, failures: int) -> float:
+        delay = min(self.refill_interval * 2 ** (failures - 1), self.max_backoff)
+        return delay * random.uniform(1.0, 1.25)  # Workers that failed together retry apart
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            for animal in self._due()[:self.refills_per_sweep]:
+                if not await self._refill(animal):
+                    break  # Pexels is failing; leave the rest for a later sweep
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.refill_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _refill(self, animal: str) -> bool:
+        start = time.perf_counter()
+        try:
+            photos = await self.image_service._search_photos(f"{animal} animal")
+        except Exception as e:
+            self.refill_errors += 1
+            now = time.monotonic()
+            self._failures[animal] = self._failures.get(animal, 0) + 1
+            self._retry_at[animal] = now + self._backoff(self._failures[animal])
+            self._consecutive_failures += 1
+            pause = self._backoff(self._consecutive_failures)
+            self._paused_until = now + pause
+            print(f"Error prefetching {animal}, pausing refills for {pause:.0f}s: {str(e)}")
+            return False
+        self._failures.pop(animal, None)
+        self._retry_at.pop(animal, None)
+        self._consecutive_failures = 0
+        pool = self._pools[animal]
+        wanted = self.high_watermark - len(pool)
+        for photo in random.sample(photos, min(wanted, len(photos))):
+            pool.append(ImageResponse(
+                id=str(uuid.uuid4()),
+                prompt=animal,
+                url=photo["src"]["medium"],
+                created_at=datetime.utcnow(),
+                likes=0,
+                is_suggested=True,
+                suggested_animal=animal,
+            ))
+        elapsed = time.perf_counter() - start
+        self.refills += 1
+        self.last_refill_seconds = elapsed
+        self.max_refill_seconds = max(self.max_refill_seconds, elapsed)
+        self.total_refill_seconds += elapsed
+        return True
+
+    def stats(self) -> Dict:
+        depth = {animal: len(pool) for animal, pool in self._pools.items()}
+        return {
+            "depth": sum(depth.values()),
+            "depth_per_animal": depth,
+            "low_watermark": self.low_watermark,
+            "high_watermark": self.high_watermark,
+            "served": self.served,
+            "empty": self.empty,
+            "refills": self.refills,
+            "refill_errors": self.refill_errors,
+            "backing_off": sum(1 for retry_at in self._retry_at.values() if retry_at > time.monotonic()),
+            "paused_for": max(0.0, self._paused_until - time.monotonic()),
+            "refill_seconds_last": self.last_refill_seconds,
+            "refill_seconds_max": self.max_refill_seconds,
+            "refill_seconds_avg": self.total_refill_seconds / self.refills if self.refills else 0.0,
+        }
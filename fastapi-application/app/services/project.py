@@ -1,4 +1,4 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload, selectinload
 from app.models.project import Project
 from app.models.project_member import ProjectMember
 from datetime import datetime, timezone
@@ -7,141 +7,99 @@ from app.schemas.user import UserResponse
 from app.models import User, Bug
 from fastapi import HTTPException
 from uuid import UUID
+from app.core.config import settings
+from app.core.pagination import paginate
+from app.core.search import ilike_contains
 
-def create_project(db: Session, project_data: ProjectCreated, user: str):
+PROJECT_SORT_COLUMNS = {"name": Project.name, "id": Project.id}
+
+def _with_creator_and_members(query):
+    """Eager-load the creator and member users alongside the projects."""
+    return query.options(
+        joinedload(Project.createdBy),
+        selectinload(Project.members).joinedload(ProjectMember.members),
+    )
+
+def _bug_ids_by_project(db: Session, project_ids: list):
+    """Bug ids for all the given projects in one query."""
+    bugs = {project_id: [] for project_id in project_ids}
+    if project_ids:
+        rows = db.query(Bug.projectId, Bug.id).filter(Bug.projectId.in_(project_ids))
+        for project_id, bug_id in rows:
+            bugs[project_id].append({"id": bug_id})
+    return bugs
+
+def _member_response(project_member: ProjectMember):
+    return ProjectMemberResponse(
+        id=project_member.id,
+        joinedAt=project_member.joined_at,
+        member=UserResponse(id=project_member.members.id, username=project_member.members.username)
+    )
+
+def _project_response(project: Project, bugs: list):
+    if not project.createdBy:
+        raise HTTPException(status_code=404, detail=f"Creator user not found for project {project.id}")
+    return ProjectResponse(
+        id=project.id,
+        name=project.name,
+        createdAt=project.createdAt,
+        updatedAt=project.updatedAt,
+        createdBy=project.createdBy,
+        members=[_member_response(project_member) for project_member in project.members],
+        bugs=bugs
+    )
+
+def create_project(db: Session, project_data: ProjectCreated, user: UserResponse):
     """Create a new project"""
-    member = db.query(User).filter(User.username == user).first()
-    project = Project(name=project_data.name, createdById=member.id)
+    project = Project(name=project_data.name, createdById=user.id)
+    project_member = ProjectMember(project=project, user_id=user.id, joined_at=datetime.now(timezone.utc))
     db.add(project)
-    db.commit()
-    db.refresh(project)
-
-    project_member = ProjectMember(project_id=project.id, user_id=member.id, joined_at=datetime.now(timezone.utc))
     db.add(project_member)
     db.commit()
+    db.refresh(project)
     db.refresh(project_member)
 
-    members = []
-    for project_member in project.members:
-        members.append(ProjectMemberResponse(
-            id=project_member.id,
-            joinedAt=project_member.joined_at,
-            member=UserResponse(id=project_member.members.id, username=project_member.members.username)
-        ))
-
-    list_bugs = []
-    bugs = db.query(Bug).filter(Bug.projectId == project.id).all()
-    if bugs:
-        for bug in bugs:
-            list_bugs.append({
-                "id": bug.id
-            })
-
+    # A new project has just its creator as member and no bugs yet
     return ProjectResponse(
         id = project.id,
         name = project.name,
         createdAt = project.createdAt,
         updatedAt = project.updatedAt,
-        createdBy = member,
-        members = members,
-        bugs = list_bugs
+        createdBy = user,
+        members = [ProjectMemberResponse(id=project_member.id, joinedAt=project_member.joined_at, member=user)],
+        bugs = []
     )
 
 
 def get_project(db: Session, project_id: UUID):
     """Get project by ID"""
-    project = db.query(Project).filter(Project.id == project_id).first()
+    project = _with_creator_and_members(db.query(Project)).filter(Project.id == project_id).first()
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
-    createdBy = db.query(User).filter(User.id == project.createdById).first()
-    if not createdBy:
+    if not project.createdBy:
         raise HTTPException(status_code=404, detail="Creator user not found")
 
-    # Get members of the project, including the `joinedAt` timestamp
-    members = []
-    for project_member in project.members:
-        members.append(ProjectMemberResponse(
-            id=project_member.id,
-            joinedAt=project_member.joined_at,
-            member=UserResponse(id=project_member.members.id, username=project_member.members.username)
-        ))
-
-    list_bugs = []
-    bugs = db.query(Bug).filter(Bug.projectId == project.id).all()
-    if bugs:
-        for bug in bugs:
-            list_bugs.append({
-                "id": bug.id
-            })
+    bugs = _bug_ids_by_project(db, [project.id])
+    return _project_response(project, bugs[project.id])
 
-    return ProjectResponse(
-        id = project.id,
-        name = project.name,
-        createdAt = project.createdAt,
-        updatedAt = project.updatedAt,
-        createdBy = createdBy,
-        members = members,
-        bugs = list_bugs
-    )
-
-def get_all_projects(db: Session, name: str = None, sort_by: str = "name", sort_order: str = "asc"):
+def get_all_projects(db: Session, name: str = None, sort_by: str = "name", sort_order: str = "asc", after: dict = None, limit: int = settings.DEFAULT_PAGE_SIZE):
 
-    query = db.query(Project)
+    query = _with_creator_and_members(db.query(Project))
 
     if name:
-        query = query.filter(Project.name.ilike(f"%{name}%"))
-
-    if sort_by == "name":
-        if sort_order == "asc":
-            query = query.order_by(Project.name.asc())
-        else:
-            query = query.order_by(Project.name.desc())
-    elif sort_by == "id":
-        if sort_order == "asc":
-            query = query.order_by(Project.id.asc())
-        else:
-            query = query.order_by(Project.id.desc())
+        query = query.filter(ilike_contains(Project.name, name))
 
-    projects = query.all()
+    try:
+        projects, next_cursor = paginate(query, PROJECT_SORT_COLUMNS[sort_by], Project.id, sort_order, after, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     if not projects:
         raise HTTPException(status_code=404, detail="No users found")
 
-    project_responses = []
-
-    for project in projects:
-        # 🔹 Get project creator
-        createdBy = db.query(User).filter(User.id == project.createdById).first()
-        if not createdBy:
-            raise HTTPException(status_code=404, detail=f"Creator user not found for project {project.id}")
-
-        # 🔹 Get project members
-        members = []
-        for project_member in project.members:
-            members.append(ProjectMemberResponse(
-                id=project_member.id,
-                joinedAt=project_member.joined_at,
-                member=UserResponse(id=project_member.members.id, username=project_member.members.username)
-            ))
-        list_bugs = []
-        bugs = db.query(Bug).filter(Bug.projectId == project.id).all()
-        if bugs:
-            for bug in bugs:
-                list_bugs.append({
-                    "id": bug.id
-                })
-        # 🔹 Build the response object
-        project_responses.append(ProjectResponse(
-            id=project.id,
-            name=project.name,
-            createdAt=project.createdAt,
-            updatedAt=project.updatedAt,
-            createdBy=createdBy,
-            members=members,
-            bugs= list_bugs  # Fetch bugs here if needed
-        ))
-
-    return project_responses
+    # Constant number of statements: projects + creators, members + users, bug ids
+    bugs = _bug_ids_by_project(db, [project.id for project in projects])
+    return [_project_response(project, bugs[project.id]) for project in projects], next_cursor
 
 def update_project(db: Session, project_id: UUID, project_data: UpdateProject, current_user: str):
 
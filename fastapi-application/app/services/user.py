@@ -5,37 +5,54 @@ from app.schemas.user import UserResponse
 from uuid import UUID
 from app.schemas.user import UserUpdateRequest
 from app.core.security import hash_password
+from app.core.config import settings
+from app.core.pagination import paginate
+from app.core.search import ilike_contains
 
-def get_all_users(db: Session, username: str = None, sort_by: str = "username", sort_order: str = "asc"):
+from app.core.cache import TTLCache
+from typing import Optional
+
+USER_SORT_COLUMNS = {"username": User.username, "id": User.id}
+
+# Authenticated users by username, so a request resolves its user once and
+# repeat requests mostly skip the lookup. update_user and delete_user only
+# clear this worker's entry; USER_CACHE_TTL bounds how long the others can
+# still see the old user.
+user_cache = TTLCache(max_entries=settings.USER_CACHE_MAX_ENTRIES, ttl=settings.USER_CACHE_TTL)
+
+def get_cached_user(db: Session, username: str) -> Optional[UserResponse]:
+    user = user_cache.get(username)
+    if user is None:
+        db_user = db.query(User).filter(User.username == username).first()
+        if not db_user:
+            return None
+        user = UserResponse.model_validate(db_user)
+        user_cache.set(username, user)
+    return user
+
+def get_all_users(db: Session, username: str = None, sort_by: str = "username", sort_order: str = "asc", after: dict = None, limit: int = settings.DEFAULT_PAGE_SIZE):
     query = db.query(User)
 
     # 🔹 Filter by username if provided
     if username:
-        query = query.filter(User.username.ilike(f"%{username}%"))
-
-    # 🔹 Sort by the specified field (username or id)
-    if sort_by == "username":
-        if sort_order == "asc":
-            query = query.order_by(User.username.asc())
-        else:
-            query = query.order_by(User.username.desc())
-    elif sort_by == "id":
-        if sort_order == "asc":
-            query = query.order_by(User.id.asc())
-        else:
-            query = query.order_by(User.id.desc())
-
-    users = query.all()
+        query = query.filter(ilike_contains(User.username, username))
+
+    # 🔹 Sort by the specified field (username or id), id breaks ties between pages
+    try:
+        users, next_cursor = paginate(query, USER_SORT_COLUMNS[sort_by], User.id, sort_order, after, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     if not users:
         raise HTTPException(status_code=404, detail="No users found")
-    return users
+    return users, next_cursor
 
 def update_user(db: Session, user_id: UUID, user_data: UserUpdateRequest):
 
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
+    user_cache.pop(user.username)
     
     # Update fields
     if user_data.username:
@@ -50,6 +67,7 @@ def delete_user(db: Session, user_id: UUID):
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
+    user_cache.pop(user.username)
 
     db.delete(user)
     db.commit()
@@ -0,0 +1,84 @@
+"""
+Nested-loop animal detection vs. the precompiled AnimalMatcher, over
+synthetic prompts, plus the matcher on plural/synonym/typo prompts.
+
+    python -m benchmarks.bench_animal_matcher --prompts 10000
+"""
+import argparse
+import random
+import time
+
+from app.services.animal_matcher import SYNONYMS
+from app.services.image_service import ANIMAL_MATCHER, AVAILABLE_ANIMALS
+
+FILLER = ["a", "cute", "fluffy", "happy", "photo", "of", "the", "in", "snow", "at",
+          "sunset", "running", "big", "small", "wild", "portrait", "forest", "beach"]
+
+
+def loop_match(prompt: str) -> bool:
+    """The previous is_animal_prompt: rescans the prompt once per animal."""
+    cleaned_prompt = ' '.join(prompt.lower().split())
+    for animal in AVAILABLE_ANIMALS:
+        cleaned_animal = ' '.join(animal.lower().split())
+        if any(word == cleaned_animal for word in cleaned_prompt.split()):
+            return True
+    return False
+
+
+def make_prompts(count: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    prompts = []
+    for _ in range(count):
+        words = rng.choices(FILLER, k=rng.randint(3, 12))
+        if rng.random() < 0.5:
+            words.insert(rng.randrange(len(words) + 1), rng.choice(AVAILABLE_ANIMALS))
+        prompts.append(' '.join(words))
+    return prompts
+
+
+def misspell(rng: random.Random, animal: str) -> str:
+    """A plural, synonym or one-edit typo of the animal name."""
+    choice = rng.random()
+    if choice < 0.3:
+        return animal + "s"
+    if choice < 0.6:
+        return rng.choice([word for word, target in SYNONYMS.items() if target == animal] or [animal])
+    i = rng.randrange(1, len(animal))
+    return animal[:i] + animal[i + 1:]
+
+
+def make_fuzzy_prompts(count: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    return [
+        ' '.join(rng.choices(FILLER, k=rng.randint(3, 12)) + [misspell(rng, rng.choice(AVAILABLE_ANIMALS))])
+        for _ in range(count)
+    ]
+
+
+def timed(fn, prompts: list) -> float:
+    start = time.perf_counter()
+    for prompt in prompts:
+        fn(prompt)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--prompts", type=int, default=10000)
+    args = parser.parse_args()
+
+    prompts = make_prompts(args.prompts)
+    assert all(loop_match(p) == bool(ANIMAL_MATCHER.match(p)) for p in prompts)
+
+    fuzzy_prompts = make_fuzzy_prompts(args.prompts)
+
+    rows = [
+        ("nested loop", timed(loop_match, prompts)),
+        ("AnimalMatcher", timed(ANIMAL_MATCHER.match, prompts)),
+        ("AnimalMatcher fuzzy", timed(ANIMAL_MATCHER.match, fuzzy_prompts)),
+    ]
+    print(f"{'matcher':<22}{'total ms':>10}{'us/prompt':>12}")
+    for name, elapsed in rows:
+        print(f"{name:<22}{elapsed * 1000:>10.1f}{elapsed / args.prompts * 1e6:>12.2f}")
+    recognized = sum(bool(ANIMAL_MATCHER.match(p)) for p in fuzzy_prompts)
+    print(f"fuzzy prompts recognized: {recognized}/{len(fuzzy_prompts)}")
@@ -0,0 +1,67 @@
+"""
+A grid of images the way the UI fetches it today (one generate_image call
+after another) vs. ImageService.generate_images, against a local stub
+Pexels server with simulated latency. The search cache is cleared before
+each run so every distinct prompt reaches the stub.
+
+    python -m benchmarks.bench_batch_generate --prompts 12 --latency 0.1
+"""
+import argparse
+import asyncio
+import time
+
+from app.core.config import settings
+from app.core.http import create_http_client
+from app.services.image_service import AVAILABLE_ANIMALS, ImageService
+from benchmarks.stub_pexels import start_stub_server, stub_url
+
+
+def make_prompts(count: int) -> list:
+    # Mostly distinct animals, a repeat and a prompt without an animal, like a real grid
+    prompts = [f"a cute {animal}" for animal in AVAILABLE_ANIMALS[:max(count - 2, 1)]]
+    prompts += ["a cute dog", "something fluffy"]
+    return prompts[:count]
+
+
+async def main(count: int, latency: float):
+    server = start_stub_server(latency=latency)
+    settings.PEXELS_API_URL = stub_url(server)
+    service = ImageService()
+    service.pexels_api_key = "stub"
+    prompts = make_prompts(count)
+    try:
+        async with create_http_client() as client:
+            service.http_client = client
+
+            service.search_cache.clear()
+            hits = server.hits
+            start = time.perf_counter()
+            for prompt in prompts:
+                await service.generate_image(None, prompt)
+            sequential = time.perf_counter() - start
+            sequential_hits = server.hits - hits
+
+            service.search_cache.clear()
+            hits = server.hits
+            start = time.perf_counter()
+            batch = await service.generate_images(None, prompts)
+            concurrent = time.perf_counter() - start
+            batch_hits = server.hits - hits
+    finally:
+        server.shutdown()
+
+    print(f"{'path':<34}{'prompts':>8}{'ms':>10}{'searches':>10}")
+    print(f"{'generate_image one by one':<34}{count:>8}{sequential * 1000:>10.1f}{sequential_hits:>10}")
+    print(f"{'generate_images (batch)':<34}{count:>8}{concurrent * 1000:>10.1f}{batch_hits:>10}")
+    print(f"succeeded {batch.succeeded}, failed {batch.failed}, "
+          f"deduplicated {sum(item.deduplicated for item in batch.items)}, "
+          f"max wait {max(item.wait_ms for item in batch.items):.1f} ms "
+          f"(concurrency {settings.BATCH_GENERATE_CONCURRENCY})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--prompts", type=int, default=settings.BATCH_GENERATE_MAX_PROMPTS)
+    parser.add_argument("--latency", type=float, default=0.1, help="Seconds the stub takes per search")
+    args = parser.parse_args()
+    asyncio.run(main(args.prompts, args.latency))
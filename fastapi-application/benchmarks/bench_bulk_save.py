@@ -0,0 +1,93 @@
+"""
+Saving a batch of generated images on a running server: one POST /images
+per image (sequential and concurrent) against a single POST /images/bulk.
+The single-item path pays a request, a transaction and a commit per image;
+the bulk path is one multi-row INSERT ... ON CONFLICT DO NOTHING. The bulk
+request is then replayed to check that already-saved ids come back as
+"exists" rather than failing the batch. The URLs are made up, so run the
+server with the POST /images duplicate check (which fetches them) off.
+
+    IMAGE_DEDUPE_ENABLED=false uvicorn app.main:app --port 8000
+    python -m benchmarks.bench_bulk_save --base-url http://localhost:8000
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from datetime import datetime, timezone
+
+import httpx
+
+
+def make_images(count: int) -> list:
+    now = datetime.now(timezone.utc).isoformat()
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "prompt": f"bench bulk cat {i}",
+            "url": f"https://images.example/bulk-{i}.jpg",
+            "created_at": now,
+        }
+        for i in range(count)
+    ]
+
+
+async def save_one_by_one(client: httpx.AsyncClient, images: list, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(image):
+        async with semaphore:
+            (await client.post("/images", json=image)).raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(image) for image in images))
+    return time.perf_counter() - start
+
+
+async def save_bulk(client: httpx.AsyncClient, images: list) -> tuple:
+    start = time.perf_counter()
+    response = await client.post("/images/bulk", json=images)
+    response.raise_for_status()
+    return time.perf_counter() - start, response.json()
+
+
+async def cleanup(client: httpx.AsyncClient, images: list):
+    semaphore = asyncio.Semaphore(16)
+
+    async def one(image):
+        async with semaphore:
+            await client.delete(f"/images/{image['id']}")
+
+    await asyncio.gather(*(one(image) for image in images))
+
+
+async def main(base_url: str, count: int, concurrency: int):
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=httpx.Limits(max_connections=concurrency)) as client:
+        print(f"{'path':<34}{'images':>8}{'seconds':>10}{'images/s':>10}")
+
+        for name, conc in (("POST /images sequential", 1), (f"POST /images x{concurrency}", concurrency)):
+            images = make_images(count)
+            elapsed = await save_one_by_one(client, images, conc)
+            print(f"{name:<34}{count:>8}{elapsed:>10.2f}{count / elapsed:>10.0f}")
+            await cleanup(client, images)
+
+        images = make_images(count)
+        elapsed, body = await save_bulk(client, images)
+        assert body["created"] == count, body["created"]
+        print(f"{'POST /images/bulk':<34}{count:>8}{elapsed:>10.2f}{count / elapsed:>10.0f}")
+
+        elapsed, body = await save_bulk(client, images)
+        statuses = {item["status"] for item in body["items"]}
+        assert body["created"] == 0 and statuses == {"exists"}, (body["created"], statuses)
+        print(f"{'POST /images/bulk (replay)':<34}{count:>8}{elapsed:>10.2f}{count / elapsed:>10.0f}")
+
+        await cleanup(client, images)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--images", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+    asyncio.run(main(args.base_url, args.images, args.concurrency))
@@ -0,0 +1,71 @@
+"""
+Concurrency scaling of the database-backed image routes on a running
+server: GET /images and POST /images/{id}/like at increasing concurrency.
+With blocking DB calls on the event loop throughput stays flat as
+concurrency grows; with the async data layer it should scale until the
+connection pool or the database saturates.
+
+    uvicorn app.main:app --port 8000
+    python -m benchmarks.bench_gallery_load --base-url http://localhost:8000
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from datetime import datetime, timezone
+
+import httpx
+
+
+async def measure(client: httpx.AsyncClient, requests: int, concurrency: int, send) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            response = await send(client)
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "rps": requests / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+async def main(base_url: str, requests: int, levels: list):
+    async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=httpx.Limits(max_connections=max(levels))) as client:
+        image_id = str(uuid.uuid4())
+        (await client.post("/images", json={
+            "id": image_id,
+            "prompt": "bench cat",
+            "url": "https://images.example/bench.jpg",
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        })).raise_for_status()
+
+        routes = {
+            "GET /images?limit=50": lambda c: c.get("/images", params={"limit": 50}),
+            "POST /images/{id}/like": lambda c: c.post(f"/images/{image_id}/like"),
+        }
+        print(f"{'route':<26}{'conc':>6}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+        for name, send in routes.items():
+            for concurrency in levels:
+                result = await measure(client, requests, concurrency, send)
+                print(f"{name:<26}{concurrency:>6}{result['rps']:>10.0f}{result['p50_ms']:>10.2f}{result['p99_ms']:>10.2f}")
+
+        await client.delete(f"/images/{image_id}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--levels", default="1,8,32,128", help="Comma-separated concurrency levels")
+    args = parser.parse_args()
+    asyncio.run(main(args.base_url, args.requests, [int(level) for level in args.levels.split(",")]))
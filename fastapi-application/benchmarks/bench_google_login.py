@@ -0,0 +1,73 @@
+"""
+Google ID token verification latency against a local stand-in cert server
+with simulated network latency. Compares the old path (fetch the certs with
+a fresh requests.Request() on every login) with GoogleCertCache cold (first
+login after start or expiry) and warm, and shows that a burst of cold
+logins shares one fetch.
+
+    python -m benchmarks.bench_google_login --logins 200 --latency 0.05
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from google.auth.transport import requests
+from google.oauth2 import id_token
+
+from app.core.http import create_http_client
+from app.services.google_certs import GoogleCertCache
+from benchmarks.stub_google_certs import CLIENT_ID, certs_url, start_stub_server
+
+
+def report(name: str, samples: list) -> None:
+    samples = sorted(samples)
+    print(f"{name:<30}{statistics.median(samples) * 1000:>10.2f}{samples[int(len(samples) * 0.99) - 1] * 1000:>10.2f}")
+
+
+async def main(logins: int, latency: float, kind: str):
+    server = start_stub_server(latency=latency)
+    url = certs_url(server, kind)
+    tokens = [server.keys.id_token(f"user{i}@example.com") for i in range(logins)]
+    print(f"{'path':<30}{'p50 ms':>10}{'p99 ms':>10}")
+
+    samples = []
+    for token in tokens:
+        start = time.perf_counter()
+        id_token.verify_token(token, requests.Request(), CLIENT_ID, certs_url=url)
+        samples.append(time.perf_counter() - start)
+    report("fetch per login (old)", samples)
+
+    async with create_http_client() as client:
+        samples = []
+        for token in tokens[:50]:
+            cache = GoogleCertCache(url, default_ttl=300, refresh_margin=60, http_client=client)
+            start = time.perf_counter()
+            await cache.verify(token, CLIENT_ID)
+            samples.append(time.perf_counter() - start)
+        report("GoogleCertCache cold", samples)
+
+        cache = GoogleCertCache(url, default_ttl=300, refresh_margin=60, http_client=client)
+        await cache.get_certs()
+        samples = []
+        for token in tokens:
+            start = time.perf_counter()
+            await cache.verify(token, CLIENT_ID)
+            samples.append(time.perf_counter() - start)
+        report("GoogleCertCache warm", samples)
+
+        cache = GoogleCertCache(url, default_ttl=300, refresh_margin=60, http_client=client)
+        hits = server.hits
+        await asyncio.gather(*(cache.verify(token, CLIENT_ID) for token in tokens))
+        print(f"{logins} concurrent cold logins -> {server.hits - hits} cert fetch(es); expires in {cache.stats()['expires_in']:.0f}s")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05, help="Simulated network latency of the cert endpoint, seconds")
+    parser.add_argument("--format", choices=["certs", "jwks"], default="certs", help="x509 cert map or JWK set")
+    args = parser.parse_args()
+    asyncio.run(main(args.logins, args.latency, args.format))
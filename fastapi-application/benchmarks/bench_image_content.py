@@ -0,0 +1,88 @@
+"""
+Image bytes straight from the upstream CDN vs. GET /images/{id}/content on
+a running server, with a local stand-in CDN adding latency. The first
+request for an image copies it into the content store; later ones are
+served from disk. Also checks Range and If-None-Match handling.
+
+    IMAGE_UPSTREAM_HOSTS=127.0.0.1 IMAGE_UPSTREAM_ALLOW_PRIVATE=true uvicorn app.main:app --port 8000
+    python -m benchmarks.bench_image_content --base-url http://localhost:8000 --latency 0.05
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from datetime import datetime, timezone
+
+import httpx
+
+from benchmarks.stub_cdn import image_bytes, start_stub_server, stub_url
+
+
+async def timed(client: httpx.AsyncClient, urls: list, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(url):
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.get(url)
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(url) for url in urls))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "rps": len(urls) / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+async def main(base_url: str, count: int, latency: float, size: int, concurrency: int):
+    server = start_stub_server(latency=latency, size=size)
+    cdn = stub_url(server)
+    now = datetime.now(timezone.utc).isoformat()
+    images = [
+        {"id": str(uuid.uuid4()), "prompt": "bench content cat", "url": f"{cdn}/{uuid.uuid4().hex}.jpg", "created_at": now}
+        for _ in range(count)
+    ]
+    async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=httpx.Limits(max_connections=concurrency)) as client:
+        (await client.post("/images/bulk", json=images)).raise_for_status()
+        content = [f"/images/{image['id']}/content" for image in images]
+
+        print(f"{'path':<34}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+        rows = [
+            ("upstream CDN direct", await timed(client, [image["url"] for image in images], concurrency)),
+            ("/content first access", await timed(client, content, concurrency)),
+            ("/content from the store", await timed(client, content * 5, concurrency)),
+        ]
+        for name, result in rows:
+            print(f"{name:<34}{result['rps']:>10.0f}{result['p50_ms']:>10.2f}{result['p99_ms']:>10.2f}")
+        print(f"upstream hits: {server.hits} for {count} images")
+
+        expected = image_bytes(images[0]["url"][len(cdn):], size)
+        response = await client.get(content[0], headers={"Range": "bytes=100-199"})
+        assert response.status_code == 206 and response.content == expected[100:200], response.status_code
+        etag = response.headers["etag"]
+        response = await client.get(content[0], headers={"If-None-Match": etag})
+        assert response.status_code == 304, response.status_code
+        response = await client.get(content[0], headers={"Range": "bytes=0-9", "If-Range": '"stale"'})
+        assert response.status_code == 200 and response.content == expected
+        print(f"Range 206, If-None-Match 304 and stale If-Range 200 OK (ETag {etag[:18]}...\")")
+
+        for image in images:
+            await client.delete(f"/images/{image['id']}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--images", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds the stub CDN takes per image")
+    parser.add_argument("--size", type=int, default=200 * 1024, help="Bytes per image")
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+    asyncio.run(main(args.base_url, args.images, args.latency, args.size, args.concurrency))
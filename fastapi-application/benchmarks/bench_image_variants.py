@@ -0,0 +1,122 @@
+"""
+Throughput of the WebP variant renderer (render_variants) in images/sec
+per core, on synthetic photo-like JPEGs at Pexels "medium", "large" and
+"large2x" sizes, with and without reduced-scale JPEG decoding (draft). Also shows
+how long the event loop stalls when rendering inline vs. in the process
+pool the pipeline uses.
+
+    python -m benchmarks.bench_image_variants --images 40 --workers 2
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image as PILImage, ImageChops
+
+from app.core.config import settings
+from app.core.thumbnails import lower_priority, render_variants
+
+SIZES = {"medium": (525, 350), "large": (940, 627), "large2x": (1880, 1254)}
+
+
+def make_photo(path: str, size: tuple, seed: int) -> None:
+    """A JPEG with smooth gradients and sensor-like noise, close to a photo for the codecs."""
+    gradient = PILImage.linear_gradient("L").rotate(seed * 37 % 360).resize(size)
+    noise = PILImage.effect_noise(size, 24 + seed % 16)
+    red = ImageChops.add(gradient, noise, scale=1.4)
+    green = gradient.transpose(PILImage.Transpose.FLIP_LEFT_RIGHT)
+    blue = ImageChops.multiply(noise, gradient.transpose(PILImage.Transpose.FLIP_TOP_BOTTOM))
+    PILImage.merge("RGB", (red, green, blue)).save(path, "JPEG", quality=85)
+
+
+def render_all(sources: list, out_root: str, draft: bool) -> None:
+    for i, source in enumerate(sources):
+        render_variants(source, os.path.join(out_root, str(i)), settings.IMAGE_VARIANT_WIDTHS, settings.IMAGE_VARIANT_QUALITY,
+                        settings.IMAGE_VARIANT_METHOD, draft)
+
+
+async def loop_stall(work) -> float:
+    """Worst delay of a 10 ms ticker while `work` runs."""
+    worst = 0.0
+
+    async def tick():
+        nonlocal worst
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(0.01)
+            worst = max(worst, time.perf_counter() - start - 0.01)
+
+    ticker = asyncio.create_task(tick())
+    await asyncio.sleep(0)
+    await work()
+    await asyncio.sleep(0.02)  # let the ticker see a stall that ended just now
+    ticker.cancel()
+    return worst
+
+
+async def main(count: int, workers: int):
+    root = tempfile.mkdtemp(prefix="bench-variants-")
+    context = multiprocessing.get_context("spawn")
+    try:
+        print(f"{'source':<10}{'mode':<24}{'images/s':>10}{'per core':>10}")
+        for name, size in SIZES.items():
+            sources = []
+            for i in range(count):
+                path = os.path.join(root, f"{name}-{i}.jpg")
+                make_photo(path, size, i)
+                sources.append(path)
+
+            for draft in (False, True):
+                start = time.perf_counter()
+                render_all(sources, os.path.join(root, f"out-{name}-{draft}"), draft)
+                rate = count / (time.perf_counter() - start)
+                print(f"{name:<10}{'1 process, draft' if draft else '1 process':<24}{rate:>10.1f}{rate:>10.1f}")
+
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+                loop = asyncio.get_running_loop()
+                # Warm the workers so process start-up is not counted
+                await asyncio.gather(*(loop.run_in_executor(pool, time.sleep, 0.1) for _ in range(workers)))
+                start = time.perf_counter()
+                await asyncio.gather(*(
+                    loop.run_in_executor(pool, render_variants, source, os.path.join(root, f"pool-{name}", str(i)),
+                                         settings.IMAGE_VARIANT_WIDTHS, settings.IMAGE_VARIANT_QUALITY, settings.IMAGE_VARIANT_METHOD)
+                    for i, source in enumerate(sources)
+                ))
+                rate = count / (time.perf_counter() - start)
+                cores = min(workers, os.cpu_count() or 1)
+                print(f"{name:<10}{f'pool x{workers}, draft':<24}{rate:>10.1f}{rate / cores:>10.1f}")
+
+        sources = sources[:8]
+
+        async def inline():
+            render_all(sources, os.path.join(root, "stall-inline"), True)
+
+        async def pooled():
+            # Niced like the pipeline's workers
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=lower_priority,
+                                     initargs=(settings.IMAGE_VARIANT_NICE,)) as pool:
+                loop = asyncio.get_running_loop()
+                await asyncio.gather(*(loop.run_in_executor(pool, time.sleep, 0.1) for _ in range(workers)))
+                await asyncio.gather(*(
+                    loop.run_in_executor(pool, render_variants, source, os.path.join(root, "stall-pool", str(i)),
+                                         settings.IMAGE_VARIANT_WIDTHS, settings.IMAGE_VARIANT_QUALITY, settings.IMAGE_VARIANT_METHOD)
+                    for i, source in enumerate(sources)
+                ))
+
+        print(f"event loop stall rendering {len(sources)} large2x images: "
+              f"inline {await loop_stall(inline) * 1000:.0f} ms, process pool {await loop_stall(pooled) * 1000:.0f} ms")
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--images", type=int, default=40)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+    asyncio.run(main(args.images, args.workers))
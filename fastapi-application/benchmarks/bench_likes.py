@@ -0,0 +1,54 @@
+"""
+Fire many parallel likes at one image through POST /images/{id}/like on a
+running server and check that none were lost.
+
+    uvicorn app.main:app --workers 4 --port 8000
+    python -m benchmarks.bench_likes --base-url http://localhost:8000 --likes 5000
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from datetime import datetime, timezone
+
+import httpx
+
+
+async def main(base_url: str, total: int, concurrency: int):
+    async with httpx.AsyncClient(base_url=base_url, limits=httpx.Limits(max_connections=concurrency)) as client:
+        image_id = str(uuid.uuid4())
+        response = await client.post("/images", json={
+            "id": image_id,
+            "prompt": "bench cat",
+            "url": "https://images.example/bench.jpg",
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        })
+        response.raise_for_status()
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def like():
+            async with semaphore:
+                response = await client.post(f"/images/{image_id}/like")
+                response.raise_for_status()
+                return response.json()["likes"]
+
+        start = time.perf_counter()
+        counts = await asyncio.gather(*(like() for _ in range(total)))
+        elapsed = time.perf_counter() - start
+
+        await client.delete(f"/images/{image_id}")
+
+    # Every like must observe a distinct count, ending exactly at `total`
+    assert max(counts) == total, f"final count {max(counts)} != {total}"
+    assert sorted(counts) == list(range(1, total + 1)), "lost or duplicated updates"
+    print(f"{total} likes, concurrency {concurrency}: final count {max(counts)}, {total / elapsed:.0f} likes/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--likes", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    args = parser.parse_args()
+    asyncio.run(main(args.base_url, args.likes, args.concurrency))
@@ -0,0 +1,85 @@
+"""
+Login throughput under concurrent image traffic, on a running server.
+First GET /images runs alone, then again alongside a burst of logins.
+Logins beyond the password pool's queue limit should come back as fast
+503s, and image latency should stay close to the baseline.
+
+    DIAGNOSTICS_USERS=bench uvicorn app.main:app --port 8000
+    python -m benchmarks.bench_login_load --base-url http://localhost:8000 --username bench
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from collections import Counter
+
+import httpx
+
+
+def percentile(samples: list, fraction: float) -> float:
+    if not samples:
+        return 0.0
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))] * 1000
+
+
+async def hammer(client: httpx.AsyncClient, concurrency: int, duration: float, send) -> dict:
+    """Send requests from `concurrency` workers for `duration` seconds."""
+    latencies = {}
+    statuses = Counter()
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            response = await send(client)
+            statuses[response.status_code] += 1
+            latencies.setdefault(response.status_code, []).append(time.perf_counter() - start)
+            if response.status_code == 503:
+                # Shed requests come back with Retry-After; a client honoring it backs off
+                await asyncio.sleep(float(response.headers.get("Retry-After", 1)))
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return {"statuses": statuses, "latencies": latencies, "duration": duration}
+
+
+def report(name: str, result: dict) -> None:
+    for status, samples in sorted(result["latencies"].items()):
+        print(f"{name:<22}{status:>6}{len(samples) / result['duration']:>10.1f}"
+              f"{percentile(samples, 0.5):>10.1f}{percentile(samples, 0.99):>10.1f}")
+
+
+async def main(base_url: str, username: str, duration: float, image_concurrency: int, login_concurrency: int):
+    limits = httpx.Limits(max_connections=image_concurrency + login_concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as client:
+        credentials = {"username": username, "password": "bench-password"}
+        signup = await client.post("/auth/signup", json=credentials)
+        if signup.status_code != 409:  # Already registered by an earlier run
+            signup.raise_for_status()
+
+        get_images = lambda c: c.get("/images", params={"limit": 50})
+        login = lambda c: c.post("/auth/login", json=credentials)
+
+        print(f"{'traffic':<22}{'status':>6}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+        report("images alone", await hammer(client, image_concurrency, duration, get_images))
+
+        images, logins = await asyncio.gather(
+            hammer(client, image_concurrency, duration, get_images),
+            hammer(client, login_concurrency, duration, login),
+        )
+        report("images + logins", images)
+        report("logins", logins)
+        token = (await client.post("/auth/login", json=credentials)).json()["token"]
+        stats = await client.get("/diagnostics/password-hasher", headers={"Authorization": f"Bearer {token}"})
+        print(stats.json() if stats.is_success else f"password pool stats: {stats.status_code}, is {username} in DIAGNOSTICS_USERS?")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--username", default=f"bench-{uuid.uuid4().hex[:8]}", help="Account to log in as; list it in DIAGNOSTICS_USERS to see the pool stats")
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--image-concurrency", type=int, default=16)
+    parser.add_argument("--login-concurrency", type=int, default=64)
+    args = parser.parse_args()
+    asyncio.run(main(args.base_url, args.username, args.duration, args.image_concurrency, args.login_concurrency))
@@ -0,0 +1,59 @@
+"""
+Per-request httpx.AsyncClient vs. the shared pooled client, against a local
+stub Pexels server.
+
+    python -m benchmarks.bench_pexels_client --requests 2000 --concurrency 50
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from app.core.config import settings
+from app.core.http import create_http_client
+from app.services.image_service import ImageService
+from benchmarks.stub_pexels import start_stub_server, stub_url
+
+
+async def run(service: ImageService, total: int, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(i: int):
+        async with semaphore:
+            start = time.perf_counter()
+            await service._search_photos(f"cat {i} animal")  # unique, so never a cache hit
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "rps": total / elapsed,
+    }
+
+
+async def main(total: int, concurrency: int):
+    server = start_stub_server()
+    settings.PEXELS_API_URL = stub_url(server)
+    try:
+        before = await run(ImageService(), total, concurrency)
+        async with create_http_client() as client:
+            after = await run(ImageService(http_client=client), total, concurrency)
+    finally:
+        server.shutdown()
+
+    print(f"{'mode':<22}{'p50 ms':>10}{'p99 ms':>10}{'req/s':>10}")
+    for name, result in (("per-request client", before), ("shared pooled client", after)):
+        print(f"{name:<22}{result['p50_ms']:>10.2f}{result['p99_ms']:>10.2f}{result['rps']:>10.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency))
@@ -0,0 +1,128 @@
+"""
+SQL statement counts for the list endpoints' services as the data grows.
+Each service must issue a constant number of statements per call, however
+many rows it returns (no N+1). List services are asked for a full page of
+MAX_PAGE_SIZE rows. Runs against a throwaway SQLite database.
+
+    python -m benchmarks.bench_query_counts
+"""
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.database import Base
+from app.models import Bug, Note, Project, ProjectMember, User
+from app.schemas.bug import BugResponse
+from app.schemas.note import NoteResponse
+from app.services.bug import get_all_bugs
+from app.services.note import get_all_note
+from app.services.project import get_all_projects, get_project
+from app.services.user import get_all_users
+
+PAGE = settings.MAX_PAGE_SIZE
+
+
+@contextmanager
+def count_statements(engine):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def fresh_session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    return engine, sessionmaker(bind=engine)()
+
+
+def seed_projects(db, projects: int, members_per_project: int, bugs_per_project: int):
+    users = [User(username=f"user{i}", password="x") for i in range(members_per_project)]
+    db.add_all(users)
+    for p in range(projects):
+        project = Project(name=f"project {p:05d}", createdBy=users[0])
+        db.add(project)
+        for user in users:
+            db.add(ProjectMember(project=project, members=user, joined_at=datetime.now(timezone.utc)))
+        for b in range(bugs_per_project):
+            db.add(Bug(title=f"bug {b}", description="", project=project, createdBy=users[0]))
+    db.commit()
+
+
+def check(name: str, sizes: list, run) -> None:
+    counts = []
+    for size in sizes:
+        engine, db = fresh_session()
+        call = run(db, size)
+        db.expunge_all()
+        with count_statements(engine) as statements:
+            start = time.perf_counter()
+            call()
+            elapsed = time.perf_counter() - start
+        counts.append(len(statements))
+        print(f"{name:<28}{size:>8}{len(statements):>12}{elapsed * 1000:>10.1f}")
+    assert len(set(counts)) == 1, f"{name}: statement count grows with data: {counts}"
+
+
+def list_projects(db, projects):
+    seed_projects(db, projects, members_per_project=5, bugs_per_project=3)
+    return lambda: get_all_projects(db, limit=PAGE)
+
+
+def one_project(db, members):
+    seed_projects(db, 1, members_per_project=members, bugs_per_project=members)
+    project_id = db.query(Project.id).scalar()
+    return lambda: get_project(db, project_id)
+
+
+def list_bugs(db, bugs):
+    seed_projects(db, 1, members_per_project=3, bugs_per_project=0)
+    project = db.query(Project).one()
+    users = db.query(User).all()
+    for b in range(bugs):
+        # Creators and editors of their own, so lazy user loads are not hidden by the identity map
+        bug = Bug(id=uuid.uuid4(), title=f"bug {b:05d}", description="", project=project,
+                  createdBy=User(username=f"creator{b:05d}", password="x"),
+                  updatedBy=User(username=f"editor{b:05d}", password="x"))
+        db.add(bug)
+        db.add(Note(body=f"note {b}", author=users[b % len(users)], bugId=bug.id))
+    db.commit()
+    project_id = project.id
+    # Serialize like the route does, so lazy loads would show up in the count
+    return lambda: [BugResponse.model_validate(bug) for bug in get_all_bugs(db, projectId=project_id, limit=PAGE)[0]]
+
+
+def list_notes(db, notes):
+    seed_projects(db, 1, members_per_project=3, bugs_per_project=1)
+    bug_id = db.query(Bug.id).scalar()
+    users = db.query(User).all()
+    db.add_all(Note(body=f"note {n:05d}", author=users[n % len(users)], bugId=bug_id) for n in range(notes))
+    db.commit()
+    return lambda: [NoteResponse.model_validate(note) for note in get_all_note(db, bug_id, None, limit=PAGE)[0]]
+
+
+def list_users(db, users):
+    db.add_all(User(username=f"user{u:05d}", password="x") for u in range(users))
+    db.commit()
+    return lambda: get_all_users(db, limit=PAGE)
+
+
+if __name__ == "__main__":
+    print(f"{'service':<28}{'rows':>8}{'statements':>12}{'ms':>10}")
+    # selectinload batches IN lists by 500 rows, so stay within one batch
+    check("get_all_projects", [10, 100, 400], list_projects)
+    check("get_project (members)", [10, 100, 1000], one_project)
+    check("get_all_bugs (+notes)", [10, 100, 1000, 10000], list_bugs)
+    check("get_all_note", [10, 100, 1000], list_notes)
+    check("get_all_users", [10, 100, 1000], list_users)
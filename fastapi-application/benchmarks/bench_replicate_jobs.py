@@ -0,0 +1,125 @@
+"""
+Replicate generation against a local stand-in for the predictions API.
+
+Compares the old path (the blocking replicate.run inside a coroutine) with
+GenerationJobQueue, reporting event loop stalls while the generations run.
+It then checks the queue's limits: at most `workers` predictions running
+upstream at once, per-user caps, queue-full rejections, and a complete
+event stream for one job.
+
+    python -m benchmarks.bench_replicate_jobs --jobs 32 --users 8 --duration 1
+"""
+import argparse
+import asyncio
+import time
+
+from replicate.client import Client
+
+from app.core.config import settings
+from app.services.generation_jobs import GenerationJobQueue, QueueFullError, UserJobLimitError
+from app.services.image_service import ImageService
+from benchmarks.stub_replicate import start_stub_server
+
+
+class LoopLag:
+    """Worst delay of a 10 ms ticker: how long the event loop was blocked."""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.worst = 0.0
+        self._task = None
+
+    async def _tick(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.worst = max(self.worst, time.perf_counter() - start - self.interval)
+
+    async def __aenter__(self):
+        self._task = asyncio.create_task(self._tick())
+        await asyncio.sleep(0)  # let the ticker start before the work does
+        return self
+
+    async def __aexit__(self, *exc):
+        self._task.cancel()
+
+
+async def old_path(client: Client, prompts: list) -> None:
+    """What generate_image_replicate used to do: replicate.run on the event loop."""
+    for prompt in prompts:
+        client.run(settings.REPLICATE_MODEL_VERSION, input={"prompt": prompt})
+
+
+async def main(jobs: int, users: int, workers: int, per_user: int, max_queue: int, duration: float):
+    server = start_stub_server(duration=duration)
+    client = Client(api_token="stub", base_url=server.base_url)
+    client.poll_interval = settings.REPLICATE_POLL_INTERVAL = duration / 10
+    service = ImageService()
+    service.client = client
+    print(f"{'path':<34}{'wall s':>8}{'loop stall ms':>15}")
+
+    async with LoopLag() as lag:
+        start = time.perf_counter()
+        await old_path(client, [f"old cat {i}" for i in range(workers)])
+        await asyncio.sleep(0.02)
+    print(f"{f'replicate.run x{workers} (old)':<34}{time.perf_counter() - start:>8.2f}{lag.worst * 1000:>15.1f}")
+
+    queue = GenerationJobQueue(
+        service.generate_image_replicate,
+        workers=workers,
+        max_queue=max_queue,
+        per_user=per_user,
+        job_timeout=duration * 20,
+        result_ttl=60,
+    )
+    queue.start()
+    # The client builds its async HTTP client (and SSL context) on first use; keep that out of the numbers
+    warmup = queue.submit("warmup", "warmup cat")
+    [snapshot async for snapshot in queue.watch(warmup, keepalive=duration)]
+    server.max_running = 0
+    async with LoopLag() as lag:
+        start = time.perf_counter()
+        accepted, submit_times = [], []
+        rejected = {"user limit": 0, "queue full": 0}
+        for i in range(jobs):
+            t = time.perf_counter()
+            try:
+                accepted.append(queue.submit(f"user{i % users}", f"cat {i}"))
+            except UserJobLimitError:
+                rejected["user limit"] += 1
+            except QueueFullError:
+                rejected["queue full"] += 1
+            submit_times.append(time.perf_counter() - t)
+        while any(job.status not in ("succeeded", "failed") for job in accepted):
+            await asyncio.sleep(duration / 10)
+    elapsed = time.perf_counter() - start
+    print(f"{f'job queue, {len(accepted)} jobs':<34}{elapsed:>8.2f}{lag.worst * 1000:>15.1f}")
+    print(f"submit p99 {sorted(submit_times)[int(len(submit_times) * 0.99) - 1] * 1e6:.0f} us, "
+          f"max running upstream {server.max_running} (workers {workers}), rejected {rejected}")
+    assert server.max_running <= workers, server.max_running
+    assert all(job.status == "succeeded" for job in accepted)
+
+    job = queue.submit("watcher", "cat with events")
+    failing = queue.submit("watcher", "fail cat")
+    events = [snapshot async for snapshot in queue.watch(job, keepalive=duration) if snapshot is not None]
+    statuses = [event.status for event in events]
+    print(f"events for one job: {len(events)} ({statuses[0]} .. {statuses[-1]}), "
+          f"progress {[event.progress for event in events if event.progress is not None][:4]}...")
+    assert statuses[-1] == "succeeded" and events[-1].image is not None
+    [last] = [snapshot async for snapshot in queue.watch(failing, keepalive=duration) if snapshot is not None][-1:]
+    print(f"failing job: {last.status} ({last.error})")
+    print(queue.stats())
+    await queue.stop()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=32)
+    parser.add_argument("--users", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--per-user", type=int, default=2)
+    parser.add_argument("--max-queue", type=int, default=12)
+    parser.add_argument("--duration", type=float, default=1.0, help="Seconds each stub prediction runs")
+    args = parser.parse_args()
+    asyncio.run(main(args.jobs, args.users, args.workers, args.per_user, args.max_queue, args.duration))
@@ -0,0 +1,124 @@
+"""
+find_similar (multi-index hashing on the indexed phash_0..phash_3
+columns) vs. reading every hash and scanning with a popcount, over N
+images in a database. Hashes are random, with a cluster of near-copies
+around each query the way re-saved Pexels photos cluster. Also times
+difference_hash on stub photos at Pexels sizes.
+
+Uses a temporary SQLite file unless --database-url points elsewhere
+(e.g. postgresql+asyncpg://...; the images table must exist and is
+filled with rows prefixed "bench-sim-", removed afterwards).
+
+    python -m benchmarks.bench_similar_images --images 1000000 --queries 100
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.config import settings
+from app.core.thumbnails import difference_hash
+from app.database import Base
+from app.models.image import Image
+from app.services.image_similarity import find_similar, hash_columns, to_unsigned
+from benchmarks.stub_cdn import photo_bytes
+
+SIZES = {"medium": (525, 350), "large": (940, 627), "large2x": (1880, 1254)}
+
+
+def near_copy(phash: int, rng: random.Random, bits: int) -> int:
+    for bit in rng.sample(range(64), bits):
+        phash ^= 1 << bit
+    return phash
+
+
+def linear_scan(rows: list, phash: int, max_distance: int) -> list:
+    hits = [((to_unsigned(stored) ^ phash).bit_count(), image_id) for image_id, stored in rows]
+    return sorted(hit for hit in hits if hit[0] <= max_distance)
+
+
+async def fill(session_factory, hashes: list) -> None:
+    async with session_factory() as db:
+        for start in range(0, len(hashes), 10000):
+            await db.execute(insert(Image), [
+                {"id": f"bench-sim-{i}", "prompt": "bench", "url": f"https://images.pexels.com/bench-sim-{i}.jpg",
+                 **hash_columns(phash)}
+                for i, phash in enumerate(hashes[start:start + 10000], start)
+            ])
+        await db.commit()
+
+
+async def main(count: int, queries: int, database_url: str):
+    rng = random.Random(7)
+    query_hashes = [rng.getrandbits(64) for _ in range(queries)]
+    hashes = [rng.getrandbits(64) for _ in range(count - queries * 5)]
+    for phash in query_hashes:
+        hashes += [near_copy(phash, rng, rng.randrange(1, 9)) for _ in range(5)]
+
+    tmp = None
+    if not database_url:
+        tmp = tempfile.mkdtemp(prefix="bench-similar-")
+        database_url = f"sqlite+aiosqlite:///{os.path.join(tmp, 'images.db')}"
+    engine = create_async_engine(database_url)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    try:
+        if tmp:
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+        start = time.perf_counter()
+        await fill(session_factory, hashes)
+        print(f"inserted {len(hashes)} rows in {time.perf_counter() - start:.1f} s ({engine.dialect.name})")
+
+        async with session_factory() as db:
+            print(f"{'radius':<28}{'indexed ms':>12}{'scan ms':>10}{'hits/query':>12}")
+            for label, radius in (("duplicate check", settings.IMAGE_DUPLICATE_DISTANCE),
+                                  ("similar (default)", settings.SIMILAR_IMAGES_MAX_DISTANCE), ("similar, past the cap", 12)):
+                await find_similar(db, query_hashes[0], radius)  # Warm the page cache
+                start = time.perf_counter()
+                found = [await find_similar(db, phash, radius) for phash in query_hashes]
+                indexed = (time.perf_counter() - start) / queries
+
+                sample = query_hashes[:max(1, queries // 20)]
+                start = time.perf_counter()
+                scanned = []
+                for phash in sample:
+                    rows = (await db.execute(select(Image.id, Image.phash).where(Image.phash.isnot(None)))).all()
+                    scanned.append(linear_scan(rows, phash, radius))
+                scan = (time.perf_counter() - start) / len(sample)
+                assert [[distance for distance, _ in hits] for hits in found[:len(sample)]] == \
+                       [[distance for distance, _ in hits] for hits in scanned]
+                hits = sum(len(hits) for hits in found) / queries
+                print(f"{f'{label}, d<={radius}':<28}{indexed * 1000:>12.2f}{scan * 1000:>10.1f}{hits:>12.1f}")
+    finally:
+        if not tmp:
+            async with session_factory() as db:
+                await db.execute(delete(Image).where(Image.id.like("bench-sim-%")))
+                await db.commit()
+        await engine.dispose()
+
+    with tempfile.TemporaryDirectory() as root:
+        for name, size in SIZES.items():
+            paths = []
+            for i in range(20):
+                path = os.path.join(root, f"{name}-{i}.jpg")
+                with open(path, "wb") as f:
+                    f.write(photo_bytes(f"/p{i}.jpg", *size))
+                paths.append(path)
+            start = time.perf_counter()
+            for path in paths:
+                difference_hash(path)
+            print(f"difference_hash {name:<8} {(time.perf_counter() - start) / len(paths) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--images", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--database-url", default="", help="Async SQLAlchemy URL; a temporary SQLite file by default")
+    args = parser.parse_args()
+    asyncio.run(main(args.images, args.queries, args.database_url))
@@ -0,0 +1,95 @@
+"""
+Latency of the ilike substring filters with and without the pg_trgm GIN
+indexes. Seeds ROWS images (1M by default) into the configured Postgres
+database, runs each search with index scans disabled and then enabled, and
+removes the seeded rows afterwards. Needs the trigram migration applied.
+
+    alembic upgrade head
+    python -m benchmarks.bench_trigram_search --rows 1000000
+"""
+import argparse
+import hashlib
+import statistics
+import time
+
+from sqlalchemy import func, select, text
+
+from app.core.search import ilike_contains
+from app.database import engine
+from app.models.image import Image
+
+SEED_PREFIX = "bench-trgm-"
+
+ANIMALS = ["cat", "dog", "lion", "tiger", "dolphin", "penguin", "zebra", "giraffe",
+           "elephant", "koala", "panda", "fox", "owl", "eagle", "shark", "whale"]
+
+
+def seed(conn, rows: int) -> None:
+    conn.execute(text("""
+        INSERT INTO images (id, prompt, url, likes)
+        SELECT :prefix || i,
+               'a photo of a ' || (:animals)[1 + i % cardinality(:animals)] || ' ' || md5(i::text),
+               'https://example.com/' || i || '.jpg',
+               0
+        FROM generate_series(1, :rows) AS i
+    """), {"prefix": SEED_PREFIX, "animals": ANIMALS, "rows": rows})
+    conn.execute(text("ANALYZE images"))
+
+
+def cleanup(conn) -> None:
+    conn.execute(Image.__table__.delete().where(Image.id.startswith(SEED_PREFIX)))
+
+
+def time_query(conn, statement, repeat: int, use_index: bool) -> float:
+    samples = []
+    for _ in range(repeat):
+        # SET LOCAL lasts until the end of this sample's transaction
+        with conn.begin():
+            if not use_index:
+                conn.execute(text("SET LOCAL enable_bitmapscan = off"))
+                conn.execute(text("SET LOCAL enable_indexscan = off"))
+            start = time.perf_counter()
+            conn.execute(statement).all()
+            samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--keep", action="store_true", help="leave the seeded rows in place")
+    args = parser.parse_args()
+
+    if engine.dialect.name != "postgresql":
+        raise SystemExit("pg_trgm needs Postgres; on other backends the filters run unindexed")
+
+    # A rare term (one row), a common one (1/16 of the rows) and one with no match
+    rare = hashlib.md5(str(args.rows // 2).encode()).hexdigest()[:10]
+    terms = {"rare": rare, "common": "dolphin", "no match": "axolotl"}
+
+    with engine.connect() as conn:
+        with conn.begin():
+            start = time.perf_counter()
+            seed(conn, args.rows)
+            print(f"seeded {args.rows} rows in {time.perf_counter() - start:.1f}s")
+
+        try:
+            print(f"{'term':<10}{'query':<10}{'seq scan ms':>14}{'trigram ms':>14}{'speedup':>10}")
+            for label, term in terms.items():
+                where = ilike_contains(Image.prompt, term)
+                for kind, statement in [
+                    ("page", select(Image.id).where(where).limit(50)),
+                    ("count", select(func.count()).select_from(Image).where(where)),
+                ]:
+                    without = time_query(conn, statement, args.repeat, use_index=False)
+                    with_index = time_query(conn, statement, args.repeat, use_index=True)
+                    print(f"{label:<10}{kind:<10}{without:>14.1f}{with_index:>14.1f}{without / with_index:>9.1f}x")
+        finally:
+            if not args.keep:
+                with conn.begin():
+                    cleanup(conn)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Local stand-in for an image CDN (images.pexels.com), used by the benchmarks.
+
+GET /<name>.jpg returns `size` bytes that start with a JPEG signature and
+are otherwise derived from the name, so every path has stable, distinct
+content. With `photos=True` it serves real, decodable JPEG photos instead
+(needs Pillow), for the thumbnail and perceptual-hash benchmarks;
+"?size=WxH" serves the same photo at another size, as a near-duplicate.
+"""
+import hashlib
+import io
+import random
+import threading
+import time
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+def image_bytes(name: str, size: int) -> bytes:
+    seed = hashlib.sha256(name.encode()).digest()
+    body = (seed * (size // len(seed) + 1))[:size - 4]
+    return b"\xff\xd8\xff\xe0" + body
+
+
+@lru_cache(maxsize=1024)
+def photo_bytes(name: str, width: int = 940, height: int = 627) -> bytes:
+    """A photo-like JPEG (gradient, shapes and noise) whose look is derived from the name."""
+    from PIL import Image, ImageChops, ImageDraw
+
+    seed = int.from_bytes(hashlib.sha256(name.encode()).digest()[:4], "big")
+    size = (width, height)
+    gradient = Image.linear_gradient("L").rotate(seed % 360).resize(size)
+    noise = Image.effect_noise(size, 16 + seed % 24)
+    image = Image.merge("RGB", (
+        ImageChops.add(gradient, noise, scale=1.4),
+        gradient.transpose(Image.Transpose.FLIP_LEFT_RIGHT),
+        ImageChops.multiply(noise, gradient.transpose(Image.Transpose.FLIP_TOP_BOTTOM)),
+    ))
+    # A few large shapes give each photo its own structure, as subjects do
+    rng = random.Random(seed)
+    draw = ImageDraw.Draw(image)
+    for _ in range(6):
+        x, y = rng.random() * width, rng.random() * height
+        rx, ry = (0.1 + rng.random() * 0.3) * width, (0.1 + rng.random() * 0.3) * height
+        draw.ellipse((x - rx, y - ry, x + rx, y + ry), fill=tuple(rng.randrange(256) for _ in range(3)))
+    out = io.BytesIO()
+    image.save(out, "JPEG", quality=85)
+    return out.getvalue()
+
+
+class StubCdnHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    latency = 0.0
+    size = 200 * 1024
+    photos = False
+
+    def do_GET(self):
+        self.server.hits += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if self.photos:
+            url = urlsplit(self.path)
+            size = parse_qs(url.query).get("size")
+            body = photo_bytes(url.path, *map(int, size[0].split("x"))) if size else photo_bytes(url.path)
+        else:
+            body = image_bytes(self.path, self.size)
+        self.send_response(200)
+        self.send_header("Content-Type", "image/jpeg")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server(latency: float = 0.0, size: int = 200 * 1024, photos: bool = False) -> ThreadingHTTPServer:
+    """Start the stub on a free local port; call .shutdown() when done."""
+    handler = type("Handler", (StubCdnHandler,), {"latency": latency, "size": size, "photos": photos})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    server.hits = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def stub_url(server: ThreadingHTTPServer) -> str:
+    host, port = server.server_address
+    return f"http://{host}:{port}"
@@ -0,0 +1,96 @@
+"""Local stand-in for Google's signing certificate endpoints, used by the benchmarks."""
+import base64
+import datetime
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+from google.auth import crypt, jwt
+
+KEY_ID = "stub-key-1"
+CLIENT_ID = "stub-client.apps.googleusercontent.com"
+
+
+def _b64url_uint(value: int) -> str:
+    raw = value.to_bytes((value.bit_length() + 7) // 8, "big")
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+class StubKeys:
+    """An RSA key pair published both as x509 certs and as a JWK set."""
+
+    def __init__(self):
+        self.private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "stub-google")])
+        now = datetime.datetime.now(datetime.timezone.utc)
+        cert = (
+            x509.CertificateBuilder()
+            .subject_name(name)
+            .issuer_name(name)
+            .public_key(self.private_key.public_key())
+            .serial_number(x509.random_serial_number())
+            .not_valid_before(now - datetime.timedelta(days=1))
+            .not_valid_after(now + datetime.timedelta(days=1))
+            .sign(self.private_key, hashes.SHA256())
+        )
+        self.x509 = json.dumps({KEY_ID: cert.public_bytes(serialization.Encoding.PEM).decode()}).encode()
+        numbers = self.private_key.public_key().public_numbers()
+        self.jwks = json.dumps({"keys": [{
+            "kty": "RSA", "alg": "RS256", "use": "sig", "kid": KEY_ID,
+            "n": _b64url_uint(numbers.n), "e": _b64url_uint(numbers.e),
+        }]}).encode()
+        pem = self.private_key.private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+        )
+        self.signer = crypt.RSASigner.from_string(pem, key_id=KEY_ID)
+
+    def id_token(self, email: str = "bench@example.com", audience: str = CLIENT_ID) -> str:
+        now = int(time.time())
+        payload = {
+            "iss": "https://accounts.google.com", "aud": audience, "sub": email,
+            "email": email, "given_name": email.split("@")[0], "iat": now, "exp": now + 3600,
+        }
+        return jwt.encode(self.signer, payload).decode()
+
+
+class StubCertsHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True  # Headers and body go out as separate writes
+    latency = 0.0
+    max_age = 3600
+
+    def do_GET(self):
+        self.server.hits += 1
+        if self.latency:
+            time.sleep(self.latency)
+        body = self.server.keys.jwks if self.path.endswith("/jwks") else self.server.keys.x509
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Cache-Control", f"public, max-age={self.max_age}, must-revalidate")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server(latency: float = 0.0, max_age: int = 3600) -> ThreadingHTTPServer:
+    """Serve /certs (x509) and /jwks on a free local port; call .shutdown() when done."""
+    handler = type("Handler", (StubCertsHandler,), {"latency": latency, "max_age": max_age})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    server.hits = 0
+    server.keys = StubKeys()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def certs_url(server: ThreadingHTTPServer, kind: str = "certs") -> str:
+    host, port = server.server_address
+    return f"http://{host}:{port}/{kind}"
@@ -0,0 +1,48 @@
+"""Local stand-in for the Pexels search API, used by the benchmarks."""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+def make_photos(query: str, count: int = 15) -> list:
+    return [
+        {"id": i, "src": {"medium": f"https://images.example/{query.replace(' ', '-')}/{i}.jpg"}}
+        for i in range(count)
+    ]
+
+
+class StubPexelsHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+    latency = 0.0
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query).get("query", [""])[0]
+        self.server.hits += 1
+        if self.latency:
+            time.sleep(self.latency)
+        body = json.dumps({"photos": make_photos(query)}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server(latency: float = 0.0) -> ThreadingHTTPServer:
+    """Start the stub on a free local port; call .shutdown() when done."""
+    handler = type("Handler", (StubPexelsHandler,), {"latency": latency})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    server.hits = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def stub_url(server: ThreadingHTTPServer) -> str:
+    host, port = server.server_address
+    return f"http://{host}:{port}/v1"
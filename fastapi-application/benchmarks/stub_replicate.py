@@ -0,0 +1,136 @@
+"""
+Local stand-in for Replicate's predictions API, used by the benchmarks.
+
+A prediction runs for `duration` seconds after it is created. While it
+runs, GET reports "processing" with tqdm-style progress in the logs, the
+way SDXL does; then it reports "succeeded" with a list of image URLs.
+Prompts containing "fail" end as "failed". The server records how many
+predictions were running at once, so callers can check their concurrency
+bound.
+"""
+import json
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+STEPS = 50
+
+
+class StubReplicateHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    duration = 1.0
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        match = re.fullmatch(r"/v1/predictions/([\w-]+)/cancel", self.path)
+        if match:
+            prediction = self.server.predictions.get(match.group(1))
+            if prediction is None:
+                return self.reply(404, {"detail": "Not found"})
+            if prediction["status"] not in ("succeeded", "failed", "canceled"):
+                prediction["status"] = "canceled"
+                self.server.canceled += 1
+            return self.reply(200, self.render(prediction))
+        if self.path != "/v1/predictions":
+            return self.reply(404, {"detail": "Not found"})
+        prediction_id = uuid.uuid4().hex
+        prediction = {
+            "id": prediction_id,
+            "version": body.get("version"),
+            "input": body.get("input"),
+            "status": "starting",
+            "created": time.monotonic(),
+        }
+        with self.server.lock:
+            self.server.predictions[prediction_id] = prediction
+            self.server.created += 1
+        # Never finished on creation, so "Prefer: wait" callers poll like the real API
+        self.reply(201, {**self.render(prediction), "status": "starting"})
+
+    def do_GET(self):
+        match = re.fullmatch(r"/v1/models/[\w-]+/[\w-]+/versions/(\w+)", self.path)
+        if match:
+            # replicate.run looks up the version before polling
+            return self.reply(200, {
+                "id": match.group(1),
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "cog_version": "0.9.0",
+                "openapi_schema": {},
+            })
+        match = re.fullmatch(r"/v1/predictions/([\w-]+)", self.path)
+        prediction = self.server.predictions.get(match.group(1)) if match else None
+        if prediction is None:
+            return self.reply(404, {"detail": "Not found"})
+        self.reply(200, self.render(prediction))
+
+    def render(self, prediction: dict) -> dict:
+        elapsed = time.monotonic() - prediction["created"]
+        status = prediction["status"]
+        if status in ("starting", "processing"):
+            status = "processing" if elapsed < self.duration else (
+                "failed" if "fail" in (prediction["input"] or {}).get("prompt", "") else "succeeded"
+            )
+            prediction["status"] = status
+        self.server.update_running()
+        step = min(STEPS, int(STEPS * elapsed / self.duration))
+        now = datetime.now(timezone.utc).isoformat()
+        return {
+            "id": prediction["id"],
+            "model": "stability-ai/sdxl",
+            "version": prediction["version"],
+            "status": status,
+            "input": prediction["input"],
+            "output": [f"https://replicate.example/{prediction['id']}.png"] if status == "succeeded" else None,
+            "logs": f"{step * 100 // STEPS:3d}%|{'#' * (step // 5):<10}| {step}/{STEPS} [00:00<00:00]" if status == "processing" else "",
+            "error": "Stub model failed" if status == "failed" else None,
+            "metrics": None,
+            "created_at": now,
+            "started_at": now,
+            "completed_at": now if status in ("succeeded", "failed", "canceled") else None,
+            "urls": {
+                "get": f"{self.server.base_url}/v1/predictions/{prediction['id']}",
+                "cancel": f"{self.server.base_url}/v1/predictions/{prediction['id']}/cancel",
+            },
+        }
+
+    def reply(self, code: int, payload: dict):
+        body = json.dumps(payload).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubReplicateServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, handler):
+        super().__init__(("127.0.0.1", 0), handler)
+        host, port = self.server_address
+        self.base_url = f"http://{host}:{port}"
+        self.lock = threading.Lock()
+        self.predictions = {}
+        self.created = 0
+        self.canceled = 0
+        self.max_running = 0
+
+    def update_running(self) -> None:
+        with self.lock:
+            running = sum(1 for p in self.predictions.values() if p["status"] in ("starting", "processing"))
+            self.max_running = max(self.max_running, running)
+
+
+def start_stub_server(duration: float = 1.0) -> StubReplicateServer:
+    """Start the stub on a free local port; call .shutdown() when done."""
+    handler = type("Handler", (StubReplicateHandler,), {"duration": duration})
+    server = StubReplicateServer(handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
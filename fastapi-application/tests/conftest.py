@@ -0,0 +1,113 @@
+import os
+
+# app.core.config and app.core.security read these at import time; the
+# tests never reach Postgres, they run on throwaway SQLite databases
+for name, value in {
+    "DB_USER": "test",
+    "DB_PASSWORD": "test",
+    "DB_HOST": "localhost",
+    "DB_PORT": "5432",
+    "DB_NAME": "test",
+    "SECRET_KEY": "test-secret",
+    "ALGORITHM": "HS256",
+    "ACCESS_TOKEN_EXPIRE_DAYS": "1",
+}.items():
+    os.environ.setdefault(name, value)
+
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.pool import NullPool
+from sqlalchemy.types import UUID
+
+from app.database import Base
+from app.models import Bug, Project, ProjectMember, User
+
+
+@compiles(UUID, "sqlite")
+@compiles(PG_UUID, "sqlite")
+def _uuid_as_text(type_, compiler, **kw):
+    # A column declared "UUID" gets NUMERIC affinity in SQLite, which turns an
+    # all-digit hex id such as "1234...e31..." into a float on the way back
+    return "CHAR(32)"
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def async_session_factory(tmp_path):
+    """Sessions on a fresh SQLite file; one connection per session, like a pool under load."""
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'test.db'}",
+        poolclass=NullPool,
+        connect_args={"timeout": 30},
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+    await engine.dispose()
+
+
+@contextmanager
+def count_statements(engine):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+@pytest.fixture
+def statements_for():
+    """
+    Seed a fresh in-memory database with `seed(db)`, then run the call it
+    returns and count its SQL statements. Returns (count, result).
+    """
+    engines = []
+
+    def run(seed):
+        engine = create_engine("sqlite://")
+        engines.append(engine)
+        Base.metadata.create_all(engine)
+        db = sessionmaker(bind=engine)()
+        call = seed(db)
+        db.expunge_all()  # Nothing cached in the identity map; every load must show up
+        with count_statements(engine) as statements:
+            result = call()
+        return len(statements), result
+
+    yield run
+    for engine in engines:
+        engine.dispose()
+
+
+@pytest.fixture
+def seed_projects():
+    """Projects sharing the same members, each with a few bugs."""
+    def seed(db, projects: int, members_per_project: int, bugs_per_project: int):
+        users = [User(username=f"user{i}", password="x") for i in range(members_per_project)]
+        db.add_all(users)
+        for p in range(projects):
+            project = Project(name=f"project {p:05d}", createdBy=users[0])
+            db.add(project)
+            for user in users:
+                db.add(ProjectMember(project=project, members=user, joined_at=datetime.now(timezone.utc)))
+            for b in range(bugs_per_project):
+                db.add(Bug(title=f"bug {b}", description="", project=project, createdBy=users[0]))
+        db.commit()
+
+    return seed
@@ -0,0 +1,35 @@
+import pytest
+
+from app.services.animal_matcher import plural_forms
+from app.services.image_service import ANIMAL_MATCHER
+
+
+@pytest.mark.parametrize("prompt", ["python code", "lamb chops", "a big ram stick"])
+def test_ambiguous_words_are_not_animals(prompt):
+    assert ANIMAL_MATCHER.match(prompt) == []
+
+
+@pytest.mark.parametrize("prompt", ["antes", "cowes", "beees", "cates"])
+def test_made_up_plurals_do_not_match(prompt):
+    assert ANIMAL_MATCHER.match(prompt) == []
+
+
+@pytest.mark.parametrize(
+    "prompt, animals",
+    [
+        ("two foxes", ["fox"]),
+        ("fishes and cats", ["fish", "cat"]),
+        ("puppies", ["dog"]),
+        ("a pack of wolves", ["wolf"]),
+        ("octopuses", ["octopus"]),
+        ("a serpent and a ewe", ["snake", "sheep"]),
+    ],
+)
+def test_real_plurals_and_synonyms_match(prompt, animals):
+    assert ANIMAL_MATCHER.match(prompt) == animals
+
+
+def test_es_only_follows_sibilants():
+    assert plural_forms("ant") == {"ants"}
+    assert plural_forms("fox") == {"foxs", "foxes"}
+    assert "churches" in plural_forms("church")
@@ -0,0 +1,35 @@
+import uuid
+
+from app.core.config import settings
+from app.models import Bug, Note, Project, User
+from app.schemas.bug import BugResponse
+from app.services.bug import get_all_bugs
+
+PAGE = settings.MAX_PAGE_SIZE
+
+
+def test_bug_listing_statement_count_is_constant(statements_for, seed_projects):
+    counts = {}
+    for bugs in (10, 100, 1000, 10000):
+        def listing(db):
+            seed_projects(db, 1, members_per_project=3, bugs_per_project=0)
+            project = db.query(Project).one()
+            users = db.query(User).all()
+            for b in range(bugs):
+                # Creators and editors of their own, so lazy user loads are not hidden by the identity map
+                bug = Bug(id=uuid.uuid4(), title=f"bug {b:05d}", description="", project=project,
+                          createdBy=User(username=f"creator{b:05d}", password="x"),
+                          updatedBy=User(username=f"editor{b:05d}", password="x"))
+                db.add(bug)
+                db.add(Note(body=f"note {b}", author=users[b % len(users)], bugId=bug.id))
+            db.commit()
+            project_id = project.id
+            # Serialized like the route, so lazy loads of notes or users would be counted
+            return lambda: [BugResponse.model_validate(bug) for bug in get_all_bugs(db, projectId=project_id, limit=PAGE)[0]]
+
+        counts[bugs], page = statements_for(listing)
+        assert len(page) == min(bugs, PAGE)
+        assert all(len(bug.notes) == 1 and bug.notes[0].author for bug in page)
+        assert all(bug.createdBy and bug.updatedBy for bug in page)
+    # Bugs with both users, then every note on the page with its author
+    assert set(counts.values()) == {2}, counts
@@ -0,0 +1,47 @@
+import uuid
+
+import httpx
+import pytest
+
+from app.api.dependencies import get_current_user
+from app.core.config import settings
+from app.main import app
+from app.schemas.user import UserResponse
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def signed_in_as():
+    def sign_in(username):
+        app.dependency_overrides[get_current_user] = lambda: UserResponse(id=uuid.uuid4(), username=username)
+
+    yield sign_in
+    app.dependency_overrides.pop(get_current_user, None)
+
+
+async def get_stats():
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        return await client.get("/diagnostics/password-hasher", headers={"Authorization": "Bearer token"})
+
+
+async def test_diagnostics_need_a_token():
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/diagnostics/password-hasher")
+    assert response.status_code == 401
+
+
+async def test_diagnostics_are_closed_by_default(signed_in_as):
+    signed_in_as("someone")
+    assert settings.DIAGNOSTICS_USERS == set()
+    assert (await get_stats()).status_code == 403
+
+
+async def test_only_listed_users_read_diagnostics(signed_in_as, monkeypatch):
+    monkeypatch.setattr(settings, "DIAGNOSTICS_USERS", {"ops"})
+    signed_in_as("someone")
+    assert (await get_stats()).status_code == 403
+    signed_in_as("ops")
+    response = await get_stats()
+    assert response.status_code == 200
+    assert "max_workers" in response.json()
@@ -0,0 +1,152 @@
+import asyncio
+import json
+import uuid
+
+import httpx
+import pytest
+from replicate.client import Client
+
+from app.api.dependencies import get_current_user
+from app.api.routes import images
+from app.core.config import settings
+from app.main import app
+from app.schemas.user import UserResponse
+from app.services.generation_jobs import GenerationJobQueue, QueueFullError, UserJobLimitError
+from app.services.image_service import ImageService
+from benchmarks.stub_replicate import start_stub_server
+
+pytestmark = pytest.mark.anyio
+
+DURATION = 0.3  # Seconds each stub prediction runs
+
+
+@pytest.fixture
+def replicate(monkeypatch):
+    monkeypatch.setattr(settings, "REPLICATE_POLL_INTERVAL", DURATION / 10)
+    server = start_stub_server(duration=DURATION)
+    yield server
+    server.shutdown()
+
+
+@pytest.fixture
+async def make_queue(replicate):
+    queues = []
+
+    def make(workers=2, max_queue=10, per_user=10, job_timeout=DURATION * 20):
+        service = ImageService()
+        service.client = Client(api_token="stub", base_url=replicate.base_url)
+        queue = GenerationJobQueue(
+            service.generate_image_replicate,
+            workers=workers,
+            max_queue=max_queue,
+            per_user=per_user,
+            job_timeout=job_timeout,
+            result_ttl=60,
+        )
+        queue.start()
+        queues.append(queue)
+        return queue
+
+    yield make
+    for queue in queues:
+        await queue.stop()
+
+
+async def events(queue, job):
+    return [snapshot async for snapshot in queue.watch(job, keepalive=DURATION) if snapshot is not None]
+
+
+async def test_jobs_run_with_bounded_concurrency(replicate, make_queue):
+    queue = make_queue(workers=2)
+    jobs = [queue.submit(f"user{i % 3}", f"cat {i}") for i in range(6)]
+    assert all(job.status == "queued" for job in jobs)  # Submitting never waits on Replicate
+
+    await asyncio.gather(*(events(queue, job) for job in jobs))
+
+    assert [job.status for job in jobs] == ["succeeded"] * 6
+    assert all(job.image.url.startswith("https://replicate.example/") for job in jobs)
+    assert replicate.created == 6
+    assert replicate.max_running <= 2
+
+
+async def test_job_reports_progress_until_done(make_queue):
+    queue = make_queue()
+    snapshots = await events(queue, queue.submit("ada", "cat with events"))
+    statuses = [snapshot.status for snapshot in snapshots]
+    assert statuses[0] == "queued" and statuses[-1] == "succeeded"
+    assert "running" in statuses
+    progress = [snapshot.progress for snapshot in snapshots if snapshot.progress is not None]
+    assert progress == sorted(progress) and progress[-1] == 1.0
+
+
+async def test_failed_prediction_fails_the_job(make_queue):
+    queue = make_queue()
+    [*_, last] = await events(queue, queue.submit("ada", "fail cat"))
+    assert last.status == "failed"
+    assert "Stub model failed" in last.error
+    assert queue.stats()["failed"] == 1
+
+
+async def test_timed_out_prediction_is_canceled_upstream(replicate, make_queue):
+    queue = make_queue(job_timeout=DURATION / 3)
+    [*_, last] = await events(queue, queue.submit("ada", "slow cat"))
+    assert last.status == "failed"
+    assert "timed out" in last.error
+    assert replicate.canceled == 1
+
+
+async def test_per_user_limit_and_full_queue_are_rejected(make_queue):
+    queue = make_queue(workers=1, max_queue=3, per_user=2)
+    queue.submit("ada", "cat 1")
+    queue.submit("ada", "cat 2")
+    with pytest.raises(UserJobLimitError) as limit:
+        queue.submit("ada", "cat 3")
+    assert limit.value.retry_after >= 1
+
+    queue.submit("bob", "cat 4")
+    with pytest.raises(QueueFullError):
+        queue.submit("cyd", "cat 5")
+    assert queue.stats()["rejected_user_limit"] == 1
+    assert queue.stats()["rejected_queue_full"] == 1
+
+
+@pytest.fixture
+async def client(make_queue, monkeypatch):
+    monkeypatch.setattr(images, "generation_jobs", make_queue(per_user=1))
+    user = UserResponse(id=uuid.uuid4(), username="ada")
+    app.dependency_overrides[get_current_user] = lambda: user
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            yield client
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+
+
+async def test_job_routes(client):
+    response = await client.post("/images/jobs", json={"prompt": "cat on a sofa"})
+    assert response.status_code == 202
+    job = response.json()
+    assert job["status"] == "queued"
+
+    # One job at a time for this user
+    response = await client.post("/images/jobs", json={"prompt": "another cat"})
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+
+    # The event stream runs until the job finishes
+    response = await client.get(f"/images/jobs/{job['id']}/events")
+    assert response.headers["content-type"].startswith("text/event-stream")
+    data = [json.loads(line[len("data: "):]) for line in response.text.splitlines() if line.startswith("data: ")]
+    assert data[-1]["status"] == "succeeded"
+    assert data[-1]["image"]["prompt"] == "cat on a sofa"
+
+    response = await client.get(f"/images/jobs/{job['id']}")
+    assert response.status_code == 200
+    assert response.json()["status"] == "succeeded"
+
+
+async def test_other_users_jobs_are_not_found(client):
+    job = (await client.post("/images/jobs", json={"prompt": "cat"})).json()
+    app.dependency_overrides[get_current_user] = lambda: UserResponse(id=uuid.uuid4(), username="bob")
+    assert (await client.get(f"/images/jobs/{job['id']}")).status_code == 404
+    assert (await client.get("/images/jobs/no-such-job")).status_code == 404
@@ -0,0 +1,89 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app.services import google_certs
+from app.services.google_certs import GoogleCertCache, cache_ttl
+from benchmarks.stub_google_certs import CLIENT_ID, certs_url, start_stub_server
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def stub():
+    server = start_stub_server(latency=0.2)
+    yield server
+    server.shutdown()
+
+
+@pytest.fixture
+async def cache(stub):
+    async with httpx.AsyncClient() as client:
+        cache = GoogleCertCache(certs_url(stub), default_ttl=300, refresh_margin=60, http_client=client)
+        yield cache
+        await cache.stop()
+
+
+@pytest.mark.parametrize("headers, ttl", [
+    ({"Cache-Control": "public, max-age=3600, must-revalidate"}, 3600),
+    ({"Cache-Control": "public, max-age=3600", "Age": "600"}, 3000),
+    ({"Cache-Control": "no-cache"}, 0),
+    ({}, 300),
+])
+def test_cache_ttl(headers, ttl):
+    assert cache_ttl(httpx.Headers(headers), default=300) == ttl
+
+
+async def test_warm_logins_do_not_fetch(stub, cache):
+    token = stub.keys.id_token("ada@example.com")
+    start = time.perf_counter()
+    assert (await cache.verify(token, CLIENT_ID))["email"] == "ada@example.com"
+    cold = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(20):
+        await cache.verify(token, CLIENT_ID)
+    warm = (time.perf_counter() - start) / 20
+
+    assert stub.hits == 1
+    assert warm < cold
+    print(f"login verification: cold {cold * 1000:.1f} ms, warm {warm * 1000:.1f} ms")
+
+
+async def test_wrong_audience_is_rejected(stub, cache):
+    with pytest.raises(ValueError):
+        await cache.verify(stub.keys.id_token(audience="someone-else"), CLIENT_ID)
+
+
+async def test_cold_start_fetches_once(stub, cache):
+    await asyncio.gather(*(cache.get_certs() for _ in range(20)))
+    assert stub.hits == 1
+    assert cache.stats()["fetches"] == 1
+
+
+async def test_failed_refresh_serves_previous_certs(stub, cache):
+    certs = await cache.get_certs()
+    cache.certs_url = "http://127.0.0.1:1/certs"  # Google is unreachable
+    cache._expires_at = 0.0
+    assert await cache.get_certs() == certs
+    assert cache.stats()["stale_served"] == 1
+    assert cache.stats()["fetch_errors"] == 1
+
+
+async def test_background_refresh_keeps_certs_fresh(monkeypatch):
+    monkeypatch.setattr(google_certs, "MIN_REFRESH_INTERVAL", 0.05)
+    server = start_stub_server(max_age=1)
+    try:
+        async with httpx.AsyncClient() as client:
+            # Refresh 0.9 s before the 1 s expiry, so roughly every 0.1 s
+            cache = GoogleCertCache(certs_url(server), default_ttl=300, refresh_margin=0.9, http_client=client)
+            cache.start()
+            await asyncio.sleep(0.5)
+            await cache.get_certs()
+            await cache.stop()
+        assert server.hits >= 3
+        assert cache.stats()["hits"] == 1  # The login itself never waited on a fetch
+    finally:
+        server.shutdown()
@@ -0,0 +1,49 @@
+import random
+
+import pytest
+from sqlalchemy import insert
+
+from app.models.image import Image
+from app.services.image_similarity import find_similar, hash_columns, lock_keys
+
+pytestmark = pytest.mark.anyio
+
+
+def flip_bits(phash: int, rng: random.Random, bits: int) -> int:
+    for bit in rng.sample(range(64), bits):
+        phash ^= 1 << bit
+    return phash
+
+
+def test_near_duplicates_share_a_lock_key():
+    rng = random.Random(1)
+    for _ in range(2000):
+        phash = rng.getrandbits(64)
+        copy = flip_bits(phash, rng, rng.randrange(0, 5))
+        assert set(lock_keys(phash, 4)) & set(lock_keys(copy, 4))
+
+
+def test_unrelated_photos_rarely_share_a_lock_key():
+    rng = random.Random(2)
+    pairs = [(rng.getrandbits(64), rng.getrandbits(64)) for _ in range(2000)]
+    shared = sum(bool(set(lock_keys(a, 4)) & set(lock_keys(b, 4))) for a, b in pairs)
+    # 68 keys each out of 4 x 65536 buckets: about one pair in a thousand
+    assert shared < 20
+
+
+async def test_find_similar_matches_a_full_scan(async_session_factory):
+    rng = random.Random(3)
+    query = rng.getrandbits(64)
+    hashes = [rng.getrandbits(64) for _ in range(2000)] + [flip_bits(query, rng, bits) for bits in range(13)]
+    async with async_session_factory() as db:
+        await db.execute(insert(Image), [
+            {"id": f"img-{i}", "prompt": "cat", "url": f"https://images.pexels.com/{i}.jpg", **hash_columns(phash)}
+            for i, phash in enumerate(hashes)
+        ])
+        await db.commit()
+        for max_distance in (0, 4, 10):
+            expected = sorted(
+                ((phash ^ query).bit_count(), f"img-{i}")
+                for i, phash in enumerate(hashes) if (phash ^ query).bit_count() <= max_distance
+            )
+            assert await find_similar(db, query, max_distance) == expected
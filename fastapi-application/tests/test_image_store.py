@@ -0,0 +1,87 @@
+import os
+
+import httpx
+import pytest
+
+from app.services import image_store
+from app.services.image_store import ImageStore
+
+pytestmark = pytest.mark.anyio
+
+BLOB = 1000
+
+
+def upstream(request: httpx.Request) -> httpx.Response:
+    # A distinct JPEG-looking body per URL
+    return httpx.Response(200, content=b"\xff\xd8\xff" + request.url.path.encode().ljust(BLOB - 3, b"."))
+
+
+@pytest.fixture
+async def make_store(tmp_path):
+    clients = []
+
+    def make(max_bytes=10 * BLOB):
+        client = httpx.AsyncClient(transport=httpx.MockTransport(upstream))
+        clients.append(client)
+        store = ImageStore(str(tmp_path / "store"), max_bytes=max_bytes, max_object_bytes=10 * BLOB,
+                           http_client=client, allowed_hosts=["images.pexels.com"], allow_private=True)
+        store.load()
+        return store
+
+    yield make
+    for client in clients:
+        await client.aclose()
+
+
+def on_disk(store: ImageStore) -> int:
+    return sum(size for _, _, _, size in store._scan())
+
+
+async def settle(store: ImageStore) -> None:
+    await store._index.settle()
+
+
+async def test_downloads_stay_under_the_cap_without_walking(make_store, monkeypatch):
+    store = make_store()
+    walks = []
+    scan = store._scan
+    monkeypatch.setattr(store, "_scan", lambda: walks.append(1) or scan())
+
+    for i in range(50):
+        await store.fetch(f"https://images.pexels.com/{i}.jpg")
+        await settle(store)
+        assert store._index.total_bytes <= store._index.max_bytes
+
+    assert walks == []  # Accounting is incremental; no sweep was due
+    assert on_disk(store) == store._index.total_bytes <= store._index.max_bytes
+    assert store.stats()["evictions"] == 50 - store.stats()["blobs"]
+    # The newest blob survives, the oldest are gone
+    assert store.lookup(next(reversed(store._index.entries))) is not None
+
+
+async def test_hits_are_evicted_last(make_store):
+    store = make_store()
+    first = await store.fetch("https://images.pexels.com/first.jpg")
+    for i in range(9):
+        await store.fetch(f"https://images.pexels.com/{i}.jpg")
+        assert store.lookup(first.digest) is not None
+    await store.fetch("https://images.pexels.com/over-the-cap.jpg")
+    await settle(store)
+    assert store.lookup(first.digest) is not None
+
+
+async def test_sweep_picks_up_other_workers(make_store, monkeypatch):
+    a, b = make_store(), make_store()
+    stored = await b.fetch("https://images.pexels.com/from-b.jpg")
+    # Another worker's blob is found on disk even before a sweep
+    assert a.lookup(stored.digest) is not None
+
+    os.unlink(stored.path)  # Evicted by a third worker
+    assert a.lookup(stored.digest) is None
+
+    await b.fetch("https://images.pexels.com/from-b-2.jpg")
+    monkeypatch.setattr(image_store, "SWEEP_INTERVAL", 0.0)
+    await a.fetch("https://images.pexels.com/from-a.jpg")
+    await settle(a)
+    assert a.stats()["sweeps"] == 1
+    assert a._index.total_bytes == on_disk(a) == 2 * BLOB
@@ -0,0 +1,48 @@
+import hashlib
+import os
+
+import pytest
+
+from app.core.thumbnails import variant_dir
+from app.services.image_variants import VariantPipeline, dir_size
+
+pytestmark = pytest.mark.anyio
+
+WIDTHS = [128, 256, 512]
+
+
+def render(root: str, n: int) -> tuple:
+    """Stand-in for render_variants: three 1000-byte files in the image's directory."""
+    digest = hashlib.sha256(str(n).encode()).hexdigest()
+    out_dir = variant_dir(root, digest)
+    os.makedirs(out_dir)
+    for width in WIDTHS:
+        with open(os.path.join(out_dir, f"{width}.webp"), "wb") as f:
+            f.write(b"x" * 1000)
+    return digest, out_dir
+
+
+async def test_renders_stay_under_the_cap_without_walking(tmp_path, monkeypatch):
+    root = str(tmp_path)
+    pipeline = VariantPipeline(None, None, root, WIDTHS, quality=80, method=4, workers=1,
+                               max_pending=10, max_bytes=10_000)
+    index = pipeline._index
+    await index.maintain(keep="")  # The first sweep, as the first render would run it
+    walks = []
+    scan = index.scan
+    monkeypatch.setattr(index, "scan", lambda: walks.append(1) or scan())
+
+    digests = []
+    for n in range(20):
+        digest, out_dir = render(root, n)
+        digests.append(digest)
+        index.remember(digest, out_dir, dir_size(out_dir))
+        index.schedule(keep=digest)
+        await index.settle()
+
+    assert walks == []
+    on_disk = sum(size for _, _, _, size in pipeline._scan())
+    assert on_disk == index.total_bytes <= 10_000
+    assert os.path.isdir(variant_dir(root, digests[-1]))
+    assert not os.path.exists(variant_dir(root, digests[1]))  # Whole directories go
+    assert pipeline.stats()["evictions"] == 20 - len(index)
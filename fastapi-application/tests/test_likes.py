@@ -0,0 +1,70 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+
+import httpx
+import pytest
+
+from app.api.dependencies import get_async_db
+from app.api.routes.images import image_service
+from app.main import app
+from app.models.image import Image
+
+pytestmark = pytest.mark.anyio
+
+LIKES = 2000
+CONCURRENCY = 50
+
+
+@pytest.fixture
+async def client(async_session_factory):
+    async def get_test_db():
+        async with async_session_factory() as db:
+            yield db
+
+    async with async_session_factory() as db:
+        db.add(Image(id="cat", prompt="a cat", url="https://images.pexels.com/cat.jpg", likes=0,
+                     created_at=datetime.now(timezone.utc)))
+        await db.commit()
+    # No lifespan here, so there is no like buffer: every like is the direct UPDATE
+    app.dependency_overrides[get_async_db] = get_test_db
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            yield client
+    finally:
+        app.dependency_overrides.pop(get_async_db, None)
+
+
+async def test_parallel_likes_are_never_lost(client, async_session_factory):
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    async def like():
+        async with semaphore:
+            response = await client.post("/images/cat/like")
+            assert response.status_code == 200, response.text
+            return response.json()["likes"]
+
+    start = time.perf_counter()
+    counts = await asyncio.gather(*(like() for _ in range(LIKES)))
+    elapsed = time.perf_counter() - start
+
+    # Each like sees its own count, so the returned counts are exactly 1..LIKES
+    assert sorted(counts) == list(range(1, LIKES + 1))
+    async with async_session_factory() as db:
+        assert (await db.get(Image, "cat")).likes == LIKES
+    print(f"{LIKES} likes, concurrency {CONCURRENCY}: {LIKES / elapsed:.0f} likes/s")
+
+
+async def test_unlike_stops_at_zero(client, async_session_factory):
+    await client.post("/images/cat/like")
+
+    async def unlike():
+        async with async_session_factory() as db:
+            return await image_service.update_likes(db, "cat", "unlike")
+
+    assert sorted(await asyncio.gather(*(unlike() for _ in range(5)))) == [0, 0, 0, 0, 0]
+
+
+async def test_like_missing_image(client):
+    response = await client.post("/images/nope/like")
+    assert response.status_code == 404
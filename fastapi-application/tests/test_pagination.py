@@ -0,0 +1,99 @@
+import base64
+import json
+import uuid
+from datetime import datetime, timezone
+
+import httpx
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.api.dependencies import PAGE_CURSOR_KEYS
+from app.core.pagination import decode_cursor, encode_cursor, paginate
+from app.database import Base
+from app.main import app
+from app.models import User
+from app.services.image_service import IMAGE_CURSOR_KEYS, SEARCH_CURSOR_KEYS
+from app.services.user import get_all_users
+
+pytestmark = pytest.mark.anyio
+
+
+def raw_cursor(payload) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+async def test_cross_origin_clients_can_read_the_cursor():
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/openapi.json", headers={"Origin": "http://localhost:3000"})
+    assert "X-Next-Cursor" in response.headers["Access-Control-Expose-Headers"]
+
+
+def test_cursors_round_trip():
+    created_at = datetime(2025, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+    image = decode_cursor(encode_cursor({"created_at": created_at, "id": "abc"}), IMAGE_CURSOR_KEYS)
+    assert image == {"created_at": created_at, "id": "abc"}
+    assert decode_cursor(encode_cursor({"rank": 0.5, "id": "abc"}), SEARCH_CURSOR_KEYS)["rank"] == 0.5
+    row_id = uuid.uuid4()
+    assert decode_cursor(encode_cursor({"sort": "title", "id": row_id}), PAGE_CURSOR_KEYS)["id"] == row_id
+    assert decode_cursor(encode_cursor({"sort": row_id, "id": row_id}), PAGE_CURSOR_KEYS)["sort"] == row_id
+
+
+@pytest.mark.parametrize(
+    "payload, keys",
+    [
+        ({"created_at": "2025-01-02T03:04:05", "id": "abc"}, IMAGE_CURSOR_KEYS),  # Timestamp not tagged
+        ({"created_at": {"dt": "yesterday"}, "id": "abc"}, IMAGE_CURSOR_KEYS),
+        ({"created_at": {"dt": "2025-01-02T03:04:05"}, "id": 7}, IMAGE_CURSOR_KEYS),
+        ({"rank": "high", "id": "abc"}, SEARCH_CURSOR_KEYS),
+        ({"rank": True, "id": "abc"}, SEARCH_CURSOR_KEYS),
+        ({"sort": "title", "id": "not-a-uuid"}, PAGE_CURSOR_KEYS),
+        ({"sort": "title", "id": {"uuid": "not-a-uuid"}}, PAGE_CURSOR_KEYS),
+        ({"sort": None, "id": {"uuid": str(uuid.uuid4())}}, PAGE_CURSOR_KEYS),
+        ({"sort": ["a"], "id": {"uuid": str(uuid.uuid4())}}, PAGE_CURSOR_KEYS),
+    ],
+)
+def test_cursors_with_wrong_value_types_are_rejected(payload, keys):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor(raw_cursor(payload), keys)
+
+
+async def test_gallery_answers_a_mistyped_cursor_with_400():
+    cursor = raw_cursor({"created_at": "2025-01-02T03:04:05", "id": 7})
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/images", params={"cursor": cursor})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as session:
+        yield session
+    engine.dispose()
+
+
+@pytest.mark.parametrize("sort_order", ["asc", "desc"])
+def test_users_without_a_username_are_not_skipped(db, sort_order):
+    db.add_all(User(username=None if u % 3 == 0 else f"user{u:02d}", email=f"u{u}@example.com") for u in range(20))
+    db.commit()
+    seen, after = [], None
+    while True:
+        page, cursor = paginate(db.query(User), User.username, User.id, sort_order, after, 3)
+        seen += [user.id for user in page]
+        if cursor is None:
+            break
+        after = decode_cursor(cursor, PAGE_CURSOR_KEYS)
+    assert len(seen) == len(set(seen)) == 20
+
+
+def test_a_cursor_for_another_sort_column_is_rejected(db):
+    db.add_all(User(username=f"user{u}") for u in range(3))
+    db.commit()
+    _, cursor = get_all_users(db, sort_by="username", limit=1)
+    with pytest.raises(HTTPException) as exc:
+        get_all_users(db, sort_by="id", after=decode_cursor(cursor, PAGE_CURSOR_KEYS), limit=1)
+    assert exc.value.status_code == 400
@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+
+from app.services.image_service import AVAILABLE_ANIMALS
+from app.services.prefetch_pool import PrefetchPool
+
+pytestmark = pytest.mark.anyio
+
+
+class FakePexels:
+    """Stands in for ImageService._search_photos, counting the upstream calls."""
+
+    def __init__(self, failing: bool = False):
+        self.failing = failing
+        self.calls = []
+
+    async def _search_photos(self, query: str):
+        self.calls.append(query)
+        if self.failing:
+            raise RuntimeError("Pexels returned 429")
+        return [{"src": {"medium": f"https://images.pexels.com/{query}/{i}.jpg"}} for i in range(15)]
+
+
+@pytest.fixture
+async def make_pool():
+    pools = []
+
+    def make(service, refill_interval=60.0):
+        pool = PrefetchPool(service, AVAILABLE_ANIMALS, low_watermark=2, high_watermark=5,
+                            refill_interval=refill_interval, refills_per_sweep=4, max_backoff=900)
+        pool.start()
+        pools.append(pool)
+        return pool
+
+    yield make
+    for pool in pools:
+        await pool.stop()
+
+
+async def test_warm_up_is_limited_per_sweep(make_pool):
+    service = FakePexels()
+    pool = make_pool(service)
+    await asyncio.sleep(0.05)
+    assert len(service.calls) == 4
+    assert pool.take("hello") is not None
+
+
+async def test_outage_does_not_hammer_pexels(make_pool):
+    service = FakePexels(failing=True)
+    pool = make_pool(service)
+    for _ in range(50):
+        assert pool.take("hello") is None
+        await asyncio.sleep(0.001)
+    # The first failure ends the sweep and pauses the pool; empty takes don't wake it
+    assert len(service.calls) == 1
+    stats = pool.stats()
+    assert stats["refill_errors"] == 1 and stats["backing_off"] == 1
+    assert stats["paused_for"] >= 60
+
+
+async def test_backoff_doubles_and_resets_on_success(make_pool):
+    service = FakePexels(failing=True)
+    pool = make_pool(service, refill_interval=0.02)
+    await asyncio.sleep(0.15)
+    # Pauses of 0.02, 0.04, 0.08 s (plus jitter): a handful of calls, not one per interval
+    assert 2 <= len(service.calls) <= 4
+    service.failing = False
+    await asyncio.sleep(0.5)
+    assert pool.stats()["paused_for"] == 0
+    assert pool.stats()["refills"] > 0
@@ -0,0 +1,33 @@
+from app.core.config import settings
+from app.models import Project
+from app.services.project import get_all_projects, get_project
+
+PAGE = settings.MAX_PAGE_SIZE
+
+
+def test_project_listing_statement_count_is_constant(statements_for, seed_projects):
+    counts = {}
+    for projects in (10, 100, 400):
+        def listing(db):
+            seed_projects(db, projects, members_per_project=5, bugs_per_project=3)
+            return lambda: get_all_projects(db, limit=PAGE)
+
+        counts[projects], (page, _) = statements_for(listing)
+        assert len(page) == min(projects, PAGE)
+        assert all(len(project.members) == 5 and len(project.bugs) == 3 for project in page)
+    # Projects with their creators, members with their users, bug ids
+    assert set(counts.values()) == {3}, counts
+
+
+def test_get_project_statement_count_is_constant(statements_for, seed_projects):
+    counts = {}
+    for members in (10, 100, 1000):
+        def one_project(db):
+            seed_projects(db, 1, members_per_project=members, bugs_per_project=members)
+            project_id = db.query(Project.id).scalar()
+            return lambda: get_project(db, project_id)
+
+        counts[members], project = statements_for(one_project)
+        assert len(project.members) == members
+        assert len(project.bugs) == members
+    assert set(counts.values()) == {3}, counts
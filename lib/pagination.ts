@@ -0,0 +1,16 @@
+// List endpoints return one page at a time, with the cursor for the next
+// page in the X-Next-Cursor header; follow it until the last page
+export async function fetchAllPages<T>(url: string, init?: RequestInit, pageSize = 200): Promise<T[]> {
+  const items: T[] = [];
+  let cursor: string | null = null;
+  do {
+    const params = new URLSearchParams({ limit: String(pageSize) });
+    if (cursor) params.set('cursor', cursor);
+    const response = await fetch(`${url}?${params.toString()}`, init);
+    if (!response.ok) throw new Error(`Failed to fetch ${url}`);
+    const page: T[] = await response.json();
+    items.push(...page);
+    cursor = response.headers.get('X-Next-Cursor');
+  } while (cursor);
+  return items;
+}